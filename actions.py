@@ -15,6 +15,8 @@
 from quest import STATE_ACTIVE
 from command import parse_quest_id, parse_context_index, parse_status
 import labels as L
+from prompt import delegate
+from events import ItemTaken, NpcTalked
 
 
 # The error message is stored in the MSG0 and MSG1 variables and formatted with the
@@ -67,7 +69,7 @@ class Actions:
 
         if l != number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG1.format(command=command_word))
+            game.output.emit(MSG1.format(command=command_word))
             return False
 
 
@@ -87,9 +89,9 @@ class Actions:
 
         # --- direction invalide ---
         if direction_input not in direction_map:
-            print(L.COMMAND_INVALID_DIRECTION.format(direction=direction_input))
+            game.output.emit(L.COMMAND_INVALID_DIRECTION.format(direction=direction_input))
             # 👉 on réaffiche la salle actuelle
-            print(game.get_room_view())
+            game.output.emit(game.get_room_view())
             return False
 
 
@@ -103,7 +105,7 @@ class Actions:
             room_callback = getattr(game, "room_change_callback", None)
             if callable(room_callback):
                 room_callback()
-            print(player.get_history())
+            game.output.emit(player.get_history())
         return success
 
     @staticmethod
@@ -130,21 +132,20 @@ class Actions:
         player = game.player
         if len(list_of_words) != 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
         if not player.history:
-            print(L.COMMAND_BACK_NOT_POSSIBLE)
-            print(game.get_room_view())
+            game.output.emit(L.COMMAND_BACK_NOT_POSSIBLE)
+            game.output.emit(game.get_room_view())
             return False
 
-        previous_room = player.history.pop()
-        player.current_room = previous_room
+        player.go_back()
         room_callback = getattr(game, "room_change_callback", None)
         if callable(room_callback):
             room_callback()
 
-        print(game.get_room_view())
-        print(player.get_history())
+        game.output.emit(game.get_room_view())
+        game.output.emit(player.get_history())
 
         return True
 
@@ -166,7 +167,7 @@ class Actions:
         """
         if len(list_of_words) != 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         room = game.player.current_room
@@ -176,7 +177,7 @@ class Actions:
         res += "\n" + room.format_characters() + "\n"
         if game.current_world == 4 and room.name == "Landing Valley":
             game.player.novaterra_observed_planet = True
-        print(res)
+        game.output.emit(res)
         return True
 
     @staticmethod
@@ -184,28 +185,27 @@ class Actions:
         """Faire parler un personnage de la piece courante via un index."""
         index = parse_context_index(list_of_words)
         if index is None:
-            print(INVALID_CONTEXT_CMD)
+            game.output.emit(INVALID_CONTEXT_CMD)
             return False
 
         room = game.player.current_room
         characters = room.get_characters()
         if index < 1 or index > len(characters):
-            print(L.COMMAND_INVALID_INDEX)
+            game.output.emit(L.COMMAND_INVALID_INDEX)
             return False
 
         target = characters[index - 1]
 
         if getattr(target, "on_talk", None):
-            response = target.on_talk(game, target)
+            response = yield from delegate(target.on_talk(game, target))
             if response:
-                print(response)
+                game.output.emit(response)
         else:
-            print(L.PLAYER_TALK_TEMPLATE.format(name=target.name, line=target.get_msg()))
+            game.output.emit(L.PLAYER_TALK_TEMPLATE.format(name=target.name, line=target.get_msg()))
 
-        game.handle_world1_talk(target.name)
-        game.handle_world2_talk(target.name)
-        game.handle_world3_talk(target.name)
-        game.handle_world4_talk(target.name)
+        game.events.publish(NpcTalked(target))
+        yield from game.update_quests()
+        game.check_world1_npc_bonus()
         game.player.quest_manager.check_action_objectives("parler", target.name)
 
         return True
@@ -215,30 +215,30 @@ class Actions:
         """Prendre un item de la piece courante via un index."""
         index = parse_context_index(list_of_words)
         if index is None:
-            print(INVALID_CONTEXT_CMD)
+            game.output.emit(INVALID_CONTEXT_CMD)
             return False
 
         player = game.player
         room = player.current_room
         items = room.get_items()
         if index < 1 or index > len(items):
-            print(L.COMMAND_INVALID_INDEX)
+            game.output.emit(L.COMMAND_INVALID_INDEX)
             return False
 
         item = items[index - 1]
         if (player.weight + item.weight) > player.max_weight:
-            print(L.COMMAND_TAKE_TOO_HEAVY.format(item=item))
+            game.output.emit(L.COMMAND_TAKE_TOO_HEAVY.format(item=item))
             return False
 
-        player.inventory.append(item)
+        player.inventory.add(item)
         room.inventory.remove(item)
-        player.weight += item.weight
         player.apply_passive_item_effect(item, 1)
-        print(L.COMMAND_TAKE_SUCCESS.format(item=item))
+        game.output.emit(L.COMMAND_TAKE_SUCCESS.format(item=item))
         if getattr(item, "on_pickup", None):
             message = item.on_pickup(player, game)
             if message:
-                print(message)
+                game.output.emit(message)
+        game.events.publish(ItemTaken(item))
         player.quest_manager.check_action_objectives("prendre", item.name)
         return True
 
@@ -247,21 +247,20 @@ class Actions:
         """Deposer un item de l'inventaire via un index."""
         index = parse_context_index(list_of_words)
         if index is None:
-            print(INVALID_CONTEXT_CMD)
+            game.output.emit(INVALID_CONTEXT_CMD)
             return False
 
         player = game.player
         items = player.inventory
         if index < 1 or index > len(items):
-            print(L.COMMAND_INVALID_INVENTORY_INDEX)
+            game.output.emit(L.COMMAND_INVALID_INVENTORY_INDEX)
             return False
 
         item = items[index - 1]
         player.inventory.remove(item)
         player.current_room.inventory.append(item)
-        player.weight -= item.weight
         player.apply_passive_item_effect(item, -1)
-        print(L.COMMAND_DROP_SUCCESS.format(item=item))
+        game.output.emit(L.COMMAND_DROP_SUCCESS.format(item=item))
         return True
 
     @staticmethod
@@ -269,25 +268,24 @@ class Actions:
         """Utiliser un item de l'inventaire via un index."""
         index = parse_context_index(list_of_words)
         if index is None:
-            print(INVALID_CONTEXT_CMD)
+            game.output.emit(INVALID_CONTEXT_CMD)
             return False
 
         player = game.player
         items = player.inventory
         if index < 1 or index > len(items):
-            print(L.COMMAND_INVALID_INVENTORY_INDEX)
+            game.output.emit(L.COMMAND_INVALID_INVENTORY_INDEX)
             return False
 
         item = items[index - 1]
         if not item.usable:
-            print(L.COMMAND_USE_NOT_USABLE.format(item=item.name))
+            game.output.emit(L.COMMAND_USE_NOT_USABLE.format(item=item.name))
             return False
 
         message, consume = player.apply_item_effect(item)
         if consume:
             player.inventory.remove(item)
-            player.weight -= item.weight
-        print(message)
+        game.output.emit(message)
         return True
 
 
@@ -297,14 +295,14 @@ class Actions:
         """Attaquer un ennemi présent dans la pièce courante."""
         if len(list_of_words) < 2:
             command_word = list_of_words[0]
-            print(MSG1.format(command=command_word))
+            game.output.emit(MSG1.format(command=command_word))
             return False
 
         target_name = " ".join(list_of_words[1:])
         room = game.player.current_room
 
         if not room.enemies:
-            print(L.COMMAND_NO_ENEMY)
+            game.output.emit(L.COMMAND_NO_ENEMY)
             return False
 
         enemy = None
@@ -314,16 +312,16 @@ class Actions:
                 break
 
         if enemy is None:
-            print(L.COMMAND_UNKNOWN_ENEMY.format(enemy=target_name))
+            game.output.emit(L.COMMAND_UNKNOWN_ENEMY.format(enemy=target_name))
             return False
 
         if enemy.name.lower() == "vorn":
             quest = game.player.quest_manager.get_quest_by_id(4)
             if not quest or quest.state != STATE_ACTIVE:
-                print(L.VORN_LOCKED_TEXT)
+                game.output.emit(L.VORN_LOCKED_TEXT)
                 return False
 
-        game.resolve_combat(game.player, enemy)
+        yield from game.resolve_combat(game.player, enemy)
         return True
 
     @staticmethod
@@ -348,10 +346,10 @@ class Actions:
         """
         if len(list_of_words) != 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
-        print(game.player.check())
+        game.output.emit(game.player.check())
         return True
 
     @staticmethod
@@ -359,13 +357,13 @@ class Actions:
         """Afficher l'etat global du personnage."""
         if not parse_status(list_of_words):
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         player = game.player
         stability_state = player.get_stability_state()
         completed, total = player.get_completed_quests_count()
-        print(
+        game.output.emit(
             L.STATUS_TEMPLATE.format(
                 hp=player.hp,
                 max_hp=player.max_hp,
@@ -395,11 +393,11 @@ class Actions:
         """
         if len(list_of_words) != 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
 
-        print(game.player.get_history())
+        game.output.emit(game.player.get_history())
         return True
 
     @staticmethod
@@ -407,11 +405,11 @@ class Actions:
         """Afficher la carte ASCII et la position du joueur."""
         if len(list_of_words) != 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         current_room = game.player.current_room
-        print(game.world.get_ascii_map(current_room.name))
+        game.output.emit(game.world.get_ascii_map(current_room.name))
         return True
 
     @staticmethod
@@ -449,13 +447,13 @@ class Actions:
         # If the number of parameters is incorrect, print an error message and return False.
         if l != number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         # Set the finished attribute of the game object to True.
         player = game.player
         msg = L.QUIT_MESSAGE.format(name=player.name)
-        print(msg)
+        game.output.emit(msg)
         game.finished = True
         return True
 
@@ -495,14 +493,14 @@ class Actions:
         l = len(list_of_words)
         if l != number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         # Print the list of available commands.
-        print(L.HELP_HEADER)
+        game.output.emit(L.HELP_HEADER)
         for command in game.commands.values():
-            print("\t- " + str(command))
-        print()
+            game.output.emit("\t- " + str(command))
+        game.output.emit()
         return True
 
     @staticmethod
@@ -542,7 +540,7 @@ class Actions:
         n = len(list_of_words)
         if n != number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         # Show all quests
@@ -589,12 +587,12 @@ class Actions:
         n = len(list_of_words)
         if n < number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG1.format(command=command_word))
+            game.output.emit(MSG1.format(command=command_word))
             return False
 
         quest_id = parse_quest_id(list_of_words)
         if quest_id is None:
-            print(L.COMMAND_QUEST_ID_INVALID)
+            game.output.emit(L.COMMAND_QUEST_ID_INVALID)
             return False
 
         # Prepare current counter values to show progress
@@ -622,15 +620,16 @@ class Actions:
         Examples:
 
         >>> from game import Game
+        >>> from prompt import run
         >>> game = Game()
         >>> game.setup("TestPlayer")
-        >>> Actions.activate(game, ["activate", "Grand", "Voyageur"], 1) # doctest: +ELLIPSIS
+        >>> run(Actions.activate(game, ["activate", "Grand", "Voyageur"], 1)) # doctest: +ELLIPSIS
         <BLANKLINE>
         🗡️  Nouvelle quête activée: Grand Voyageur
         📝 Déplacez-vous 10 fois entre les lieux.
         <BLANKLINE>
         True
-        >>> Actions.activate(game, ["activate"], 1)
+        >>> run(Actions.activate(game, ["activate"], 1))
         <BLANKLINE>
         La commande 'activate' prend 1 seul paramètre.
         <BLANKLINE>
@@ -641,20 +640,20 @@ class Actions:
         n = len(list_of_words)
         if n < number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG1.format(command=command_word))
+            game.output.emit(MSG1.format(command=command_word))
             return False
 
         quest_id = parse_quest_id(list_of_words)
         if quest_id is None:
-            print(L.COMMAND_QUEST_ID_INVALID)
+            game.output.emit(L.COMMAND_QUEST_ID_INVALID)
             return False
 
         # Try to activate the quest
         if game.player.activate_quest(quest_id):
-            game.update_world1_quests(activated_quest_id=quest_id)
+            yield from game.update_quests(activated_quest_id=quest_id)
             return True
 
-        print(L.COMMAND_QUEST_ACTIVATE_FAILED.format(quest_id=quest_id))
+        game.output.emit(L.COMMAND_QUEST_ACTIVATE_FAILED.format(quest_id=quest_id))
         # print(f"\nImpossible d'activer la quête '{quest_title}'. \
         #             Vérifiez le nom ou si elle n'est pas déjà active.\n")
         return False
@@ -692,7 +691,7 @@ class Actions:
         n = len(list_of_words)
         if n != number_of_parameters + 1:
             command_word = list_of_words[0]
-            print(MSG0.format(command=command_word))
+            game.output.emit(MSG0.format(command=command_word))
             return False
 
         # Show all rewards
@@ -3,11 +3,13 @@ ai_quiz.py - Minimal AI quiz used to decide who attacks in combat.
 """
 
 import random
+from array import array
+from bisect import bisect_right
+from itertools import accumulate
+from math import gcd
 
-STATS = {
-    "correct": 0,
-    "wrong": 0,
-}
+from answers import answer_forms, match_answer
+from output import DEFAULT_OUTPUT
 
 QUESTIONS = [
     ("Quel est le nom du plus grand volcan du systeme solaire ?", "olympus mons"),
@@ -61,43 +63,206 @@ QUESTIONS = [
     ("Quel est le nom de la planete des Na'vi dans 'Avatar' ?", "pandora"),
 ]
 
-_remaining_questions = []
+# Other accepted spellings of the built-in answers. Case, accents, spacing
+# and punctuation never need an alias (see answers.py).
+ALIASES = {
+    "voie lactée": ("milky way",),
+    "neil armstrong": ("armstrong",),
+    "faucon millenium": ("faucon millennium", "millennium falcon"),
+    "iss": ("station spatiale internationale",),
+    "dark vador": ("darth vader", "anakin skywalker", "vador"),
+    "hg wells": ("herbert george wells", "wells"),
+    "venus": ("vénus",),
+    "andromede": ("andromeda", "m31"),
+    "spoutnik": ("spoutnik 1", "sputnik"),
+    "hal 9000": ("hal",),
+    "et": ("e.t. l'extraterrestre",),
+    "ursula k le guin": ("ursula le guin", "le guin"),
+    "r2-d2": ("r2", "artoo"),
+    "c": ("carbone",),
+    "300000": ("300 000 km/s", "299792"),
+}
+
+# Answer forms of the built-in questions, computed once at import.
+QUESTION_FORMS = [answer_forms(answer, ALIASES.get(answer, ())) for _q, answer in QUESTIONS]
+
 
+# Pools up to this size are shuffled exactly, one Fisher-Yates step per
+# draw; larger ones (disk banks) walk a random affine permutation instead,
+# so a session never holds a per-question array.
+SHUFFLE_LIMIT = 65535
 
-def get_question():
+
+def question_ranges(questions, theme=None, difficulty=None):
+    """Index ranges (start, count) of the questions matching the filters.
+
+    Question banks (see question_bank.py) answer from their precomputed
+    slices; a plain list has no themes and can only be drawn as a whole.
     """
-    Return a question and its expected answer.
+    ranges = getattr(questions, "ranges", None)
+    if ranges is not None:
+        return ranges(theme, difficulty)
+    if theme is not None or difficulty is not None:
+        raise ValueError("This question list has no themes or difficulties")
+    return ((0, len(questions)),)
+
+
+class ShuffledDeck:
+    """Exact lazy shuffle of a pool: a compact permutation of positions."""
+
+    def __init__(self, size, rng):
+        self.rng = rng
+        self._deck = array("H", range(size))
+        self._drawn = 0
+
+    def draw(self):
+        """Next position of the current permutation (reshuffles when spent)."""
+        deck = self._deck
+        if self._drawn == len(deck):
+            self._drawn = 0
+        pos = self._drawn
+        pick = self.rng.randrange(pos, len(deck))
+        deck[pos], deck[pick] = deck[pick], deck[pos]
+        self._drawn = pos + 1
+        return deck[pos]
+
+    def get_state(self):
+        """Plain-data state (see snapshot.py)."""
+        return (self._deck.tobytes(), self._drawn)
+
+    def set_state(self, state):
+        """Restore a state returned by ``get_state``."""
+        order, self._drawn = state
+        self._deck = array("H")
+        self._deck.frombytes(order)
+
+
+class AffineDeck:
+    """Walk a pool of ``size`` positions as ``(step * i + offset) % size``.
+
+    ``step`` is coprime with ``size``, so each cycle visits every position
+    once; step and offset are redrawn at the start of every cycle.
     """
-    if not _remaining_questions:
-        _remaining_questions.extend(QUESTIONS)
-        random.shuffle(_remaining_questions)
-    return _remaining_questions.pop()
 
+    def __init__(self, size, rng):
+        self.size = size
+        self.rng = rng
+        self._step = 1
+        self._offset = 0
+        self._drawn = size
+
+    def draw(self):
+        """Next position, in O(1) time and memory."""
+        if self._drawn == self.size:
+            self._reseed()
+        pos = (self._step * self._drawn + self._offset) % self.size
+        self._drawn += 1
+        return pos
 
-def evaluate_answer(_player, user_answer, expected_answer):
+    def _reseed(self):
+        step = self.rng.randrange(1, self.size)
+        while gcd(step, self.size) != 1:
+            step = self.rng.randrange(1, self.size)
+        self._step = step
+        self._offset = self.rng.randrange(self.size)
+        self._drawn = 0
+
+    def get_state(self):
+        """Plain-data state (see snapshot.py)."""
+        return (self._step, self._offset, self._drawn)
+
+    def set_state(self, state):
+        """Restore a state returned by ``get_state``."""
+        self._step, self._offset, self._drawn = state
+
+
+class QuizEngine:
     """
-    Evaluate the user's answer and return True if correct.
+    Per-session quiz state: one deck per question filter and answer statistics.
+
+    ``questions`` is QUESTIONS (the default) or any sequence of (question, answer) pairs,
+    such as a disk-backed QuestionBank shared by every session of a process.
+    Each (theme, difficulty) filter gets its own deck over the matching
+    index ranges, created on first use; drawing is O(1) and the question
+    table itself is never copied.
     """
-    normalized = user_answer.strip().lower()
-    if normalized == expected_answer.lower():
-        print("Bonne reponse. Vous prenez l'initiative.")
-        STATS["correct"] += 1
-        return True
-
-    print(f"Mauvaise reponse. La bonne reponse etait : {expected_answer}.")
-    STATS["wrong"] += 1
-    return False
-
-
-def get_ai_status(_player):
-    """Return a short summary of quiz performance."""
-    total = STATS["correct"] + STATS["wrong"]
-    if total == 0:
-        return "L'IA n'a encore pose aucune question."
-
-    ratio = int((STATS["correct"] / total) * 100)
-    return (
-        f"IA de combat - bonnes reponses : {STATS['correct']}, "
-        f"mauvaises : {STATS['wrong']}, "
-        f"reussite {ratio}%"
-    )
+
+    def __init__(self, questions=None, rng=random):
+        self.questions = QUESTIONS if questions is None else questions
+        self.rng = rng
+        self._decks = {}
+        self._last = None
+        self.correct = 0
+        self.wrong = 0
+
+    def _deck(self, theme, difficulty):
+        key = (theme, difficulty)
+        entry = self._decks.get(key)
+        if entry is None:
+            ranges = question_ranges(self.questions, theme, difficulty)
+            starts = list(accumulate((count for _start, count in ranges), initial=0))
+            size = starts.pop()
+            if not size:
+                raise LookupError(f"No question for theme={theme!r}, difficulty={difficulty!r}")
+            deck_type = ShuffledDeck if size <= SHUFFLE_LIMIT else AffineDeck
+            entry = self._decks[key] = (deck_type(size, self.rng), ranges, starts)
+        return entry
+
+    def get_state(self):
+        """Plain-data state: statistics, last question and deck positions."""
+        decks = tuple(
+            (theme, difficulty, deck.get_state())
+            for (theme, difficulty), (deck, _ranges, _starts) in self._decks.items()
+        )
+        return (self.correct, self.wrong, self._last, decks)
+
+    def set_state(self, state):
+        """Restore a state returned by ``get_state`` (same question source)."""
+        self.correct, self.wrong, self._last, decks = state
+        self._decks = {}
+        for theme, difficulty, deck_state in decks:
+            self._deck(theme, difficulty)[0].set_state(deck_state)
+
+    def get_question(self, theme=None, difficulty=None):
+        """
+        Return a question and its expected answer, optionally filtered.
+        """
+        deck, ranges, starts = self._deck(theme, difficulty)
+        pos = deck.draw()
+        block = bisect_right(starts, pos) - 1
+        index = ranges[block][0] + pos - starts[block]
+        question = self.questions[index]
+        self._last = (index, question[1])
+        return question
+
+    def answer_forms(self, expected_answer):
+        """Accepted forms for ``expected_answer``, precomputed when possible.
+
+        The forms of the last drawn question come from the bank (or from
+        QUESTION_FORMS); any other answer is normalised on the spot.
+        """
+        if self._last is not None and self._last[1] == expected_answer:
+            index = self._last[0]
+            forms = getattr(self.questions, "forms", None)
+            if forms is not None:
+                return forms(index)
+            if self.questions is QUESTIONS:
+                return QUESTION_FORMS[index]
+        return answer_forms(expected_answer, ALIASES.get(expected_answer, ()))
+
+    def evaluate_answer(self, player, user_answer, expected_answer):
+        """
+        Evaluate the user's answer and return True if correct.
+
+        Case, accents, spacing and punctuation are ignored, aliases are
+        accepted and longer answers tolerate a typo or two (see answers.py).
+        """
+        output = player.output if player is not None else DEFAULT_OUTPUT
+        if match_answer(user_answer, self.answer_forms(expected_answer)):
+            output.emit("Bonne reponse. Vous prenez l'initiative.")
+            self.correct += 1
+            return True
+
+        output.emit(f"Mauvaise reponse. La bonne reponse etait : {expected_answer}.")
+        self.wrong += 1
+        return False
@@ -0,0 +1,99 @@
+"""Tolerant quiz answer matching.
+
+Expected answers and their aliases are reduced once, when the questions
+are loaded (or when a bank is built), to *forms*: case-folded, accent-free
+strings of letters and digits only. A player's answer is reduced the same
+way and accepted if it equals a form, or is within a small edit distance
+of one. Forms containing digits ("hal9000", "300000") must match exactly.
+
+Examples:
+    >>> forms = answer_forms("voie lactée", ("milky way",))
+    >>> forms
+    ('voielactee', 'milkyway')
+    >>> match_answer("Voie Lactee", forms), match_answer("voie lacte", forms)
+    (True, True)
+    >>> match_answer("HAL9000", answer_forms("hal 9000"))
+    True
+    >>> match_answer("hal 9001", answer_forms("hal 9000"))
+    False
+"""
+
+import unicodedata
+from functools import lru_cache
+
+
+def normalize_answer(text):
+    """Case-fold, strip accents and keep only letters and digits."""
+    decomposed = unicodedata.normalize("NFKD", text.casefold())
+    return "".join(char for char in decomposed if char.isalnum())
+
+
+@lru_cache(maxsize=4096)
+def answer_forms(answer, aliases=()):
+    """Distinct normalised forms of an answer and its aliases, in order."""
+    forms = (normalize_answer(text) for text in (answer, *aliases))
+    return tuple(dict.fromkeys(form for form in forms if form))
+
+
+def tolerance(form):
+    """Edits allowed against ``form``: none for short or numeric forms."""
+    if len(form) < 5 or any(char.isdigit() for char in form):
+        return 0
+    return 1 if len(form) < 9 else 2
+
+
+def within_distance(first, second, bound):
+    """True if the Levenshtein distance is at most ``bound``.
+
+    The common prefix and suffix are skipped, and only the cells within
+    ``bound`` of the diagonal are computed, with an early exit as soon as
+    a whole row exceeds the bound.
+    """
+    if abs(len(first) - len(second)) > bound:
+        return False
+    start = 0
+    shortest = min(len(first), len(second))
+    while start < shortest and first[start] == second[start]:
+        start += 1
+    end_first, end_second = len(first), len(second)
+    while (
+        end_first > start
+        and end_second > start
+        and first[end_first - 1] == second[end_second - 1]
+    ):
+        end_first -= 1
+        end_second -= 1
+    first, second = first[start:end_first], second[start:end_second]
+    if not first or not second:
+        return max(len(first), len(second)) <= bound
+
+    over = bound + 1
+    previous = [column if column <= bound else over for column in range(len(second) + 1)]
+    for row, char in enumerate(first, 1):
+        current = [over] * (len(second) + 1)
+        if row <= bound:
+            current[0] = row
+        for column in range(max(1, row - bound), min(len(second), row + bound) + 1):
+            current[column] = min(
+                previous[column] + 1,
+                current[column - 1] + 1,
+                previous[column - 1] + (char != second[column - 1]),
+            )
+        if min(current) > bound:
+            return False
+        previous = current
+    return previous[-1] <= bound
+
+
+def match_answer(user_answer, forms):
+    """True if ``user_answer`` matches one of the precomputed ``forms``."""
+    given = normalize_answer(user_answer)
+    if not given:
+        return False
+    if given in forms:
+        return True
+    for form in forms:
+        bound = tolerance(form)
+        if bound and within_distance(given, form, bound):
+            return True
+    return False
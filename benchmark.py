@@ -0,0 +1,275 @@
+"""Headless benchmark: scripted playthroughs of every world and main branch.
+
+Each transcript in benchmarks/transcripts/ is replayed through
+``Game.set_input_provider`` (one line per input: player name, choices,
+commands; ``#`` lines are comments) with a fixed seed and output sent to
+a NullSink. The provider timestamps every line, which gives:
+
+- lines (commands and prompt answers) per second;
+- per-line latency percentiles;
+- world-transition time (the lines after which ``current_world`` changed);
+- peak traced memory (tracemalloc, on a separate untimed run).
+
+Results are compared with benchmarks/baseline.json when it exists.
+
+Usage:
+    python benchmark.py                     # run and compare with the baseline
+    python benchmark.py --save-baseline     # record the baseline
+    python benchmark.py --check             # exit 1 on a regression
+    python benchmark.py --profile           # per-command phase report (profiler.py)
+"""
+
+import argparse
+import json
+import platform
+import statistics
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+from harness import headless_game
+from output import NullSink
+from profiler import CommandProfiler
+
+BENCH_DIR = Path(__file__).resolve().parent / "benchmarks"
+TRANSCRIPT_DIR = BENCH_DIR / "transcripts"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+DEFAULT_SEED = 0
+DEFAULT_REPEAT = 50
+DEFAULT_TOLERANCE = 0.25
+
+# Metric -> True if higher is better.
+METRICS = {
+    "lines_per_s": True,
+    "p50_us": False,
+    "p90_us": False,
+    "p99_us": False,
+    "max_us": False,
+    "transition_ms": False,
+    "peak_kib": False,
+}
+# Tail latencies are reported but too noisy to fail a run on.
+UNGATED = {"p99_us", "max_us"}
+
+
+class TranscriptEnd(Exception):
+    """Raised by the provider when a transcript has no line left."""
+
+
+def load_transcript(path):
+    """Input lines of a transcript file (comments skipped)."""
+    with open(path, encoding="utf-8") as handle:
+        return [
+            line.rstrip("\r\n")
+            for line in handle
+            if not line.startswith("#")
+        ]
+
+
+class ScriptedPlayer:  # pylint: disable=too-many-instance-attributes
+    """Input provider replaying a transcript and timing each line.
+
+    A line's latency runs from the moment it is returned to the next call
+    of the provider (or to the end of the game for the last one).
+    """
+
+    def __init__(self, game, lines, clock=time.perf_counter):
+        self.game = game
+        self.lines = lines
+        self.clock = clock
+        self.position = 0
+        self.latencies = []
+        self.transitions = []
+        self._sent_at = None
+        self._world = None
+
+    def __call__(self, prompt=""):
+        self._record()
+        if self.position == len(self.lines):
+            raise TranscriptEnd()
+        line = self.lines[self.position]
+        self.position += 1
+        self._world = self.game.current_world
+        self._sent_at = self.clock()
+        return line
+
+    def finish(self):
+        """Record the latency of the last line played."""
+        self._record()
+
+    def _record(self):
+        if self._sent_at is None:
+            return
+        elapsed = self.clock() - self._sent_at
+        self._sent_at = None
+        self.latencies.append(elapsed)
+        if self.game.current_world != self._world:
+            self.transitions.append(elapsed)
+
+
+def play_transcript(lines, seed=DEFAULT_SEED, profiler=None):
+    """Play a transcript headlessly; return (ScriptedPlayer, game)."""
+    game = headless_game(seed, NullSink())
+    if profiler is not None:
+        game.enable_profiling(profiler)
+    player = ScriptedPlayer(game, lines)
+    game.set_input_provider(player)
+    try:
+        game.play()
+    except TranscriptEnd:
+        pass
+    player.finish()
+    return player, game
+
+
+def peak_memory(lines, seed=DEFAULT_SEED):
+    """Peak traced allocation (bytes) while playing a transcript."""
+    tracemalloc.start()
+    try:
+        play_transcript(lines, seed)
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def summarize(latencies, transitions, peak):
+    """Metrics dict from raw latencies (seconds) and peak memory (bytes)."""
+    cuts = statistics.quantiles(latencies, n=100, method="inclusive")
+    return {
+        "lines": len(latencies),
+        "lines_per_s": round(len(latencies) / sum(latencies), 1),
+        "p50_us": round(cuts[49] * 1e6, 1),
+        "p90_us": round(cuts[89] * 1e6, 1),
+        "p99_us": round(cuts[98] * 1e6, 1),
+        "max_us": round(max(latencies) * 1e6, 1),
+        "transition_ms": round(statistics.fmean(transitions) * 1e3, 3) if transitions else 0.0,
+        "peak_kib": round(peak / 1024, 1),
+    }
+
+
+def time_transcript(lines, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    """Play a transcript ``repeat`` times after a warm-up run; return
+    (latencies, transitions, finished on every run)."""
+    play_transcript(lines, seed)  # warm-up: world templates, caches
+    latencies, transitions = [], []
+    finished = True
+    for _ in range(repeat):
+        player, game = play_transcript(lines, seed)
+        latencies.extend(player.latencies)
+        transitions.extend(player.transitions)
+        finished = finished and game.finished
+    return latencies, transitions, finished
+
+
+def run_benchmark(paths, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    """Benchmark each transcript; return {name: metrics} plus a "total" entry."""
+    results = {}
+    all_latencies, all_transitions, peaks = [], [], []
+    for path in paths:
+        lines = load_transcript(path)
+        latencies, transitions, finished = time_transcript(lines, repeat, seed)
+        peak = peak_memory(lines, seed)
+        metrics = summarize(latencies, transitions, peak)
+        metrics["finished"] = finished
+        results[Path(path).stem] = metrics
+        all_latencies.extend(latencies)
+        all_transitions.extend(transitions)
+        peaks.append(peak)
+    results["total"] = summarize(all_latencies, all_transitions, max(peaks))
+    return results
+
+
+def compare(results, baseline, tolerance=DEFAULT_TOLERANCE):
+    """Print the ratio to the baseline per metric; return the regressions."""
+    regressions = []
+    for name, metrics in results.items():
+        reference = baseline.get("results", {}).get(name)
+        if reference is None:
+            continue
+        cells = []
+        for metric, higher_is_better in METRICS.items():
+            old, new = reference.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            ratio = new / old
+            worse = metric not in UNGATED and (
+                ratio < 1 - tolerance if higher_is_better else ratio > 1 + tolerance
+            )
+            cells.append(f"{metric} x{ratio:.2f}{' !' if worse else ''}")
+            if worse:
+                regressions.append((name, metric, old, new))
+        print(f"  {name}: " + ", ".join(cells))
+    return regressions
+
+
+def profile_transcripts(paths, repeat=DEFAULT_REPEAT, seed=DEFAULT_SEED):
+    """Per-command phase report (profiler.py) of the transcripts."""
+    profiler = CommandProfiler()
+    profiler.start()
+    for path in paths:
+        lines = load_transcript(path)
+        for _ in range(repeat):
+            play_transcript(lines, seed, profiler)
+    profiler.stop()
+    return profiler.report()
+
+
+def save_baseline(path, results, seed, repeat):
+    """Write ``results`` and the run's settings to ``path``."""
+    baseline = {
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "seed": seed,
+        "repeat": repeat,
+        "results": results,
+    }
+    path.write_text(json.dumps(baseline, indent=2) + "\n", encoding="utf-8")
+
+
+def main(argv=None):
+    """Entry point: run the suite, print it and compare with the baseline."""
+    parser = argparse.ArgumentParser(description="Vigilant headless benchmark")
+    parser.add_argument("transcripts", nargs="*", help="default: benchmarks/transcripts/*.txt")
+    parser.add_argument("--repeat", type=int, default=DEFAULT_REPEAT)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--check", action="store_true", help="exit 1 on a regression")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE)
+    parser.add_argument(
+        "--profile", action="store_true", help="print a per-command phase report and exit"
+    )
+    args = parser.parse_args(argv)
+
+    paths = args.transcripts or sorted(TRANSCRIPT_DIR.glob("*.txt"))
+    if args.profile:
+        print(profile_transcripts(paths, args.repeat, args.seed))
+        return 0
+    results = run_benchmark(paths, args.repeat, args.seed)
+    for name, metrics in results.items():
+        print(f"{name}: " + ", ".join(f"{key}={value}" for key, value in metrics.items()))
+    unfinished = [name for name, metrics in results.items() if metrics.get("finished") is False]
+    for name in unfinished:
+        print(f"warning: {name} did not reach an ending", file=sys.stderr)
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        save_baseline(baseline_path, results, args.seed, args.repeat)
+        print(f"baseline written to {baseline_path}")
+        return 0
+    if not baseline_path.exists():
+        return 1 if unfinished else 0
+
+    print(f"compared with {baseline_path}:")
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    regressions = compare(results, baseline, args.tolerance)
+    for name, metric, old, new in regressions:
+        print(f"regression: {name} {metric} {old} -> {new}", file=sys.stderr)
+    if args.check and (regressions or unfinished):
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
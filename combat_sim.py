@@ -0,0 +1,182 @@
+"""Batch combat balance simulator (requires NumPy, optional dependency).
+
+Models the quiz-driven loop of ``Game.resolve_combat`` for many fights at
+once: every round the player answers a question; a right answer deals
+``player.atk`` to the enemy, a wrong one costs the player ``enemy.attack``
+HP, and the first hit that leaves the player at or below half of
+``max_hp`` is the severe injury (stability -1). Fights are independent
+rows of NumPy arrays, advanced one round at a time.
+
+Enemies come from the real world definitions (room enemies and scripted
+ones), and the player's stats from a fresh ``Player``.
+
+Usage:
+    python combat_sim.py --fights 1000000 --accuracy 0.5 0.7 0.9
+    python combat_sim.py --accuracy 0.7 --concentration 8 --worlds 3 4
+
+With ``--concentration k`` each fight draws its own accuracy from a Beta
+distribution of mean ``accuracy`` and concentration ``k`` (players differ);
+without it every fight uses the same accuracy.
+"""
+
+import argparse
+
+try:
+    import numpy as np
+except ImportError:  # optional dependency, only needed by this tool
+    np = None
+
+from player import Player
+from world import get_world_template
+
+WORLD_IDS = (1, 2, 3, 4)
+BATCH_SIZE = 1 << 20  # fights simulated per batch (bounds memory)
+MAX_ROUNDS = 10_000  # fights still running after this are counted as losses
+
+
+class CombatStats:
+    """Aggregated outcome of the fights against one enemy at one accuracy."""
+
+    def __init__(self, enemy, accuracy):
+        self.enemy = enemy
+        self.accuracy = accuracy
+        self.fights = 0
+        self.wins = 0
+        self.hp_lost = 0
+        self.severe = 0
+        self.rounds = 0
+
+    def add(self, wins, hp_lost, severe, rounds, fights):
+        """Accumulate the totals of one batch."""
+        self.fights += fights
+        self.wins += wins
+        self.hp_lost += hp_lost
+        self.severe += severe
+        self.rounds += rounds
+
+    def row(self):
+        """Formatted report line."""
+        fights = self.fights or 1
+        return (
+            f"{self.enemy.name:<24} {self.enemy.hp:>4} {self.enemy.attack:>4} "
+            f"{self.accuracy:>6.2f} {self.wins / fights:>8.2%} "
+            f"{self.hp_lost / fights:>9.1f} {self.severe / fights:>8.2%} "
+            f"{self.rounds / fights:>7.2f}"
+        )
+
+
+def world_enemies(world_ids=WORLD_IDS):
+    """(world id, enemy) for every room and scripted enemy of each world."""
+    enemies = []
+    for world_id in world_ids:
+        template = get_world_template(world_id)
+        for room in template.rooms.values():
+            enemies.extend((world_id, enemy) for enemy in room.enemies)
+        enemies.extend((world_id, enemy) for enemy in template.scripted_enemies.values())
+    return enemies
+
+
+def draw_accuracies(rng, accuracy, concentration, fights):
+    """Per-fight answer accuracy: constant, or Beta(mean, concentration)."""
+    if not concentration:
+        return np.full(fights, accuracy)
+    alpha = max(accuracy * concentration, 1e-9)
+    beta = max((1 - accuracy) * concentration, 1e-9)
+    return rng.beta(alpha, beta, fights)
+
+
+def simulate_batch(rng, enemy, player, accuracies):  # pylint: disable=too-many-locals
+    """Play ``len(accuracies)`` fights; return (wins, hp lost, severe, rounds)."""
+    fights = len(accuracies)
+    enemy_hp = np.full(fights, enemy.hp, dtype=np.int32)
+    player_hp = np.full(fights, player.hp, dtype=np.int32)
+    severe = np.zeros(fights, dtype=bool)
+    rounds = np.zeros(fights, dtype=np.int32)
+    active = np.ones(fights, dtype=bool) if enemy.hp > 0 else np.zeros(fights, dtype=bool)
+    damage = max(0, int(enemy.attack))
+    half = player.max_hp // 2
+
+    for _round in range(MAX_ROUNDS):
+        if not active.any():
+            break
+        correct = rng.random(fights) < accuracies
+        hits = active & correct
+        misses = active & ~correct
+        rounds += active
+        enemy_hp[hits] -= max(0, int(player.atk))
+        np.maximum(enemy_hp, 0, out=enemy_hp)
+        if damage:
+            player_hp[misses] -= damage
+            np.maximum(player_hp, 0, out=player_hp)
+            severe |= misses & (player_hp <= half)
+        active &= (enemy_hp > 0) & (player_hp > 0)
+
+    wins = enemy_hp <= 0
+    return (
+        int(wins.sum()),
+        int((player.hp - player_hp).sum()),
+        int(severe.sum()),
+        int(rounds.sum()),
+    )
+
+
+def simulate(
+    enemy, accuracy, fights, player=None, concentration=0.0, seed=None
+):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+    """Simulate ``fights`` fights against ``enemy``; return CombatStats."""
+    if np is None:
+        raise RuntimeError("combat_sim requires NumPy (pip install numpy)")
+    player = player if player is not None else Player("simulation")
+    rng = np.random.default_rng(seed)
+    stats = CombatStats(enemy, accuracy)
+    remaining = fights
+    while remaining:
+        batch = min(remaining, BATCH_SIZE)
+        accuracies = draw_accuracies(rng, accuracy, concentration, batch)
+        stats.add(*simulate_batch(rng, enemy, player, accuracies), batch)
+        remaining -= batch
+    return stats
+
+
+def main(argv=None):
+    """Entry point: print the balance report for every enemy."""
+    parser = argparse.ArgumentParser(description="Vigilant combat balance simulator")
+    parser.add_argument("--fights", type=int, default=100_000)
+    parser.add_argument("--accuracy", type=float, nargs="+", default=[0.5, 0.7, 0.9])
+    parser.add_argument("--concentration", type=float, default=0.0)
+    parser.add_argument("--worlds", type=int, nargs="+", default=list(WORLD_IDS))
+    parser.add_argument("--hp", type=int, default=None, help="player HP at fight start")
+    parser.add_argument("--atk", type=int, default=None, help="player attack")
+    parser.add_argument("--seed", type=int, default=None)
+    args = parser.parse_args(argv)
+    if np is None:
+        parser.error("combat_sim requires NumPy (pip install numpy)")
+
+    player = Player("simulation")
+    if args.hp is not None:
+        player.hp = args.hp
+    if args.atk is not None:
+        player.atk = args.atk
+
+    print(
+        f"Player: hp {player.hp}/{player.max_hp}, atk {player.atk} - "
+        f"{args.fights} fights per enemy and accuracy\n"
+    )
+    header = (
+        f"{'enemy':<24} {'hp':>4} {'atk':>4} {'acc':>6} {'win':>8} "
+        f"{'hp lost':>9} {'severe':>8} {'rounds':>7}"
+    )
+    current_world = None
+    for world_id, enemy in world_enemies(args.worlds):
+        if world_id != current_world:
+            current_world = world_id
+            print(f"World {world_id}\n{header}")
+        for accuracy in args.accuracy:
+            stats = simulate(
+                enemy, accuracy, args.fights, player, args.concentration, args.seed
+            )
+            print(stats.row())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,152 @@
+"""Data-driven reactive dialogue for NPCs.
+
+Each reactive dialogue is an ordered list of rules ``(buckets, flags,
+line)``: the first rule whose stability buckets include the player's and
+whose flags are all set gives the reply; when none applies the NPC cycles
+through its own messages. A dialogue can be specialised for one NPC name
+(the Nova Terra companions share a handler but not their lines).
+
+Rules are compiled on first use, per (dialogue, NPC name), into a table
+keyed by (stability bucket, relevant flag bits) holding the final,
+already formatted reply, so talking to an NPC costs two dict lookups.
+"""
+
+from itertools import product
+
+import labels as L
+from player import FLAGS, STABILITY_STATES
+
+STABLE, FRAGILE, UNSTABLE, VACILLANT, EDGE, COLLAPSE = range(len(STABILITY_STATES))
+ANY = tuple(range(len(STABILITY_STATES)))
+
+# (dialogue id, NPC name or None for any NPC) -> ordered (buckets, flags, line).
+DIALOGUES = {
+    ("ralen_reactive", None): (
+        ((EDGE, COLLAPSE), (), L.RALEN_REACTIVE_LINES["collapse"]),
+        ((VACILLANT,), (), L.RALEN_REACTIVE_LINES["vacillant"]),
+        ((STABLE,), ("read_stability_note",), L.RALEN_REACTIVE_LINES["stable_note"]),
+    ),
+    ("malek_reactive", None): (
+        ((EDGE, COLLAPSE), (), L.MALEK_REACTIVE_LINES["collapse"]),
+        ((VACILLANT,), (), L.MALEK_REACTIVE_LINES["vacillant"]),
+    ),
+    ("nommera_reactive", None): (
+        ((VACILLANT, EDGE, COLLAPSE), ("merchant_sacrifice",), L.NOMMERA_REACTIVE_LINE),
+    ),
+    ("yara_world1_reactive", None): (
+        (ANY, ("merchant_sacrifice",), L.YARA_WORLD1_REACTIVE_LINE),
+    ),
+    ("citizen_dore_reactive", None): (
+        (ANY, ("ap_choice_infiltrate",), L.CITIZEN_REACTIVE_LINES["infiltrate"]),
+        (ANY, ("ap_choice_reveal",), L.CITIZEN_REACTIVE_LINES["reveal"]),
+        (ANY, (), L.CITIZEN_REACTIVE_LINES["default"]),
+    ),
+    ("glitch_reactive", None): (
+        (ANY, ("attack_holo_done",), L.GLITCH_REACTIVE_LINES["after"]),
+        (ANY, (), L.GLITCH_REACTIVE_LINES["before"]),
+    ),
+    ("novaterra_companion_reactive", "yara"): (
+        (ANY, (), L.NOVATERRA_COMPANION_LINES["yara"]),
+    ),
+    ("novaterra_companion_reactive", "narek"): (
+        (ANY, (), L.NOVATERRA_COMPANION_LINES["narek"]),
+    ),
+    ("novaterra_companion_reactive", "le guide"): (
+        (ANY, (), L.NOVATERRA_COMPANION_LINES["guide"]),
+    ),
+    ("novaterra_companion_reactive", None): (),
+}
+
+_COMPILED = {}
+_ROTATIONS = {}
+
+
+def format_reply(name, line):
+    """Format a NPC reply with the configured template."""
+    return L.NPC_REPLY_TEMPLATE.format(name=name, line=line)
+
+
+def _first_reply(rules, bucket, bits, name):
+    """Formatted line of the first rule matching ``bucket`` and ``bits``, or None."""
+    for buckets, required, line in rules:
+        if bucket in buckets and all(bits & FLAGS.mask(flag) for flag in required):
+            return format_reply(name, line)
+    return None
+
+
+def compile_dialogue(rules, name):
+    """Return (flag mask, {(bucket, flag bits): reply or None}) for rules."""
+    flags = []
+    for _buckets, required, _line in rules:
+        for flag in required:
+            if flag not in flags:
+                flags.append(flag)
+    masks = [FLAGS.mask(flag) for flag in flags]
+    mask = sum(masks)
+
+    table = {}
+    for bucket in ANY:
+        for states in product((False, True), repeat=len(flags)):
+            bits = sum(flag_mask for flag_mask, state in zip(masks, states) if state)
+            table[(bucket, bits)] = _first_reply(rules, bucket, bits, name)
+    return mask, table
+
+
+def _compiled(dialogue_id, name):
+    key = (dialogue_id, name)
+    compiled = _COMPILED.get(key)
+    if compiled is None:
+        rules = DIALOGUES.get((dialogue_id, name.lower()))
+        if rules is None:
+            rules = DIALOGUES[(dialogue_id, None)]
+        compiled = _COMPILED[key] = compile_dialogue(rules, name)
+    return compiled
+
+
+def rotation_reply(character):
+    """Next of the NPC's own messages, formatted once per message list."""
+    if not character.msgs:
+        return format_reply(character.name, L.NPC_NO_MESSAGE)
+    key = (character.name, tuple(character.msgs))
+    replies = _ROTATIONS.get(key)
+    if replies is None:
+        replies = tuple(format_reply(character.name, msg) for msg in character.msgs)
+        _ROTATIONS[key] = replies
+    return replies[character.next_msg_index()]
+
+
+class ReactiveDialogue:
+    """``on_talk`` handler answering from a compiled dialogue table.
+
+    Only the dialogue id is stored, so handlers pickle with the world
+    templates that reference them.
+    """
+
+    __slots__ = ("dialogue_id",)
+
+    def __init__(self, dialogue_id):
+        self.dialogue_id = dialogue_id
+
+    def __getstate__(self):
+        return self.dialogue_id
+
+    def __setstate__(self, state):
+        self.dialogue_id = state
+
+    def __call__(self, game, character):
+        player = game.player
+        mask, table = _compiled(self.dialogue_id, character.name)
+        reply = table[(player.get_stability_bucket(), player.flags & mask)]
+        if reply is None:
+            reply = rotation_reply(character)
+        return reply
+
+    def __repr__(self):
+        return f"ReactiveDialogue({self.dialogue_id!r})"
+
+
+# Handlers referenced by name ("on_talk") in the world definitions.
+REACTIVE_HANDLERS = {
+    dialogue_id: ReactiveDialogue(dialogue_id)
+    for dialogue_id, _name in DIALOGUES
+}
@@ -25,6 +25,10 @@ class Enemy:
         self.hp = max(0, self.hp - amount)
         return amount
 
+    def clone(self) -> "Enemy":
+        """Return a fresh enemy with the same stats (session overlay)."""
+        return Enemy(self.name, self.hp, self.attack)
+
     def __str__(self) -> str:
         return L.ENEMY_STR_TEMPLATE.format(
             name=self.name,
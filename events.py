@@ -0,0 +1,185 @@
+"""Typed game events and the bus that carries them.
+
+Game code publishes an event when something a quest may depend on changes
+(a player flag, the current room, an item pickup, a defeated enemy, a
+conversation, a quest state). Subscribers register for an event type and,
+optionally, a key (the flag name, room name, quest id...), so a publish
+only reaches the callbacks that asked for that exact change.
+
+Quest rules (see RuleSet) do not react immediately: an event only marks the
+rules that subscribed to it, and the game runs the marked rules once per
+quest phase, in table order.
+"""
+
+# pylint: disable=too-few-public-methods
+
+from functools import partial
+from heapq import heappop, heappush
+
+from prompt import delegate
+
+
+class FlagChanged:
+    """A player flag took a new value; ``key`` is the flag name."""
+
+    __slots__ = ("key", "value")
+
+    def __init__(self, name, value):
+        self.key = name
+        self.value = value
+
+
+class RoomEntered:
+    """The player's current room changed; ``key`` is the room name."""
+
+    __slots__ = ("key", "room")
+
+    def __init__(self, room):
+        self.key = room.name
+        self.room = room
+
+
+class ItemTaken:
+    """The player picked up an item; ``key`` is the item name."""
+
+    __slots__ = ("key", "item")
+
+    def __init__(self, item):
+        self.key = item.name
+        self.item = item
+
+
+class EnemyDefeated:
+    """An enemy was defeated in combat; ``key`` is its lowercased name."""
+
+    __slots__ = ("key", "enemy")
+
+    def __init__(self, enemy):
+        self.key = enemy.name.lower()
+        self.enemy = enemy
+
+
+class NpcTalked:
+    """The player talked to a character; ``key`` is its lowercased name."""
+
+    __slots__ = ("key", "character")
+
+    def __init__(self, character):
+        self.key = character.name.lower()
+        self.character = character
+
+
+class QuestStateChanged:
+    """A quest changed state; ``key`` is the quest id."""
+
+    __slots__ = ("key", "state")
+
+    def __init__(self, quest):
+        self.key = quest.quest_id
+        self.state = quest.state
+
+
+class EventBus:
+    """Dispatch events to the callbacks subscribed to (type, key).
+
+    A callback subscribed with ``key=None`` receives every event of its type.
+    """
+
+    def __init__(self):
+        self._subscribers = {}
+
+    def subscribe(self, event_type, key, callback):
+        """Call ``callback(event)`` for each matching published event."""
+        self._subscribers.setdefault((event_type, key), []).append(callback)
+
+    def unsubscribe(self, event_type, key, callback):
+        """Remove a callback registered with subscribe()."""
+        callbacks = self._subscribers.get((event_type, key))
+        if callbacks and callback in callbacks:
+            callbacks.remove(callback)
+            if not callbacks:
+                del self._subscribers[(event_type, key)]
+
+    def publish(self, event):
+        """Deliver an event to its keyed subscribers, then to wildcard ones."""
+        event_type = type(event)
+        callbacks = self._subscribers.get((event_type, event.key))
+        if callbacks:
+            for callback in tuple(callbacks):
+                callback(event)
+        if event.key is not None:
+            callbacks = self._subscribers.get((event_type, None))
+            if callbacks:
+                for callback in tuple(callbacks):
+                    callback(event)
+
+
+class Rule:
+    """A quest rule: an action and the (event type, key) pairs that wake it.
+
+    ``action`` takes no argument and may be a routine (it can prompt).
+    """
+
+    __slots__ = ("action", "triggers")
+
+    def __init__(self, action, *triggers):
+        self.action = action
+        self.triggers = triggers
+
+
+class RuleSet:
+    """The active world's quest rules, run only when an event woke them.
+
+    ``install`` replaces the table and wakes every rule once, so conditions
+    that already hold are picked up; afterwards a rule only runs again when
+    one of its triggers is published. ``drain`` runs the woken rules in
+    table order, including rules woken while draining.
+    """
+
+    def __init__(self, bus):
+        self.bus = bus
+        self.rules = ()
+        self._woken = []
+        self._queued = set()
+        self._subscriptions = []
+
+    def install(self, rules):
+        """Replace the rule table and subscribe it to its triggers."""
+        for event_type, key, callback in self._subscriptions:
+            self.bus.unsubscribe(event_type, key, callback)
+        self._subscriptions = []
+        self.rules = tuple(rules)
+
+        positions = {}
+        for position, rule in enumerate(self.rules):
+            for trigger in rule.triggers:
+                positions.setdefault(trigger, []).append(position)
+        for (event_type, key), woken in positions.items():
+            callback = partial(self._wake, tuple(woken))
+            self.bus.subscribe(event_type, key, callback)
+            self._subscriptions.append((event_type, key, callback))
+
+        self._woken = list(range(len(self.rules)))
+        self._queued = set(self._woken)
+
+    def woken(self):
+        """Positions of the rules waiting to run, in order."""
+        return tuple(sorted(self._woken))
+
+    def set_woken(self, positions):
+        """Replace the waiting rules (restoring a snapshot)."""
+        self._woken = sorted(positions)
+        self._queued = set(self._woken)
+
+    def _wake(self, positions, _event):
+        for position in positions:
+            if position not in self._queued:
+                self._queued.add(position)
+                heappush(self._woken, position)
+
+    def drain(self):
+        """Routine: run the woken rules, lowest table position first."""
+        while self._woken:
+            position = heappop(self._woken)
+            self._queued.discard(position)
+            yield from delegate(self.rules[position].action())
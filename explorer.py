@@ -0,0 +1,403 @@
+"""Story branch explorer: every reachable ending, every dead end.
+
+Starting from a new game (fixed seed), the explorer plays every useful
+command of each state: ``go`` through each exit, ``talk``/``take`` by
+index, ``use`` of usable items, ``attack`` of the enemies present and
+``look``. Whenever a command stops on a closed question (``choice_intro``,
+``merchant_dialogue``, ``yara_world2_choice``, ``_handle_karn_aftermath``,
+the Aurelion, Seren Taal and Nexus choices...), each answer is a branch
+of its own; fights are won with the debug answer ``b``.
+
+States between two commands are kept as snapshots (snapshot.py) and
+deduplicated by a hash of the world, room, player flags, stability, the
+current world's key items and quest states: the order in which things
+were done does not matter, only where it led. A game entering a new
+world is deduplicated by the answers given so far instead, so each
+branch of the story enters each world once. The search runs breadth
+first, level by level, and each level's states are expanded in a
+process pool.
+
+The report lists the endings reached (with the shortest transcript to
+each), the choice points met, and the dead ends: states from which no
+ending can be reached any more.
+
+Usage:
+    python explorer.py                   # all CPUs
+    python explorer.py --workers 0       # in this process
+    python explorer.py --transcripts out/   # one transcript per ending
+"""
+
+import argparse
+import hashlib
+import os
+import sys
+import time
+from pathlib import Path
+
+import labels as L
+from game import Game
+from harness import headless_game, task_mapper
+from output import BufferedSink
+from world import get_world_template
+
+DEFAULT_SEED = 0
+DEFAULT_MAX_STATES = 100_000
+PLAYER_NAME = "Explorer"
+FIGHT_ANSWER = "b"  # wins a fight at once (see Game.resolve_combat)
+MAX_PROMPTS = 64  # answers to a single command before it is declared stuck
+CHUNK_SIZE = 16
+
+_KEY_ITEMS = {}
+# State keys this process already returned with a snapshot (see expand).
+_SEEN = set()
+
+# Ending name -> text that identifies it in the game output.
+ENDINGS = (
+    ("harmonie", L.WORLD4_ENDING_HARMONY[-1]),
+    ("domination", L.WORLD4_ENDING_DOMINATION[-1]),
+    ("renoncement", L.WORLD4_ENDING_RENOUNCE[-1]),
+    ("tyrannie", L.SEREN_ALLIANCE_ENDING),
+    ("sans cristal", L.MERCHANT_NO_CRYSTAL_TEXT),
+    ("effondrement", L.MENTAL_COLLAPSE_TEXT),
+    ("mort au combat", L.COMBAT_PLAYER_DEAD),
+    ("capture", L.GAME_LOSE_TEXT),
+    ("victoire", L.GAME_WIN_TEXT),
+)
+UNKNOWN_ENDING = "autre"
+STUCK = "bloque"  # a command that keeps prompting
+
+
+def ending_of(text):
+    """Name of the ending whose text appears in ``text``."""
+    for name, marker in ENDINGS:
+        if marker.strip() in text:
+            return name
+    return UNKNOWN_ENDING
+
+
+def candidate_commands(game):
+    """Commands worth trying in the current state."""
+    player = game.player
+    room = player.current_room
+    commands = [f"go {direction}" for direction, target in room.exits.items() if target]
+    commands += [f"talk {index}" for index in range(1, len(room.characters) + 1)]
+    commands += [f"take {index}" for index in range(1, len(room.inventory) + 1)]
+    commands += [
+        f"use {index}" for index, item in enumerate(player.inventory, start=1) if item.usable
+    ]
+    commands += [f"attack {enemy.name}" for enemy in room.enemies]
+    commands.append("look")
+    return commands
+
+
+def branch_answers(choices):
+    """Answers to try for a closed question (digits only when offered)."""
+    digits = [choice for choice in choices if choice.isdigit()]
+    return digits or list(choices)
+
+
+def choice_point(game):
+    """Name of the routine waiting in ``ask`` (the choice point), if any."""
+    routine = game.pending_routine
+    caller = None
+    while routine is not None and hasattr(routine, "gi_code"):
+        if routine.gi_code.co_name == "ask":
+            return caller
+        caller = routine.gi_code.co_name
+        routine = routine.gi_yieldfrom
+    return None
+
+
+def key_items(world_id):
+    """Names of the items of a world that have no stat effect, cached."""
+    names = _KEY_ITEMS.get(world_id)
+    if names is None:
+        template = get_world_template(world_id)
+        names = _KEY_ITEMS[world_id] = frozenset(
+            item.name
+            for room in template.rooms.values()
+            for item in room.inventory
+            if not item.effect_type
+        )
+    return names
+
+
+def _digest(value):
+    """Digest of a tuple of ints, strings and None.
+
+    ``repr`` rather than marshal: marshal's output depends on how the
+    strings are shared in memory, so equal keys could differ between
+    worker processes.
+    """
+    return hashlib.blake2b(repr(value).encode("utf-8"), digest_size=16).digest()
+
+
+def state_key(game):
+    """Digest of the story state: world, room, flags, stability, the current
+    world's key items in hand and quest progress.
+
+    HP, attack and stat items are left out, since fights are won outright
+    (``FIGHT_ANSWER``), and so are the items of the worlds left behind:
+    what they changed for the story is in the flags.
+    """
+    player = game.player
+    world = game.world
+    current_items = key_items(world.world_id)
+    quests = getattr(game, f"world{world.world_id}_quests")
+    key = (
+        world.world_id,
+        player.current_room.name,
+        player.flags,
+        player.velyra_method,
+        player.stability,
+        tuple(sorted(item.name for item in player.inventory if item.name in current_items)),
+        tuple(
+            (quest_id, quest.state, len(quest.completed_objectives))
+            for quest_id, quest in quests.items()
+        ),
+    )
+    return _digest(key)
+
+
+def restore(seed, snapshot):
+    """Game rebuilt from ``snapshot`` (a new game if None), with its sink."""
+    sink = BufferedSink()
+    if snapshot is None:
+        game = headless_game(seed, sink)
+        game.start()
+    else:
+        game = Game.load(snapshot)
+        game.set_output(sink)
+    sink.flush()
+    return game, sink
+
+
+def _settle(game, start_world, text):
+    """Outcome head of a game no longer waiting on a prompt: ("state", world,
+    key, snapshot or None) or, if it ended, ("end", world, ending, None)."""
+    world_id = game.current_world
+    if game.finished:
+        return ("end", world_id, ending_of(text), None)
+    key = state_key(game)
+    if world_id == start_world and key in _SEEN:
+        return ("state", world_id, key, None)
+    if world_id == start_world:
+        _SEEN.add(key)
+    return ("state", world_id, key, game.save())
+
+
+def _follow(game, sink, branch, pending, points):
+    """Play ``branch`` (inputs, choices) on ``game`` through its prompts.
+
+    The first answer of each choice goes on with ``game``; the others are
+    pushed on ``pending``. Returns (outcome head, inputs, choices, text).
+    """
+    inputs, made = branch
+    for line in inputs:
+        game.submit(line)
+    text = sink.flush()
+    while game.pending_prompt is not None and not game.finished:
+        if len(inputs) > MAX_PROMPTS:
+            return ("end", game.current_world, STUCK, None), inputs, made, text
+        answer = FIGHT_ANSWER
+        if game.pending_prompt.choices:
+            point = (game.current_world, choice_point(game))
+            points.add(point)
+            answer, *others = branch_answers(game.pending_prompt.choices)
+            pending.extend((inputs + [other], made + (point + (other,),)) for other in others)
+            made += (point + (answer,),)
+        inputs = inputs + [answer]
+        game.submit(answer)
+        text += sink.flush()
+    return None, inputs, made, text
+
+
+def expand(task):  # pylint: disable=too-many-locals
+    """Play every candidate command of one state.
+
+    ``task`` is (seed, snapshot, path, choices), ``choices`` being the
+    (world, choice point, answer) triples made so far. Returns (outcomes,
+    choice points met): outcomes are ("state", world, key, snapshot, path,
+    choices) for the states reached and ("end", world, ending, None, path,
+    choices) for the games that ended.
+
+    A game is only rebuilt from the snapshot for each command and for
+    each answer but the first of a choice: the first answer goes on with
+    the game already at the prompt, and the first command reuses the game
+    loaded to list the commands. A state this process already returned
+    comes without its snapshot (None): the caller, which handles the tasks
+    in order, knows it by then. States entering a new world are always
+    saved, since the caller keys them by their choices instead.
+    """
+    seed, snapshot, path, choices = task
+    if snapshot is None:
+        spare, start_world, commands = None, 0, [PLAYER_NAME]
+    else:
+        spare = restore(seed, snapshot)
+        start_world = spare[0].current_world
+        commands = candidate_commands(spare[0])
+    outcomes = []
+    points = set()
+    for command in commands:
+        pending = [([command], choices)]
+        while pending:
+            game, sink = spare or restore(seed, snapshot)
+            spare = None
+            head, inputs, made, text = _follow(game, sink, pending.pop(), pending, points)
+            outcomes.append(
+                (head or _settle(game, start_world, text)) + (path + tuple(inputs), made)
+            )
+    return outcomes, points
+
+
+def entry_key(world_id, choices):
+    """Digest identifying a branch (its choices so far) entering a world."""
+    return _digest((world_id, choices))
+
+
+class ExplorationReport:  # pylint: disable=too-many-instance-attributes
+    """Result of an exploration: states, endings, choice points, dead ends."""
+
+    def __init__(self):
+        self.paths = {}  # state key -> shortest path
+        self.edges = {}  # state key -> keys of the states it leads to
+        self.endings = {}  # ending -> {choices: shortest path}
+        self.ending_states = set()  # keys of the states one command away from an end
+        self.choice_points = set()
+        self.branches = set()  # choices of every branch that entered a world
+        self.unexplored = 0
+        self.elapsed = 0.0
+
+    def add_ending(self, parent, ending, path, choices):
+        """Record a game that ended on ``ending``."""
+        branches = self.endings.setdefault(ending, {})
+        if choices not in branches or len(path) < len(branches[choices]):
+            branches[choices] = path
+        self.ending_states.add(parent)
+
+    def add_expansion(self, parent, parent_world, result, max_states):
+        """Record what ``expand`` returned for ``parent``; return the new
+        states to expand, as (key, world, snapshot, choices)."""
+        outcomes, points = result
+        self.choice_points.update(points)
+        children = self.edges.setdefault(parent, set())
+        new_states = []
+        for kind, world_id, key, snapshot, path, choices in outcomes:
+            if kind == "end":
+                self.add_ending(parent, key, path, choices)
+                continue
+            if world_id != parent_world:
+                key = entry_key(world_id, choices)
+                self.branches.add(choices)
+            children.add(key)
+            if key in self.paths:
+                continue
+            self.paths[key] = path
+            if len(self.paths) <= max_states:
+                new_states.append((key, world_id, snapshot, choices))
+            else:
+                self.unexplored += 1
+        return new_states
+
+    def shortest(self, ending):
+        """Shortest transcript reaching ``ending``."""
+        return min(self.endings[ending].values(), key=len)
+
+    def dead_ends(self):
+        """Keys of the explored states from which no ending is reachable."""
+        parents = {}
+        for parent, children in self.edges.items():
+            for child in children:
+                parents.setdefault(child, set()).add(parent)
+        alive = set(self.ending_states)
+        alive.update(key for key in self.paths if key not in self.edges)  # not expanded
+        frontier = list(alive)
+        while frontier:
+            for parent in parents.get(frontier.pop(), ()):
+                if parent not in alive:
+                    alive.add(parent)
+                    frontier.append(parent)
+        return [key for key in self.edges if key not in alive]
+
+    def format(self, examples=3):
+        """Text report."""
+        lines = [
+            f"{len(self.paths)} states, {len(self.branches)} world entries explored "
+            f"in {self.elapsed:.1f} s"
+            + (f" ({self.unexplored} states left unexplored)" if self.unexplored else ""),
+            "",
+            "Endings:",
+        ]
+        for ending, branches in sorted(self.endings.items()):
+            lines.append(
+                f"  {ending:<16} {len(branches):>5} branches, "
+                f"shortest {len(self.shortest(ending))} inputs"
+            )
+        lines += ["", "Choice points:"]
+        for world_id, name in sorted(self.choice_points, key=lambda p: (p[0], str(p[1]))):
+            lines.append(f"  world {world_id}: {name}")
+        dead = sorted(self.dead_ends(), key=lambda key: len(self.paths[key]))
+        lines += ["", f"Dead ends: {len(dead)}"]
+        for key in dead[:examples]:
+            lines.append("  " + " | ".join(self.paths[key]))
+        return "\n".join(lines)
+
+
+def explore(seed=DEFAULT_SEED, workers=None, max_states=DEFAULT_MAX_STATES):
+    """Explore the story from a new game; return an ExplorationReport.
+
+    Within a world, states are deduplicated by ``state_key``. A game
+    entering a new world is deduplicated by its choices instead: each
+    branch enters each world once, through its shortest path, so the
+    optional actions of the worlds left behind do not multiply the states
+    of the next ones.
+    """
+    report = ExplorationReport()
+    start = time.perf_counter()
+    _SEEN.clear()  # before the workers fork
+    report.paths[b""] = ()
+    level = [(b"", 0, None, ())]
+    with task_mapper(workers, CHUNK_SIZE) as mapper:
+        while level:
+            tasks = [
+                (seed, snapshot, report.paths[key], choices)
+                for key, _world_id, snapshot, choices in level
+            ]
+            next_level = []
+            for (parent, parent_world, _snapshot, _choices), result in zip(
+                level, mapper(expand, tasks)
+            ):
+                next_level += report.add_expansion(parent, parent_world, result, max_states)
+            level = next_level
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def write_transcripts(report, directory):
+    """One benchmark-style transcript per ending, in ``directory``."""
+    os.makedirs(directory, exist_ok=True)
+    for ending in report.endings:
+        name = ending.replace(" ", "_")
+        path = report.shortest(ending)
+        text = f"# Fin : {ending} (explorer.py)\n" + "\n".join(path) + "\n"
+        Path(directory, f"{name}.txt").write_text(text, encoding="utf-8")
+
+
+def main(argv=None):
+    """Entry point: explore and print the reachability report."""
+    parser = argparse.ArgumentParser(description="Vigilant story branch explorer")
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED)
+    parser.add_argument("--workers", type=int, default=None, help="0: no process pool")
+    parser.add_argument("--max-states", type=int, default=DEFAULT_MAX_STATES)
+    parser.add_argument("--transcripts", default=None, help="write one transcript per ending")
+    args = parser.parse_args(argv)
+
+    report = explore(args.seed, args.workers, args.max_states)
+    print(report.format())
+    if args.transcripts:
+        write_transcripts(report, args.transcripts)
+    return 1 if report.dead_ends() or UNKNOWN_ENDING in report.endings else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
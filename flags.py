@@ -0,0 +1,84 @@
+"""Declared boolean flags stored as the bits of a single integer.
+
+A FlagRegistry gives each declared name one bit and installs one Flag
+descriptor per name on the owning class (``FLAGS.install(Player)``), so
+``player.met_ralen = True`` keeps working while the whole narrative state
+lives in ``player.flags`` (an int): cheap to copy, hash, compare and diff.
+
+Setting a flag to a new value calls ``owner.flag_changed(name, value)``;
+setting it to its current value does nothing.
+"""
+
+
+class Flag:
+    """Attribute-style access to one bit of ``owner.flags``."""
+
+    __slots__ = ("name", "mask")
+
+    def __init__(self, name, mask):
+        self.name = name
+        self.mask = mask
+
+    def __get__(self, owner, owner_type=None):
+        if owner is None:
+            return self
+        return bool(owner.flags & self.mask)
+
+    def __set__(self, owner, value):
+        bits = owner.flags
+        updated = bits | self.mask if value else bits & ~self.mask
+        if updated != bits:
+            owner.flags = updated
+            owner.flag_changed(self.name, bool(value))
+
+
+class FlagRegistry:
+    """Ordered flag names and their bit masks.
+
+    Examples:
+        >>> registry = FlagRegistry(("met_ralen", "has_crystal"))
+        >>> registry.mask("has_crystal")
+        2
+        >>> registry.names_set(3)
+        ['met_ralen', 'has_crystal']
+        >>> registry.diff(1, 2)
+        {'met_ralen': False, 'has_crystal': True}
+    """
+
+    def __init__(self, names):
+        self.names = tuple(names)
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Duplicate flag name")
+        self.masks = {name: 1 << bit for bit, name in enumerate(self.names)}
+
+    def __contains__(self, name):
+        return name in self.masks
+
+    def mask(self, name):
+        """Bit mask of a declared flag (KeyError if unknown)."""
+        return self.masks[name]
+
+    def install(self, cls):
+        """Add one Flag descriptor per declared name to ``cls``; return ``cls``.
+
+        Raises TypeError if ``cls`` already defines one of the names.
+        """
+        clashes = [name for name in self.names if name in cls.__dict__]
+        if clashes:
+            raise TypeError(f"{cls.__name__} already defines {clashes}")
+        for name in self.names:
+            setattr(cls, name, Flag(name, self.masks[name]))
+        return cls
+
+    def names_set(self, bits):
+        """Names of the flags set in ``bits``, in declaration order."""
+        return [name for name, mask in self.masks.items() if bits & mask]
+
+    def diff(self, before, after):
+        """Map each flag that differs between two bitfields to its new value."""
+        changed = before ^ after
+        return {
+            name: bool(after & mask)
+            for name, mask in self.masks.items()
+            if changed & mask
+        }
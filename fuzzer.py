@@ -0,0 +1,336 @@
+"""Random-agent fuzzer: headless games in worker processes.
+
+Each game is a fresh ``harness.headless_game`` with its output discarded, played by
+a random agent: commands drawn from the registered ones with plausible
+parameters (exits, in-range and one-past-the-end indexes, enemies and
+quest ids present), answers drawn from the choices a prompt offers, and
+mostly ``b`` to the fight questions so the story moves on.
+
+Two kinds of failure are collected:
+
+- ``swallowed``: a command's action raised and the game only printed
+  COMMAND_EXEC_ERROR (reported through ``Game.on_command_error``);
+- ``crash``: an exception escaped ``Game.submit``.
+
+Failures are grouped by signature (kind, exception type, innermost
+frame). The shortest transcript of each is then minimized (delta
+debugging over its input lines) and replayed from its seed to check that
+it still fails the same way. Written transcripts use the benchmark
+format (player name first, then one input per line), with the seed and
+the traceback in the header comments, so ``benchmark.play_transcript``
+replays them too.
+
+Usage:
+    python fuzzer.py --games 20000                 # all CPUs
+    python fuzzer.py --games 500 --workers 0       # in this process
+    python fuzzer.py --out fuzz/                   # write minimized transcripts
+    python fuzzer.py --replay fuzz/crash-1.txt     # replay one of them
+"""
+
+import argparse
+import os
+import random
+import sys
+import time
+import traceback
+from itertools import accumulate
+from pathlib import Path
+
+from benchmark import load_transcript
+from harness import headless_game, task_mapper
+from output import NullSink
+
+DEFAULT_GAMES = 2000
+DEFAULT_MAX_INPUTS = 300
+DEFAULT_SEED = 0
+BATCH_SIZE = 50
+PLAYER_NAME = "Fuzz"
+SECONDS_PER_INPUT = 6  # a human player's pace, for the play-time estimate
+FIGHT_ANSWERS = ("b", "b", "b", "a", "42", "")
+
+# Relative frequency of each command; "quit" is left out (it only ends the game).
+COMMAND_WEIGHTS = (
+    ("go", 8), ("talk", 4), ("take", 3), ("use", 2), ("drop", 1), ("attack", 2),
+    ("look", 1), ("back", 1), ("check", 1), ("status", 1), ("history", 1),
+    ("map", 1), ("help", 1), ("quests", 1), ("quest", 1), ("activate", 1),
+    ("rewards", 1),
+)
+_COMMANDS = tuple(name for name, _weight in COMMAND_WEIGHTS)
+_CUMULATIVE = tuple(accumulate(weight for _name, weight in COMMAND_WEIGHTS))
+DIRECTION_WORDS = ("N", "S", "E", "O", "U", "D", "nord", "ouest", "x")
+# Commands taking an index: number of valid indexes for the player (one
+# past the end is drawn too).
+INDEX_COUNTS = {
+    "talk": lambda player: len(player.current_room.characters),
+    "take": lambda player: len(player.current_room.inventory),
+    "use": lambda player: len(player.inventory),
+    "drop": lambda player: len(player.inventory),
+    "quest": lambda player: len(player.quest_manager.quests),
+    "activate": lambda player: len(player.quest_manager.quests),
+}
+
+SWALLOWED = "swallowed"
+CRASH = "crash"
+
+
+def random_command(game, rng):
+    """A random command line for the current state."""
+    name = rng.choices(_COMMANDS, cum_weights=_CUMULATIVE)[0]
+    player = game.player
+    room = player.current_room
+    if name == "go":
+        exits = [direction for direction, target in room.exits.items() if target]
+        if exits and rng.random() < 0.8:
+            return f"go {rng.choice(exits)}"
+        return f"go {rng.choice(DIRECTION_WORDS)}"
+    if name == "attack":
+        return f"attack {rng.choice(room.enemies).name if room.enemies else 'ombre'}"
+    if name in INDEX_COUNTS:
+        return f"{name} {rng.randint(1, INDEX_COUNTS[name](player) + 1)}"
+    return name
+
+
+def random_answer(prompt, rng):
+    """A random answer to a pending prompt."""
+    if prompt.choices:
+        return rng.choice(prompt.choices)
+    return rng.choice(FIGHT_ANSWERS)
+
+
+def signature(kind, error):
+    """(kind, exception type, innermost frame) identifying a failure."""
+    frame = traceback.extract_tb(error.__traceback__)[-1]
+    return (
+        kind,
+        type(error).__name__,
+        f"{os.path.basename(frame.filename)}:{frame.lineno} in {frame.name}",
+    )
+
+
+class FailureCollector:
+    """``Game.on_command_error`` hook collecting failures by signature."""
+
+    def __init__(self):
+        self.failures = {}  # signature -> traceback text, in order of appearance
+
+    def __call__(self, _line, error):
+        self.record(SWALLOWED, error)
+
+    def record(self, kind, error):
+        """Keep the first traceback of ``error``'s signature."""
+        key = signature(kind, error)
+        if key not in self.failures:
+            self.failures[key] = "".join(traceback.format_exception(error))
+
+
+def new_game(seed, collector):
+    """A headless game hooked to ``collector``, not started yet."""
+    game = headless_game(seed, NullSink())
+    game.on_command_error = collector
+    return game
+
+
+def play(seed, max_inputs):
+    """Play one random game; return (inputs, {signature: (traceback, length)}).
+
+    ``inputs`` starts with the player name, like a benchmark transcript.
+    ``length`` is the number of inputs played when the failure occurred;
+    the game goes on after a swallowed error and stops on a crash. The
+    agent's choices come from its own random stream (seeded like the
+    game), so the game's stream only depends on the inputs it is fed.
+    """
+    rng = random.Random(seed)
+    collector = FailureCollector()
+    game = new_game(seed, collector)
+    inputs = [PLAYER_NAME]
+    failures = {}
+    try:
+        prompt = game.start(PLAYER_NAME)
+        while not game.finished and len(inputs) <= max_inputs:
+            if prompt is not None:
+                line = random_answer(prompt, rng)
+            else:
+                line = random_command(game, rng)
+            inputs.append(line)
+            prompt = game.submit(line)
+            if len(collector.failures) > len(failures):
+                for key, text in collector.failures.items():
+                    failures.setdefault(key, (text, len(inputs)))
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        collector.record(CRASH, error)
+        for key, text in collector.failures.items():
+            failures.setdefault(key, (text, len(inputs)))
+    return inputs, failures
+
+
+def replay(seed, inputs):
+    """Feed ``inputs`` (player name first) to a new game; return
+    {signature: traceback} of its failures."""
+    collector = FailureCollector()
+    game = new_game(seed, collector)
+    try:
+        game.start(inputs[0] if inputs else None)
+        for line in inputs[1:]:
+            if game.finished:
+                break
+            game.submit(line)
+    except Exception as error:  # pylint: disable=broad-exception-caught
+        collector.record(CRASH, error)
+    return collector.failures
+
+
+def minimize(seed, inputs, expected):
+    """Shortest sub-list of ``inputs`` found that still fails with ``expected``.
+
+    Delta debugging: try to drop chunks of the input, halving the chunk
+    size each time nothing can be dropped. The player name (first input)
+    is always kept.
+    """
+    name, inputs = inputs[0], list(inputs[1:])
+
+    def fails(candidate):
+        return expected in replay(seed, [name] + candidate)
+
+    chunk = max(len(inputs) // 2, 1)
+    while True:
+        start = 0
+        removed = False
+        while start < len(inputs):
+            candidate = inputs[:start] + inputs[start + chunk:]
+            if fails(candidate):
+                inputs = candidate
+                removed = True
+            else:
+                start += chunk
+        if chunk == 1 and not removed:
+            return [name] + inputs
+        if not removed:
+            chunk = max(chunk // 2, 1)
+
+
+def fuzz_batch(task):
+    """Play ``count`` games from ``first_seed``; return (games, inputs, failures).
+
+    ``failures`` maps each signature to (seed, inputs, traceback) of its
+    shortest transcript in the batch.
+    """
+    first_seed, count, max_inputs = task
+    played = 0
+    failures = {}
+    for seed in range(first_seed, first_seed + count):
+        inputs, found = play(seed, max_inputs)
+        played += len(inputs)
+        for key, (text, length) in found.items():
+            known = failures.get(key)
+            if known is None or length < len(known[1]):
+                failures[key] = (seed, inputs[:length], text)
+    return count, played, failures
+
+
+def minimize_failure(task):
+    """Minimize one (signature, (seed, inputs, traceback)) failure."""
+    key, (seed, inputs, text) = task
+    shorter = minimize(seed, inputs, key)
+    return key, (seed, shorter, replay(seed, shorter).get(key, text))
+
+
+class FuzzReport:
+    """Result of a fuzzing run."""
+
+    def __init__(self):
+        self.games = 0
+        self.inputs = 0
+        self.failures = {}  # signature -> (seed, minimized inputs, traceback)
+        self.elapsed = 0.0
+
+    def merge(self, failures):
+        """Keep the shortest transcript of each signature."""
+        for key, found in failures.items():
+            known = self.failures.get(key)
+            if known is None or len(found[1]) < len(known[1]):
+                self.failures[key] = found
+
+    def format(self):
+        """Text report."""
+        hours = self.inputs * SECONDS_PER_INPUT / 3600
+        lines = [
+            f"{self.games} games, {self.inputs} inputs in {self.elapsed:.1f} s "
+            f"(~{hours:.0f} h of play at {SECONDS_PER_INPUT} s per input)",
+            f"{len(self.failures)} distinct failures",
+        ]
+        for (kind, error, where), (seed, inputs, _text) in sorted(self.failures.items()):
+            lines.append(f"  {kind:<9} {error} at {where}: seed {seed}, {len(inputs)} inputs")
+        return "\n".join(lines)
+
+
+def fuzz(games=DEFAULT_GAMES, workers=None, max_inputs=DEFAULT_MAX_INPUTS, seed=DEFAULT_SEED):
+    """Play ``games`` random games, minimize the failures; return a FuzzReport."""
+    report = FuzzReport()
+    start = time.perf_counter()
+    tasks = [
+        (first, min(BATCH_SIZE, seed + games - first), max_inputs)
+        for first in range(seed, seed + games, BATCH_SIZE)
+    ]
+    with task_mapper(workers) as mapper:
+        for count, played, failures in mapper(fuzz_batch, tasks):
+            report.games += count
+            report.inputs += played
+            report.merge(failures)
+        report.failures = dict(mapper(minimize_failure, list(report.failures.items())))
+    report.elapsed = time.perf_counter() - start
+    return report
+
+
+def write_failures(report, directory):
+    """One transcript per failure, in ``directory``; return their paths."""
+    os.makedirs(directory, exist_ok=True)
+    paths = []
+    for number, ((kind, error, where), (seed, inputs, text)) in enumerate(
+        sorted(report.failures.items()), start=1
+    ):
+        header = [f"# Fuzz : {kind} {error} at {where} (fuzzer.py)", f"# seed: {seed}"]
+        header += ["# " + line for line in text.rstrip("\n").splitlines()]
+        path = Path(directory, f"{kind}-{number}.txt")
+        path.write_text("\n".join(header + inputs) + "\n", encoding="utf-8")
+        paths.append(path)
+    return paths
+
+
+def read_seed(path):
+    """Seed recorded in a fuzzer transcript header."""
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            if line.startswith("# seed:"):
+                return int(line.split(":", 1)[1])
+    raise ValueError(f"No seed in {path}")
+
+
+def main(argv=None):
+    """Entry point: fuzz (or replay a transcript) and print the report."""
+    parser = argparse.ArgumentParser(description="Vigilant random-agent fuzzer")
+    parser.add_argument("--games", type=int, default=DEFAULT_GAMES)
+    parser.add_argument("--workers", type=int, default=None, help="0: no process pool")
+    parser.add_argument("--max-inputs", type=int, default=DEFAULT_MAX_INPUTS)
+    parser.add_argument("--seed", type=int, default=DEFAULT_SEED, help="seed of the first game")
+    parser.add_argument("--out", default=None, help="write one transcript per failure")
+    parser.add_argument("--replay", default=None, help="replay a fuzzer transcript")
+    args = parser.parse_args(argv)
+
+    if args.replay:
+        failures = replay(read_seed(args.replay), load_transcript(args.replay))
+        for text in failures.values():
+            print(text)
+        if not failures:
+            print("no failure")
+        return 1 if failures else 0
+
+    report = fuzz(args.games, args.workers, args.max_inputs, args.seed)
+    print(report.format())
+    if args.out:
+        for path in write_failures(report, args.out):
+            print(path)
+    return 1 if report.failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -6,6 +6,11 @@
 # Import modules
 
 
+import os
+import random
+import secrets
+from concurrent.futures import ThreadPoolExecutor
+
 from world import (
     World,
     PRISON,
@@ -18,14 +23,73 @@ from world import (
     ANCIENT_NEXUS,
 )
 from player import Player
-from character import Character, novaterra_companion_reactive
 from command import Command
 from actions import Actions
 from quest import Quest, STATE_AVAILABLE, STATE_LOCKED, STATE_ACTIVE, STATE_COMPLETED
 import labels as L
 import ai_quiz
+from output import DEFAULT_OUTPUT
+from prompt import Prompt, ask, delegate, run
 from item import Item
-from enemy import Enemy
+from scheduler import NpcScheduler
+from profiler import CommandProfiler
+import snapshot
+from events import (
+    EventBus,
+    RuleSet,
+    Rule,
+    FlagChanged,
+    RoomEntered,
+    ItemTaken,
+    EnemyDefeated,
+    NpcTalked,
+    QuestStateChanged,
+)
+
+
+LAST_WORLD = 4
+
+# Flag set when the player talks to a character, per world (lowercased name).
+TALK_FLAGS = {
+    1: {
+        "ralen": "met_ralen",
+        "ingénieur malek": "met_malek",
+        "marchand": "met_marchand",
+        "yara": "met_yara",
+        "nommera": "met_nommera",
+    },
+    2: {
+        "yara": "velyra_met_leader",
+        "narek": "velyra_narek_resolved",
+    },
+    3: {
+        "citoyen dore": "ap_citizen_spoken",
+        "habitant glitche": "ap_glitch_spoken",
+    },
+    4: {
+        "yara": "novaterra_companion_spoken",
+        "narek": "novaterra_companion_spoken",
+        "le guide": "novaterra_companion_spoken",
+    },
+}
+
+# Shared by all sessions of a process: builds the next world while the
+# final quest runs. Created on first use and dropped in forked children
+# (explorer/fuzzer workers), which do not inherit the parent's threads.
+_PREFETCH_POOL = []
+
+
+def _prefetch_pool():
+    """The process's prefetch pool, created on first use."""
+    if not _PREFETCH_POOL:
+        _PREFETCH_POOL.append(
+            ThreadPoolExecutor(max_workers=2, thread_name_prefix="world-prefetch")
+        )
+    return _PREFETCH_POOL[0]
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_PREFETCH_POOL.clear)
 
 
 class Game:
@@ -34,8 +98,20 @@ class Game:
 
 
     # Constructor
-    def __init__(self):
-        """Initialize the game state containers."""
+    def __init__(self, seed=None, questions=None):
+        """Initialize the game state containers.
+
+        ``seed`` fixes the session's random stream (NPC moves, quiz draws);
+        without it a fresh seed is drawn at setup. Either way the seed used
+        is recorded in ``metadata["seed"]``, so a command transcript plus
+        its seed replays the session exactly.
+
+        ``questions`` replaces the built-in quiz questions, typically with a
+        QuestionBank shared by every session of the process.
+        """
+        self.seed = seed
+        self.rng = random.Random()
+        self.metadata = {}
         self.finished = False
         self.rooms = {}
         self.commands = {}
@@ -47,18 +123,34 @@ class Game:
         self.world4_quests = {}
         self.current_world = 1
         self.input_func = input
+        self.output = DEFAULT_OUTPUT
+        self.quiz = ai_quiz.QuizEngine(questions, rng=self.rng)
+        self.pending_routine = None
+        self.pending_prompt = None
+        self.profiler = None
+        self._profile_sample = None
+        self.journal = None
+        # Called with (command line, exception) when a command's action
+        # raises; the player only sees COMMAND_EXEC_ERROR.
+        self.on_command_error = None
+        self._prefetched = {}
+        self.events = EventBus()
+        self.events.subscribe(NpcTalked, None, self._on_npc_talked)
+        self.quest_rules = RuleSet(self.events)
+        self.npc_scheduler = NpcScheduler(rng=self.rng)
+        self._activated_quest_id = None
 
    # Setup player and starting room
     def setup_player(self, player_name=None):
         """Prompt for the player's name and place them in the starting room."""
         name = player_name
         if not name:
-            name = self.input_func(
+            name = self.read_input(
                 L.PLAYER_NAME_PROMPT.format(default=L.DEFAULT_PLAYER_NAME)
             ).strip()
         if not name:
             name = L.DEFAULT_PLAYER_NAME
-        self.player = Player(name)
+        self.player = Player(name, output=self.output, events=self.events)
         self.player.current_room = self.world.get_starting_room()
 
     # Setup world
@@ -66,25 +158,43 @@ class Game:
         """Create the initial world and load its rooms."""
         self.world = World(world_id=1)
         self.rooms = self.world.rooms
+        self.npc_scheduler.reset(self.rooms.values())
 
     def set_input_provider(self, provider):
         """Override the input function used for prompts and choices."""
         self.input_func = provider
 
+    def read_input(self, text="> "):
+        """Read one line from ``input_func``, recording it in the journal."""
+        line = self.input_func(text)
+        if self.journal is not None:
+            self.journal.record_line(line)
+        return line
+
+    def set_output(self, sink):
+        """Route all game text (player, quests, quiz) to the given output sink."""
+        self.output = sink
+        if self.player is not None:
+            self.player.output = sink
+            for quest in self.player.quest_manager.quests:
+                quest.output = sink
+
     def intro(self):
         """Narration d'introduction et choix initial binaire."""
         for line in L.INTRO_LINES:
-            print(line)
-        print()
+            self.output.emit(line)
+        self.output.emit()
 
     def choice_intro(self):
         """Affiche le choix moral initial et applique les consequences."""
+        run(self.choice_intro_routine(), self.read_input)
+
+    def choice_intro_routine(self):
+        """Routine du choix moral initial (reprise a chaque reponse)."""
         for line in L.CHOICE_ALERT_LINES:
-            print(line)
+            self.output.emit(line)
 
-        choice = ""
-        while choice not in ("1", "2"):
-            choice = self.input_func("> ").strip()
+        choice = yield from ask(("1", "2"))
 
         # Objet narratif commun
         translator = Item(
@@ -92,8 +202,7 @@ class Game:
             L.INTRO_TRANSLATOR_DESC,
             1,
         )
-        self.player.inventory.append(translator)
-        self.player.weight += translator.weight
+        self.player.inventory.add(translator)
 
         if choice == "1":
             self.player.origin_choice = "crew"
@@ -105,10 +214,9 @@ class Game:
                 effect_value=25,
                 usable=True,
             )
-            self.player.inventory.append(kit)
-            self.player.weight += kit.weight
+            self.player.inventory.add(kit)
             for line in L.CHOICE_CREW_LINES:
-                print(line)
+                self.output.emit(line)
         else:
             self.player.origin_choice = "resources"
             cristal = Item(
@@ -116,20 +224,18 @@ class Game:
                 L.INTRO_RESOURCE_CRYSTAL_DESC,
                 1,
             )
-            self.player.inventory.append(cristal)
-            self.player.weight += cristal.weight
+            self.player.inventory.add(cristal)
             self.player.has_crystal = True
             module = Item(
                 L.INTRO_RESOURCE_MODULE_NAME,
                 L.INTRO_RESOURCE_MODULE_DESC,
                 1,
             )
-            self.player.inventory.append(module)
-            self.player.weight += module.weight
+            self.player.inventory.add(module)
             for line in L.CHOICE_RESOURCES_LINES:
-                print(line)
+                self.output.emit(line)
 
-        print(self.get_room_view())
+        self.output.emit(self.get_room_view())
 
     def get_room_view(self, room=None):
         """Retourne la description complete de la salle courante."""
@@ -154,15 +260,15 @@ class Game:
         """Retourne une description alternative du Monde 3 selon les choix narratifs."""
         player = self.player
         if room.name == DISTRICT_OR:
-            if player.ap_choice_infiltrate and getattr(room, "alt_description_infiltrate", None):
-                return room.alt_description_infiltrate
-            if player.ap_choice_reveal and getattr(room, "alt_description_reveal", None):
-                return room.alt_description_reveal
+            if player.ap_choice_infiltrate and room.alt_descriptions.get("infiltrate"):
+                return room.alt_descriptions["infiltrate"]
+            if player.ap_choice_reveal and room.alt_descriptions.get("reveal"):
+                return room.alt_descriptions["reveal"]
         if room.name == NOEUD:
-            if player.ap_break_illusions and getattr(room, "alt_description_break", None):
-                return room.alt_description_break
-            if player.ap_keep_illusions and getattr(room, "alt_description_keep", None):
-                return room.alt_description_keep
+            if player.ap_break_illusions and room.alt_descriptions.get("break"):
+                return room.alt_descriptions["break"]
+            if player.ap_keep_illusions and room.alt_descriptions.get("keep"):
+                return room.alt_descriptions["keep"]
         return room.description
 
     def setup_commands(self):
@@ -221,8 +327,24 @@ class Game:
         self._setup_world1_quests()
 
 
-    def _setup_world1_quests(self):
-        """Initialise les quetes specifiques au Monde 1 (Eridani Prime)."""
+    def _install_world_quests(self, quests, reset=True):
+        """Register a world's quest set and activate its first quest."""
+        manager = self.player.quest_manager
+        if reset:
+            manager.reset()
+        for quest in quests.values():
+            manager.add_quest(quest)
+
+        first = quests[1]
+        first.set_state(STATE_ACTIVE)
+        if first not in manager.active_quests:
+            manager.active_quests.append(first)
+
+        self.player.current_world_quests = list(quests.values())
+        return quests
+
+    def _build_world1_quests(self):
+        """Build the world 1 quest set without installing it."""
         data = L.QUESTS_WORLD1
         quest_1 = Quest(
             title=data[1]["title"],
@@ -253,28 +375,22 @@ class Game:
             state=STATE_LOCKED,
         )
 
-        self.world1_quests = {
+        return {
             1: quest_1,
             2: quest_2,
             3: quest_3,
             4: quest_4,
         }
 
-        for quest in self.world1_quests.values():
-            self.player.quest_manager.add_quest(quest)
-
-        quest_1.set_state(STATE_ACTIVE)
-        if quest_1 not in self.player.quest_manager.active_quests:
-            self.player.quest_manager.active_quests.append(quest_1)
-
-        self.player.current_world_quests = [quest_1, quest_2, quest_3, quest_4]
+    def _setup_world1_quests(self, quests=None):
+        """Initialise les quetes specifiques au Monde 1 (Eridani Prime)."""
+        quests = quests if quests is not None else self._build_world1_quests()
+        self.world1_quests = self._install_world_quests(quests, reset=False)
+        self.quest_rules.install(self._world1_rules())
 
-    def _setup_world2_quests(self):
-        """Initialize world 2 quests and reset the quest manager."""
+    def _build_world2_quests(self):
+        """Build the world 2 quest set without installing it."""
         data = L.QUESTS_WORLD2
-        self.world2_quests = {}
-        self.player.quest_manager.reset()
-
         quest_1 = Quest(
             title=data[1]["title"],
             description=data[1]["description"],
@@ -304,28 +420,22 @@ class Game:
             state=STATE_LOCKED,
         )
 
-        self.world2_quests = {
+        return {
             1: quest_1,
             2: quest_2,
             3: quest_3,
             4: quest_4,
         }
 
-        for quest in self.world2_quests.values():
-            self.player.quest_manager.add_quest(quest)
-
-        quest_1.set_state(STATE_ACTIVE)
-        if quest_1 not in self.player.quest_manager.active_quests:
-            self.player.quest_manager.active_quests.append(quest_1)
-
-        self.player.current_world_quests = [quest_1, quest_2, quest_3, quest_4]
+    def _setup_world2_quests(self, quests=None):
+        """Initialize world 2 quests and reset the quest manager."""
+        quests = quests if quests is not None else self._build_world2_quests()
+        self.world2_quests = self._install_world_quests(quests)
+        self.quest_rules.install(self._world2_rules())
 
-    def _setup_world3_quests(self):
-        """Initialise les quetes du Monde 3 (Aurelion Prime)."""
+    def _build_world3_quests(self):
+        """Build the world 3 quest set without installing it."""
         data = L.QUESTS_WORLD3
-        self.world3_quests = {}
-        self.player.quest_manager.reset()
-
         quest_1 = Quest(
             title=data[1]["title"],
             description=data[1]["description"],
@@ -369,7 +479,7 @@ class Game:
             state=STATE_LOCKED,
         )
 
-        self.world3_quests = {
+        return {
             1: quest_1,
             2: quest_2,
             3: quest_3,
@@ -378,27 +488,15 @@ class Game:
             6: quest_6,
         }
 
-        for quest in self.world3_quests.values():
-            self.player.quest_manager.add_quest(quest)
-
-        if quest_1 not in self.player.quest_manager.active_quests:
-            self.player.quest_manager.active_quests.append(quest_1)
-
-        self.player.current_world_quests = [
-            quest_1,
-            quest_2,
-            quest_3,
-            quest_4,
-            quest_5,
-            quest_6,
-        ]
+    def _setup_world3_quests(self, quests=None):
+        """Initialise les quetes du Monde 3 (Aurelion Prime)."""
+        quests = quests if quests is not None else self._build_world3_quests()
+        self.world3_quests = self._install_world_quests(quests)
+        self.quest_rules.install(self._world3_rules())
 
-    def _setup_world4_quests(self):
-        """Initialise les quetes du Monde 4 (Nova Terra)."""
+    def _build_world4_quests(self):
+        """Build the world 4 quest set without installing it."""
         data = L.QUESTS_WORLD4
-        self.world4_quests = {}
-        self.player.quest_manager.reset()
-
         quest_1 = Quest(
             title=data[1]["title"],
             description=data[1]["description"],
@@ -406,15 +504,10 @@ class Game:
             quest_id=1,
             state=STATE_ACTIVE,
         )
-        station_objective = (
-            data[2]["objectives"]["explore"][0]
-            if self.player.novaterra_explored_station
-            else data[2]["objectives"]["ignore"][0]
-        )
         quest_2 = Quest(
             title=data[2]["title"],
             description=data[2]["description"],
-            objectives=[station_objective],
+            objectives=[],
             quest_id=2,
             state=STATE_LOCKED,
         )
@@ -426,19 +519,59 @@ class Game:
             state=STATE_LOCKED,
         )
 
-        self.world4_quests = {
+        return {
             1: quest_1,
             2: quest_2,
             3: quest_3,
         }
 
-        for quest in self.world4_quests.values():
-            self.player.quest_manager.add_quest(quest)
+    def _setup_world4_quests(self, quests=None):
+        """Initialise les quetes du Monde 4 (Nova Terra)."""
+        quests = quests if quests is not None else self._build_world4_quests()
+        # L'objectif de la station depend du choix fait pendant la transition.
+        data = L.QUESTS_WORLD4
+        quests[2].objectives = [
+            data[2]["objectives"]["explore"][0]
+            if self.player.novaterra_explored_station
+            else data[2]["objectives"]["ignore"][0]
+        ]
+        self.world4_quests = self._install_world_quests(quests)
+        self.quest_rules.install(self._world4_rules())
+
+    def _build_next_world(self, world_id):
+        """Build a world and its quest set, without touching the session."""
+        builders = {
+            2: self._build_world2_quests,
+            3: self._build_world3_quests,
+            4: self._build_world4_quests,
+        }
+        return World(world_id=world_id), builders[world_id]()
+
+    def prefetch_next_world(self):
+        """Start building the next world in the background (once per world)."""
+        world_id = self.current_world + 1
+        if world_id > LAST_WORLD or world_id in self._prefetched:
+            return
+        self._prefetched[world_id] = _prefetch_pool().submit(self._build_next_world, world_id)
 
-        if quest_1 not in self.player.quest_manager.active_quests:
-            self.player.quest_manager.active_quests.append(quest_1)
+    def cancel_prefetch(self):
+        """Drop the pending prefetches (the game is being saved away or replaced)."""
+        for future in self._prefetched.values():
+            future.cancel()
+        self._prefetched.clear()
 
-        self.player.current_world_quests = [quest_1, quest_2, quest_3]
+    def _check_prefetch(self):
+        """Prefetch the next world once the current world's last quest is active."""
+        quests = self.player.current_world_quests
+        if quests and quests[-1].state == STATE_ACTIVE:
+            self.prefetch_next_world()
+
+    def _take_next_world(self, world_id):
+        """Return the prefetched (world, quests) pair, or build it now."""
+        future = self._prefetched.pop(world_id, None)
+        if future is not None:
+            return future.result()
+        return self._build_next_world(world_id)
 
     def _is_current_world_complete(self):
         """Return True when the current world's quests are all completed."""
@@ -451,93 +584,259 @@ class Game:
         """Trigger a world transition when the current world is complete."""
         if not self._is_current_world_complete():
             return
-        self.transition_to_next_world()
+        yield from self.transition_to_next_world()
 
     def transition_to_next_world(self):
         """Advance to the next world and initialize its content."""
         if self.current_world == 1:
-            print(L.WORLD1_TRANSITION_TEXT)
+            self.output.emit(L.WORLD1_TRANSITION_TEXT)
 
             self.current_world = 2
-            self.world = World(world_id=2)
+            self.world, quests = self._take_next_world(2)
             self.rooms = self.world.rooms
+            self.npc_scheduler.reset(self.rooms.values())
             self.player.current_room = self.world.get_starting_room()
-            self.player.history = []
-            self._setup_world2_quests()
+            self.player.reset_history()
+            self._setup_world2_quests(quests)
             self.player.hp = self.player.max_hp
-            print(self.get_room_view())
+            self.output.emit(self.get_room_view())
             return
 
         if self.current_world == 2:
             if not self.player.karn_aftermath_done:
                 return
-            print(L.WORLD2_TRANSITION_TEXT)
+            self.output.emit(L.WORLD2_TRANSITION_TEXT)
             self.current_world = 3
-            self.world = World(world_id=3)
+            self.world, quests = self._take_next_world(3)
             self.rooms = self.world.rooms
+            self.npc_scheduler.reset(self.rooms.values())
             self.player.current_room = self.world.get_starting_room()
-            self.player.history = []
-            self._setup_world3_quests()
+            self.player.reset_history()
+            self._setup_world3_quests(quests)
             self.player.hp = self.player.max_hp
-            self._handle_aurelion_posture_choice()
-            self.update_world3_quests()
+            yield from self._handle_aurelion_posture_choice()
+            yield from self.update_quests()
             self.player.quest_manager.check_room_objectives(self.player.current_room.name)
-            print(self.get_room_view())
+            self.output.emit(self.get_room_view())
             return
 
         if self.current_world == 3:
-            self.transition_to_world4()
+            yield from self.transition_to_world4()
             return
 
-    def update_world1_quests(self, activated_quest_id=None):
-        """Met à jour l'état des quêtes Monde 1 en fonction des flags joueur."""
-        if self.current_world != 1:
-            return
-        q1 = self.world1_quests.get(1)
-        if q1 and q1.state == STATE_ACTIVE and not q1.is_completed and self.player.met_ralen:
-            q1.complete_objective(q1.objectives[0], self.player)
-            if q1.is_completed and q1 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q1)
-
-        q2 = self.world1_quests.get(2)
-        if q1 and q1.is_completed and q2 and q2.state == STATE_LOCKED:
-            q2.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q2.quest_id)
-
-        if (
-            q2
-            and q2.state == STATE_ACTIVE
-            and not q2.is_completed
-            and self.player.patrollers_defeated
+    def update_quests(self, activated_quest_id=None):
+        """Routine: quest phase, run the rules woken by events since the last one.
+
+        ``activated_quest_id`` is the quest the player just activated with
+        the ``activate`` command, if any.
+        """
+        self._activated_quest_id = activated_quest_id
+        try:
+            yield from self.quest_rules.drain()
+        finally:
+            self._activated_quest_id = None
+
+    def _on_npc_talked(self, event):
+        """Set the current world's flag for the character the player talked to."""
+        flag = TALK_FLAGS.get(self.current_world, {}).get(event.key)
+        if flag:
+            setattr(self.player, flag, True)
+
+    def _complete_objective(self, quest, objective):
+        """Complete an objective; drop the quest from the active list once done."""
+        quest.complete_objective(objective, self.player)
+        manager = self.player.quest_manager
+        if quest.is_completed and quest in manager.active_quests:
+            manager.active_quests.remove(quest)
+
+    def _objective_rule(self, quest, index, condition, *triggers):
+        """Rule: complete ``quest.objectives[index]`` once ``condition()`` holds."""
+        def action():
+            if quest.state == STATE_ACTIVE and not quest.is_completed and condition():
+                self._complete_objective(quest, quest.objectives[index])
+        return Rule(action, (QuestStateChanged, quest.quest_id), *triggers)
+
+    def _flag_rule(self, quest, index, *flags):
+        """Rule: complete an objective once one of the player flags is set."""
+        return self._objective_rule(
+            quest,
+            index,
+            lambda: any(getattr(self.player, flag) for flag in flags),
+            *((FlagChanged, flag) for flag in flags),
+        )
+
+    def _visit_rule(self, quest, index, room_name):
+        """Rule: complete an objective once the player has been in the room."""
+        return self._objective_rule(
+            quest, index, lambda: self.player.has_visited(room_name), (RoomEntered, room_name)
+        )
+
+    def _unlock_rule(self, previous, quest, activate=True):
+        """Rule: unlock ``quest`` (and activate it) once ``previous`` is completed."""
+        def action():
+            if previous.is_completed and quest.state == STATE_LOCKED:
+                quest.set_state(STATE_AVAILABLE)
+                if activate:
+                    self.player.quest_manager.activate_quest(quest.quest_id)
+        return Rule(action, (QuestStateChanged, previous.quest_id))
+
+    def _prefetch_rule(self, last_quest):
+        """Rule: prefetch the next world once the last quest is active."""
+        return Rule(self._check_prefetch, (QuestStateChanged, last_quest.quest_id))
+
+    def _world1_rules(self):
+        """Regles des quetes du Monde 1, dans l'ordre d'evaluation."""
+        q = self.world1_quests
+        return [
+            self._flag_rule(q[1], 0, "met_ralen"),
+            self._unlock_rule(q[1], q[2]),
+            self._flag_rule(q[2], 0, "patrollers_defeated"),
+            self._unlock_rule(q[2], q[3]),
+            Rule(
+                self._world1_crystal_rule,
+                (QuestStateChanged, 3),
+                (FlagChanged, "has_crystal"),
+            ),
+            self._unlock_rule(q[3], q[4]),
+            self._flag_rule(q[4], 0, "vorn_defeated"),
+            self._prefetch_rule(q[4]),
+            Rule(self._check_world_transition, (QuestStateChanged, 4)),
+        ]
+
+    def _world1_crystal_rule(self):
+        """Quete 3 du Monde 1: le cristal est deja en possession du joueur."""
+        q3 = self.world1_quests[3]
+        if q3.state == STATE_ACTIVE and not q3.is_completed and self.player.has_crystal:
+            if self._activated_quest_id == 3:
+                self.output.emit(L.CRYSTAL_REALIZATION_TEXT)
+            self._complete_objective(q3, q3.objectives[0])
+
+    def _world2_rules(self):
+        """Regles des quetes du Monde 2, dans l'ordre d'evaluation."""
+        q = self.world2_quests
+        keycard = L.ITEM_DEFINITIONS["keycard"]["name"]
+        return [
+            Rule(self._world2_resources_rule, (ItemTaken, keycard)),
+            self._flag_rule(q[1], 0, "velyra_method"),
+            self._unlock_rule(q[1], q[2]),
+            self._objective_rule(
+                q[2], 0, lambda: self.player.has_item(keycard), (ItemTaken, keycard)
+            ),
+            self._unlock_rule(q[2], q[3]),
+            self._flag_rule(q[3], 0, "velyra_narek_resolved"),
+            self._unlock_rule(q[3], q[4]),
+            self._flag_rule(q[4], 0, "karn_defeated"),
+            self._prefetch_rule(q[4]),
+            Rule(
+                self._check_world_transition,
+                (QuestStateChanged, 4),
+                (FlagChanged, "karn_aftermath_done"),
+            ),
+        ]
+
+    def _world2_resources_rule(self):
+        """Les ressources de Velyra sont securisees avec la carte d'acces."""
+        player = self.player
+        if not player.velyra_resources_secured and player.has_item(
+            L.ITEM_DEFINITIONS["keycard"]["name"]
         ):
-            q2.complete_objective(q2.objectives[0], self.player)
-            if q2.is_completed and q2 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q2)
+            player.velyra_resources_secured = True
 
-        q3 = self.world1_quests.get(3)
-        if q2 and q2.is_completed and q3 and q3.state == STATE_LOCKED:
-            q3.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q3.quest_id)
+    def _world3_rules(self):
+        """Regles des quetes du Monde 3, dans l'ordre d'evaluation."""
+        q = self.world3_quests
+        return [
+            Rule(
+                self._world3_posture_rule,
+                (QuestStateChanged, 1),
+                (FlagChanged, "ap_choice_infiltrate"),
+                (FlagChanged, "ap_choice_reveal"),
+            ),
+            self._unlock_rule(q[1], q[2]),
+            self._objective_rule(
+                q[2],
+                0,
+                lambda: self.player.current_room.name == DISTRICT_OR,
+                (RoomEntered, DISTRICT_OR),
+            ),
+            self._flag_rule(q[2], 1, "ap_citizen_spoken"),
+            self._visit_rule(q[2], 2, QUARTIER_HOLO),
+            self._unlock_rule(q[2], q[3]),
+            self._flag_rule(q[3], 0, "attack_holo_done"),
+            self._flag_rule(q[3], 1, "ap_glitch_spoken"),
+            self._unlock_rule(q[3], q[4], activate=False),
+            Rule(self._world3_node_entry_rule, (QuestStateChanged, 4), (RoomEntered, NOEUD)),
+            Rule(
+                self._world3_node_choice_rule,
+                (QuestStateChanged, 4),
+                (FlagChanged, "ap_break_illusions"),
+                (FlagChanged, "ap_keep_illusions"),
+            ),
+            self._unlock_rule(q[4], q[5]),
+            self._visit_rule(q[5], 0, PALAIS_LUMIERE),
+            self._visit_rule(q[5], 1, SALLE_TRONE),
+            self._unlock_rule(q[5], q[6]),
+            self._flag_rule(q[6], 0, "ap_taal_confronted"),
+            self._flag_rule(q[6], 1, "ap_taal_alliance", "ap_taal_dead"),
+            self._prefetch_rule(q[6]),
+        ]
+
+    def _world3_posture_rule(self):
+        """Quete 1 du Monde 3: choisir une posture face a Aurelion."""
+        player = self.player
+        q1 = self.world3_quests[1]
+        if q1.state != STATE_ACTIVE or q1.is_completed:
+            return
+        if not (player.ap_choice_infiltrate or player.ap_choice_reveal):
+            yield from self._handle_aurelion_posture_choice()
+        if player.ap_choice_infiltrate or player.ap_choice_reveal:
+            self._complete_objective(q1, q1.objectives[0])
 
-        if q3 and q3.state == STATE_ACTIVE and not q3.is_completed:
-            if self.player.has_crystal:
-                if activated_quest_id == 3:
-                    print(L.CRYSTAL_REALIZATION_TEXT)
-                q3.complete_objective(q3.objectives[0], self.player)
-                if q3.is_completed and q3 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q3)
-
-        q4 = self.world1_quests.get(4)
-        if q3 and q3.is_completed and q4 and q4.state == STATE_LOCKED:
-            q4.set_state(STATE_AVAILABLE)
+    def _world3_node_entry_rule(self):
+        """Quete 4 du Monde 3: elle s'active en entrant dans le Noeud."""
+        q4 = self.world3_quests[4]
+        if q4.state == STATE_AVAILABLE and self.player.current_room.name == NOEUD:
             self.player.quest_manager.activate_quest(q4.quest_id)
 
-        if q4 and q4.state == STATE_ACTIVE and not q4.is_completed and self.player.vorn_defeated:
-            q4.complete_objective(q4.objectives[0], self.player)
-            if q4.is_completed and q4 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q4)
+    def _world3_node_choice_rule(self):
+        """Quete 4 du Monde 3: briser ou garder les illusions."""
+        player = self.player
+        q4 = self.world3_quests[4]
+        if q4.state != STATE_ACTIVE or q4.is_completed:
+            return
+        if not (player.ap_break_illusions or player.ap_keep_illusions):
+            yield from self._handle_aurelion_node_choice()
+        if player.ap_break_illusions or player.ap_keep_illusions:
+            self._complete_objective(q4, q4.objectives[0])
+
+    def _world4_rules(self):
+        """Regles des quetes du Monde 4, dans l'ordre d'evaluation."""
+        q = self.world4_quests
+        return [
+            self._visit_rule(q[1], 0, LANDING_VALLEY),
+            self._flag_rule(q[1], 1, "novaterra_observed_planet"),
+            self._flag_rule(q[1], 2, "novaterra_companion_spoken"),
+            self._unlock_rule(q[1], q[2]),
+            # L'objectif de la station a ete fixe a l'installation des quetes.
+            self._objective_rule(q[2], 0, lambda: True),
+            self._unlock_rule(q[2], q[3], activate=False),
+            Rule(
+                self._world4_nexus_rule,
+                (QuestStateChanged, 3),
+                (RoomEntered, ANCIENT_NEXUS),
+            ),
+        ]
 
-        self._check_world_transition()
+    def _world4_nexus_rule(self):
+        """Quete 3 du Monde 4: atteindre l'Ancient Nexus et l'ecouter."""
+        player = self.player
+        q3 = self.world4_quests[3]
+        if q3.state == STATE_AVAILABLE and self.player.has_visited(ANCIENT_NEXUS):
+            self.player.quest_manager.activate_quest(q3.quest_id)
+            q3.complete_objective(q3.objectives[0], player)
+            listened = q3.complete_objective(q3.objectives[1], player)
+            if listened:
+                self.output.emit(L.NEXUS_LISTEN_TEXT)
 
     def check_world1_npc_bonus(self):
         """Accorde le bonus de stabilité si tous les PNJ clés ont été rencontrés."""
@@ -547,9 +846,9 @@ class Game:
         if player.world1_npcs_bonus:
             return
 
-        if (
-            player.met_ralen and player.met_malek and player.met_marchand
-            and player.met_yara and player.met_nommera
+        if all(
+            player.has_flag(name)
+            for name in ("met_ralen", "met_malek", "met_marchand", "met_yara", "met_nommera")
         ):
             player.world1_npcs_bonus = True
             self.adjust_stability(1)
@@ -561,10 +860,8 @@ class Game:
             return
 
         for line in L.MERCHANT_CHOICE_LINES:
-            print(line)
-        choice = ""
-        while choice not in ("1", "2"):
-            choice = self.input_func("> ").strip()
+            self.output.emit(line)
+        choice = yield from ask(("1", "2"))
 
         if choice == "1":
             self.adjust_stability(-3)
@@ -574,277 +871,23 @@ class Game:
                     "Un cristal intact, essentiel pour reparer le vaisseau.",
                     1,
                 )
-                player.inventory.append(cristal)
-                player.weight += cristal.weight
+                player.inventory.add(cristal)
             player.has_crystal = True
             player.merchant_sacrifice = True
-            print(L.MERCHANT_ACCEPTED_TEXT)
+            self.output.emit(L.MERCHANT_ACCEPTED_TEXT)
         else:
             self.adjust_stability(1)
             player.merchant_refused = True
             player.met_yara = True
-            print(L.MERCHANT_REFUSED_TEXT)
+            self.output.emit(L.MERCHANT_REFUSED_TEXT)
             if not player.has_crystal:
-                print(L.MERCHANT_NO_CRYSTAL_TEXT)
+                self.output.emit(L.MERCHANT_NO_CRYSTAL_TEXT)
                 self.finished = True
                 return
 
-        self.update_world1_quests()
+        yield from self.update_quests()
         self.check_world1_npc_bonus()
 
-    def handle_world1_talk(self, character_name):
-        """Met a jour les flags Monde 1 apres un dialogue."""
-        if self.current_world != 1:
-            return
-        name = character_name.lower()
-        if name == "ralen":
-            self.player.met_ralen = True
-        elif "malek" in name:
-            self.player.met_malek = True
-        elif name == "marchand":
-            self.player.met_marchand = True
-        elif name == "yara":
-            self.player.met_yara = True
-        elif name == "nommera":
-            self.player.met_nommera = True
-
-        self.update_world1_quests()
-        self.check_world1_npc_bonus()
-
-    def handle_world2_talk(self, character_name):
-        """Met a jour les flags Monde 2 apres un dialogue."""
-        if self.current_world != 2:
-            return
-        name = character_name.lower()
-        if name == "yara":
-            self.player.velyra_met_leader = True
-        elif name == "narek":
-            self.player.velyra_narek_resolved = True
-
-        self.update_world2_quests()
-
-    def handle_world3_talk(self, character_name):
-        """Met a jour les flags Monde 3 apres un dialogue."""
-        if self.current_world != 3:
-            return
-        name = character_name.lower()
-        if name == "citoyen dore":
-            self.player.ap_citizen_spoken = True
-        elif name == "habitant glitche":
-            self.player.ap_glitch_spoken = True
-
-        self.update_world3_quests()
-
-    def handle_world4_talk(self, character_name):
-        """Met a jour les flags Monde 4 apres un dialogue."""
-        if self.current_world != 4:
-            return
-        name = character_name.lower()
-        if name in ("yara", "narek", "le guide"):
-            self.player.novaterra_companion_spoken = True
-
-        self.update_world4_quests()
-
-    def update_world2_quests(self):
-        """Met a jour l'etat des quetes Monde 2 en fonction des actions du joueur."""
-        if self.current_world != 2:
-            return
-
-        player = self.player
-        q1 = self.world2_quests.get(1)
-        q2 = self.world2_quests.get(2)
-        q3 = self.world2_quests.get(3)
-        q4 = self.world2_quests.get(4)
-
-        if not player.velyra_resources_secured and player.has_item(
-            L.ITEM_DEFINITIONS["keycard"]["name"]
-        ):
-            player.velyra_resources_secured = True
-
-        if q1 and q1.state == STATE_ACTIVE and not q1.is_completed:
-            if player.velyra_method:
-                q1.complete_objective(q1.objectives[0], player)
-                if q1.is_completed and q1 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q1)
-
-        if q1 and q1.is_completed and q2 and q2.state == STATE_LOCKED:
-            q2.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q2.quest_id)
-
-        if q2 and q2.state == STATE_ACTIVE and not q2.is_completed:
-            if player.has_item(L.ITEM_DEFINITIONS["keycard"]["name"]):
-                q2.complete_objective(q2.objectives[0], player)
-                if q2.is_completed and q2 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q2)
-
-        if q2 and q2.is_completed and q3 and q3.state == STATE_LOCKED:
-            q3.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q3.quest_id)
-
-        if q3 and q3.state == STATE_ACTIVE and not q3.is_completed:
-            if player.velyra_narek_resolved:
-                q3.complete_objective(q3.objectives[0], player)
-                if q3.is_completed and q3 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q3)
-
-        if q3 and q3.is_completed and q4 and q4.state == STATE_LOCKED:
-            q4.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q4.quest_id)
-
-        if q4 and q4.state == STATE_ACTIVE and not q4.is_completed:
-            if player.karn_defeated:
-                q4.complete_objective(q4.objectives[0], player)
-                if q4.is_completed and q4 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q4)
-
-        if q4 and q4.is_completed:
-            self._check_world_transition()
-
-    def update_world3_quests(self):
-        """Met a jour l'etat des quetes Monde 3 en fonction des actions du joueur."""
-        if self.current_world != 3:
-            return
-
-        player = self.player
-        q1 = self.world3_quests.get(1)
-        q2 = self.world3_quests.get(2)
-        q3 = self.world3_quests.get(3)
-        q4 = self.world3_quests.get(4)
-        q5 = self.world3_quests.get(5)
-        q6 = self.world3_quests.get(6)
-
-        if q1 and q1.state == STATE_ACTIVE and not q1.is_completed:
-            if not (player.ap_choice_infiltrate or player.ap_choice_reveal):
-                self._handle_aurelion_posture_choice()
-            if player.ap_choice_infiltrate or player.ap_choice_reveal:
-                q1.complete_objective(q1.objectives[0], player)
-                if q1.is_completed and q1 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q1)
-
-        if q1 and q1.is_completed and q2 and q2.state == STATE_LOCKED:
-            q2.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q2.quest_id)
-
-        if q2 and q2.state == STATE_ACTIVE and not q2.is_completed:
-            if player.current_room.name == DISTRICT_OR:
-                q2.complete_objective(q2.objectives[0], player)
-            if player.ap_citizen_spoken:
-                q2.complete_objective(q2.objectives[1], player)
-            if (
-                player.current_room.name == QUARTIER_HOLO
-                or any(room.name == QUARTIER_HOLO for room in player.history)
-            ):
-                q2.complete_objective(q2.objectives[2], player)
-            if q2.is_completed and q2 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q2)
-
-        if q2 and q2.is_completed and q3 and q3.state == STATE_LOCKED:
-            q3.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q3.quest_id)
-
-        if q3 and q3.state == STATE_ACTIVE and not q3.is_completed:
-            if player.attack_holo_done:
-                q3.complete_objective(q3.objectives[0], player)
-            if player.ap_glitch_spoken:
-                q3.complete_objective(q3.objectives[1], player)
-            if q3.is_completed and q3 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q3)
-
-        if q3 and q3.is_completed and q4 and q4.state == STATE_LOCKED:
-            q4.set_state(STATE_AVAILABLE)
-
-        if q4 and q4.state == STATE_AVAILABLE and player.current_room.name == NOEUD:
-            self.player.quest_manager.activate_quest(q4.quest_id)
-
-        if q4 and q4.state == STATE_ACTIVE and not q4.is_completed:
-            if not (player.ap_break_illusions or player.ap_keep_illusions):
-                self._handle_aurelion_node_choice()
-            if player.ap_break_illusions or player.ap_keep_illusions:
-                q4.complete_objective(q4.objectives[0], player)
-                if q4.is_completed and q4 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q4)
-
-        if q4 and q4.is_completed and q5 and q5.state == STATE_LOCKED:
-            q5.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q5.quest_id)
-
-        if q5 and q5.state == STATE_ACTIVE and not q5.is_completed:
-            if (
-                player.current_room.name == PALAIS_LUMIERE
-                or any(room.name == PALAIS_LUMIERE for room in player.history)
-            ):
-                q5.complete_objective(q5.objectives[0], player)
-            if (
-                player.current_room.name == SALLE_TRONE
-                or any(room.name == SALLE_TRONE for room in player.history)
-            ):
-                q5.complete_objective(q5.objectives[1], player)
-            if q5.is_completed and q5 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q5)
-
-        if q5 and q5.is_completed and q6 and q6.state == STATE_LOCKED:
-            q6.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q6.quest_id)
-
-        if q6 and q6.state == STATE_ACTIVE and not q6.is_completed:
-            if player.ap_taal_confronted:
-                q6.complete_objective(q6.objectives[0], player)
-            if player.ap_taal_alliance or player.ap_taal_dead:
-                q6.complete_objective(q6.objectives[1], player)
-                if q6.is_completed and q6 in self.player.quest_manager.active_quests:
-                    self.player.quest_manager.active_quests.remove(q6)
-
-    def update_world4_quests(self):
-        """Met a jour l'etat des quetes Monde 4 en fonction des actions du joueur."""
-        if self.current_world != 4:
-            return
-
-        player = self.player
-        q1 = self.world4_quests.get(1)
-        q2 = self.world4_quests.get(2)
-        q3 = self.world4_quests.get(3)
-
-        if q1 and q1.state == STATE_ACTIVE and not q1.is_completed:
-            if (
-                player.current_room.name == LANDING_VALLEY
-                or any(room.name == LANDING_VALLEY for room in player.history)
-            ):
-                q1.complete_objective(q1.objectives[0], player)
-            if player.novaterra_observed_planet:
-                q1.complete_objective(q1.objectives[1], player)
-            if player.novaterra_companion_spoken:
-                q1.complete_objective(q1.objectives[2], player)
-            if q1.is_completed and q1 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q1)
-
-        if q1 and q1.is_completed and q2 and q2.state == STATE_LOCKED:
-            q2.set_state(STATE_AVAILABLE)
-            self.player.quest_manager.activate_quest(q2.quest_id)
-
-        if q2 and q2.state == STATE_ACTIVE and not q2.is_completed:
-            objective = (
-                L.QUESTS_WORLD4[2]["objectives"]["explore"][0]
-                if player.novaterra_explored_station
-                else L.QUESTS_WORLD4[2]["objectives"]["ignore"][0]
-            )
-            q2.complete_objective(objective, player)
-            if q2.is_completed and q2 in self.player.quest_manager.active_quests:
-                self.player.quest_manager.active_quests.remove(q2)
-
-        if q2 and q2.is_completed and q3 and q3.state == STATE_LOCKED:
-            q3.set_state(STATE_AVAILABLE)
-
-        if q3 and q3.state == STATE_AVAILABLE:
-            if (
-                player.current_room.name == ANCIENT_NEXUS
-                or any(room.name == ANCIENT_NEXUS for room in player.history)
-            ):
-                self.player.quest_manager.activate_quest(q3.quest_id)
-                q3.complete_objective(q3.objectives[0], player)
-                listened = q3.complete_objective(q3.objectives[1], player)
-                if listened:
-                    print(L.NEXUS_LISTEN_TEXT)
-
     def check_global_defeat(self):
         """Verifie la condition de defaite globale liee a la stabilite."""
         if self.finished:
@@ -856,13 +899,13 @@ class Game:
         """Ajuste la stabilite globale et declenche le feedback narratif."""
         message, died = self.player.modify_stability(amount)
         if message:
-            print(f"\n{message}\n")
+            self.output.emit(f"\n{message}\n")
         if died:
             self._handle_mental_collapse()
 
     def _handle_mental_collapse(self):
         """Affiche la mort narrative liee a l'effondrement mental."""
-        print(L.MENTAL_COLLAPSE_TEXT)
+        self.output.emit(L.MENTAL_COLLAPSE_TEXT)
         self.finished = True
 
     def _handle_karn_aftermath(self):
@@ -874,32 +917,26 @@ class Game:
 
         nanomed_name = L.ITEM_DEFINITIONS["nanomedicine"]["name"]
         if player.has_item(nanomed_name):
-            print(L.KARN_AFTERMATH_PROMPT)
-            choice = ""
-            while choice not in ("1", "2", "yara", "narek", "y", "n"):
-                choice = self.input_func("> ").strip().lower()
+            self.output.emit(L.KARN_AFTERMATH_PROMPT)
+            choice = yield from ask(("1", "2", "yara", "narek", "y", "n"), lower=True)
 
-            for item in list(player.inventory):
-                if item.name.lower() == nanomed_name.lower():
-                    player.inventory.remove(item)
-                    player.weight -= item.weight
-                    break
+            player.inventory.discard(nanomed_name)
 
             if choice in ("1", "yara", "y"):
                 player.saved_yara = True
                 player.narek_dead = True
-                print(L.KARN_AFTERMATH_YARA)
+                self.output.emit(L.KARN_AFTERMATH_YARA)
             else:
                 player.saved_narek = True
                 player.yara_dead = True
-                print(L.KARN_AFTERMATH_NAREK)
+                self.output.emit(L.KARN_AFTERMATH_NAREK)
 
             self.adjust_stability(1)
             return
 
         player.yara_dead = True
         player.narek_dead = True
-        print(L.KARN_AFTERMATH_NONE)
+        self.output.emit(L.KARN_AFTERMATH_NONE)
         self.adjust_stability(-1)
 
     def _handle_aurelion_posture_choice(self):
@@ -908,20 +945,18 @@ class Game:
         if player.ap_choice_infiltrate or player.ap_choice_reveal:
             return
 
-        print(L.AURELION_POSTURE_LINES)
+        self.output.emit(L.AURELION_POSTURE_LINES)
         for line in L.AURELION_POSTURE_OPTIONS:
-            print(line)
+            self.output.emit(line)
 
-        choice = ""
-        while choice not in ("1", "2"):
-            choice = self.input_func("> ").strip()
+        choice = yield from ask(("1", "2"))
 
         if choice == "1":
             player.ap_choice_infiltrate = True
-            print(L.AURELION_POSTURE_INFILTRATE)
+            self.output.emit(L.AURELION_POSTURE_INFILTRATE)
         else:
             player.ap_choice_reveal = True
-            print(L.AURELION_POSTURE_REVEAL)
+            self.output.emit(L.AURELION_POSTURE_REVEAL)
 
     def _handle_aurelion_node_choice(self):
         """Gere le choix irreversible au Noeud."""
@@ -929,27 +964,25 @@ class Game:
         if player.ap_break_illusions or player.ap_keep_illusions:
             return
 
-        print(L.AURELION_NODE_LINES)
+        self.output.emit(L.AURELION_NODE_LINES)
         for line in L.AURELION_NODE_OPTIONS:
-            print(line)
+            self.output.emit(line)
 
-        choice = ""
-        while choice not in ("1", "2"):
-            choice = self.input_func("> ").strip()
+        choice = yield from ask(("1", "2"))
 
         if choice == "1":
             player.ap_break_illusions = True
             self.adjust_stability(-1)
-            print(L.AURELION_NODE_BREAK)
+            self.output.emit(L.AURELION_NODE_BREAK)
         else:
             player.ap_keep_illusions = True
             self.adjust_stability(1)
-            print(L.AURELION_NODE_KEEP)
+            self.output.emit(L.AURELION_NODE_KEEP)
 
     def _handle_seren_taal_confrontation(self):
         """Gere la confrontation narrative avec Seren Taal dans la Salle du Trone."""
         player = self.player
-        if player.ap_taal_alliance or player.ap_taal_dead:
+        if player.ap_taal_alliance or player.has_flag("ap_taal_dead"):
             return True
 
         quest = None
@@ -959,24 +992,22 @@ class Game:
             return False
 
         if not player.ap_taal_confronted:
-            print(L.SEREN_CONFRONT_LINES)
+            self.output.emit(L.SEREN_CONFRONT_LINES)
             for line in L.SEREN_CONFRONT_OPTIONS:
-                print(line)
-            choice = ""
-            while choice not in ("1", "2"):
-                choice = self.input_func("> ").strip()
+                self.output.emit(line)
+            choice = yield from ask(("1", "2"))
 
             if choice == "1":
                 player.ap_taal_confronted = True
                 player.ap_taal_alliance = True
-                print(L.SEREN_ALLIANCE_TEXT)
+                self.output.emit(L.SEREN_ALLIANCE_TEXT)
                 if quest:
                     quest.complete_objective(quest.objectives[0], player)
                     quest.complete_objective(quest.objectives[1], player)
-                self.end_world3()
+                yield from self.end_world3()
                 return True
 
-            print(L.SEREN_REFUSE_TEXT)
+            self.output.emit(L.SEREN_REFUSE_TEXT)
             player.ap_taal_confronted = True
 
         room = player.current_room
@@ -986,22 +1017,22 @@ class Game:
                 seren = candidate
                 break
         if seren is None:
-            seren = Enemy("Seren Taal", hp=60, attack=25)
+            seren = self.world.spawn_enemy("seren_taal")
             room.enemies.append(seren)
 
-        self.resolve_combat(player, seren)
+        yield from self.resolve_combat(player, seren)
         return True
 
     def end_world3(self):
         """Clot le monde 3 et lance la transition appropriee."""
         player = self.player
         if player.ap_taal_alliance:
-            print(L.SEREN_ALLIANCE_ENDING)
+            self.output.emit(L.SEREN_ALLIANCE_ENDING)
             self.finished = True
             return
-        if player.ap_taal_dead:
-            print(L.SEREN_VICTORY_ENDING)
-            self.transition_to_next_world()
+        if player.has_flag("ap_taal_dead"):
+            self.output.emit(L.SEREN_VICTORY_ENDING)
+            yield from self.transition_to_next_world()
             return
 
     def transition_to_world4(self):
@@ -1012,20 +1043,18 @@ class Game:
 
         player.world4_started = True
 
-        print(L.WORLD4_TRANSITION_INTRO)
-        print(L.WORLD4_TRANSITION_ORBITAL)
-        print(L.WORLD4_TRANSITION_CHOICE)
+        self.output.emit(L.WORLD4_TRANSITION_INTRO)
+        self.output.emit(L.WORLD4_TRANSITION_ORBITAL)
+        self.output.emit(L.WORLD4_TRANSITION_CHOICE)
         for line in L.WORLD4_TRANSITION_OPTIONS:
-            print(line)
+            self.output.emit(line)
 
-        choice = ""
-        while choice not in ("1", "2"):
-            choice = self.input_func("> ").strip()
+        choice = yield from ask(("1", "2"))
 
         if choice == "1":
-            print(L.WORLD4_CHOICE_PRUDENCE)
+            self.output.emit(L.WORLD4_CHOICE_PRUDENCE)
             self.adjust_stability(1)
-            print("")
+            self.output.emit()
         else:
             dmg = min(10, player.hp)
             player.hp = max(0, player.hp - dmg)
@@ -1036,60 +1065,38 @@ class Game:
                 "Un fragment ancien qui pulse d'une energie inconnue.",
                 1,
             )
-            player.inventory.append(artifact)
-            player.weight += artifact.weight
-            print(L.WORLD4_STATION_DOCK)
-            print(L.WORLD4_STATION_FLOAT)
-            print(L.WORLD4_STATION_EXPLOSION.format(dmg=dmg))
-            print(L.WORLD4_STATION_ARTIFACT)
+            player.inventory.add(artifact)
+            self.output.emit(L.WORLD4_STATION_DOCK)
+            self.output.emit(L.WORLD4_STATION_FLOAT)
+            self.output.emit(L.WORLD4_STATION_EXPLOSION.format(dmg=dmg))
+            self.output.emit(L.WORLD4_STATION_ARTIFACT)
             self.adjust_stability(2)
 
         self.current_world = 4
-        self.world = World(world_id=4)
+        self.world, quests = self._take_next_world(4)
         self.rooms = self.world.rooms
+        self.npc_scheduler.reset(self.rooms.values())
         self.player.current_room = self.world.get_starting_room()
-        self.player.history = []
-        self._setup_world4_quests()
+        self.player.reset_history()
+        self._setup_world4_quests(quests)
         self.player.hp = self.player.max_hp
 
         valley = self.player.current_room
-        companion = None
         if player.saved_yara:
-            companion = Character(
-                "Yara",
-                "Yara, cheffe rebelle d'Eridani, marche a vos cotes. "
-                "Ses yeux brillent a la vue de cette nouvelle terre.",
-                valley,
-                [],
-                on_talk=novaterra_companion_reactive,
-            )
+            companion = self.world.spawn_companion("yara", valley)
         elif player.saved_narek:
-            companion = Character(
-                "Narek",
-                "Narek, survivant de Velyra et symbole de resistance, "
-                "observe l'horizon avec un melange d'espoir et de nostalgie.",
-                valley,
-                [],
-                on_talk=novaterra_companion_reactive,
-            )
+            companion = self.world.spawn_companion("narek", valley)
         else:
-            companion = Character(
-                "Le Guide",
-                "Une silhouette inconnue vous accompagne, calme et attentive.",
-                valley,
-                [],
-                on_talk=novaterra_companion_reactive,
-            )
+            companion = self.world.spawn_companion("guide", valley)
 
-        if companion:
-            valley.characters.append(companion)
-            if companion.name.lower() == "le guide":
-                print(L.WORLD4_GUIDE_INTRO)
+        valley.characters.append(companion)
+        if companion.name.lower() == "le guide":
+            self.output.emit(L.WORLD4_GUIDE_INTRO)
 
-        self.update_world4_quests()
+        yield from self.update_quests()
 
-        print(L.WORLD4_CHAPTER_TITLE)
-        print(self.get_room_view())
+        self.output.emit(L.WORLD4_CHAPTER_TITLE)
+        self.output.emit(self.get_room_view())
 
     def _handle_novaterra_final_choice(self):
         """Declenche le choix final a l'Ancient Nexus."""
@@ -1105,13 +1112,11 @@ class Game:
             if quest.is_completed and quest in self.player.quest_manager.active_quests:
                 self.player.quest_manager.active_quests.remove(quest)
 
-        print(L.NEXUS_CHOICE_LINES)
+        self.output.emit(L.NEXUS_CHOICE_LINES)
         for line in L.NEXUS_OPTIONS:
-            print(line)
+            self.output.emit(line)
 
-        choice = ""
-        while choice not in ("1", "2", "3"):
-            choice = self.input_func("> ").strip()
+        choice = yield from ask(("1", "2", "3"))
 
         if choice == "1":
             player.novaterra_choice_harmony = True
@@ -1121,10 +1126,10 @@ class Game:
         if choice == "2":
             player.novaterra_choice_domination = True
             player.atk += 2
-            print(L.NEXUS_DOMINATION_COMBAT)
-            terra = Enemy("Terra Guardian", hp=70, attack=25)
+            self.output.emit(L.NEXUS_DOMINATION_COMBAT)
+            terra = self.world.spawn_enemy("terra_guardian")
             player.current_room.enemies.append(terra)
-            self.resolve_combat(player, terra)
+            yield from self.resolve_combat(player, terra)
             if terra in player.current_room.enemies:
                 player.current_room.enemies.remove(terra)
             return
@@ -1140,24 +1145,26 @@ class Game:
             return
         player.novaterra_final_done = True
 
-        print(L.WORLD4_ENDING_TITLE)
+        self.output.emit(L.WORLD4_ENDING_TITLE)
         if player.novaterra_choice_harmony:
             for line in L.WORLD4_ENDING_HARMONY:
-                print(line)
+                self.output.emit(line)
         elif player.novaterra_choice_domination:
             for line in L.WORLD4_ENDING_DOMINATION:
-                print(line)
+                self.output.emit(line)
         elif player.novaterra_choice_renounce:
             for line in L.WORLD4_ENDING_RENOUNCE:
-                print(line)
+                self.output.emit(line)
 
         for line in L.WORLD4_ENDING_FINAL:
-            print(line)
+            self.output.emit(line)
         self.finished = True
 
     def setup(self, player_name=None):
         """Initialize world, player, commands, quests, and intro."""
 
+        # Seed the session's random stream
+        self.seed_rng()
         # Setup commands
         self.setup_commands()
         # Setup world
@@ -1176,6 +1183,13 @@ class Game:
 
 
 
+    def seed_rng(self):
+        """Seed the session RNG (drawing a fresh seed if none was given)."""
+        if self.seed is None:
+            self.seed = secrets.randbits(64)
+        self.rng.seed(self.seed)
+        self.metadata["seed"] = self.seed
+
     # Play the game
     def play(self):
         """Run the main loop: read commands and process triggers."""
@@ -1186,28 +1200,86 @@ class Game:
         # Loop until the game is finished
         while not self.finished:
             # Get the command from the player
-            self.process_command(self.input_func("> "))
-
-            # Check win/lose conditions
-            if self.finished:
-                return None
-            if self.win():
-                print(L.GAME_WIN_TEXT)
-                self.finished = True
-            elif self.lose():
-                print(L.GAME_LOSE_TEXT)
-                self.finished = True
+            run(self.turn_routine(self.read_input("> ")), self.read_input)
+
+    def start(self, player_name=None):
+        """Begin a resumable session: setup and intro, up to the first prompt.
+
+        Used by hosts that feed input through ``submit`` instead of a
+        blocking ``input_func``.
+        """
+        if self.journal is not None and player_name:
+            self.journal.record_name(player_name)
+        return self._advance(self._start_routine(player_name))
+
+    def submit(self, line):
+        """Answer the pending prompt with ``line``, or play it as a command.
+
+        Returns the new pending Prompt, or None when the game waits for
+        the next command.
+        """
+        if self.journal is not None:
+            self.journal.record_line(line)
+        if self.pending_routine is not None:
+            return self._advance(self.pending_routine, line)
+        if self.finished:
+            return None
+        return self._advance(self.turn_routine(line))
+
+    def _advance(self, routine, answer=None):
+        """Resume a routine until its next prompt (kept pending) or its end."""
+        self.pending_routine = None
+        self.pending_prompt = None
+        try:
+            if answer is None:
+                prompt = next(routine)
             else:
-                # Deplacement des PNJ apres chaque tour
-                self.character_move()
-
-        return None
+                prompt = routine.send(answer)
+        except StopIteration:
+            return None
+        self.pending_routine = routine
+        self.pending_prompt = prompt
+        return prompt
+
+    def _start_routine(self, player_name=None):
+        """Routine: ask for the name if needed, set up, then the initial choice."""
+        if not player_name:
+            player_name = yield Prompt(
+                L.PLAYER_NAME_PROMPT.format(default=L.DEFAULT_PLAYER_NAME)
+            )
+            player_name = player_name.strip() or L.DEFAULT_PLAYER_NAME
+        self.setup(player_name=player_name)
+        yield from self.choice_intro_routine()
+
+    def turn_routine(self, command_string):
+        """Routine: one full turn (command, triggers, end-of-turn checks)."""
+        yield from self.command_routine(command_string)
+        self.finish_turn()
+        self._finish_profile()
+        if self.journal is not None:
+            self.journal.turn_finished(self)
+
+    def finish_turn(self):
+        """Check win/lose conditions, then let NPCs move if the game goes on."""
+        if self.finished:
+            return
+        run(self._profiled("end_checks", self.check_end_conditions), self.read_input)
+        if not self.finished:
+            # Deplacement des PNJ apres chaque tour
+            self.character_move()
+
+    def check_end_conditions(self):
+        """End the game if the win or lose condition is met."""
+        if self.win():
+            self.output.emit(L.GAME_WIN_TEXT)
+            self.finished = True
+        elif self.lose():
+            self.output.emit(L.GAME_LOSE_TEXT)
+            self.finished = True
 
     def character_move(self):
-        """Move wandering NPCs when applicable."""
-        for room in self.rooms.values():
-            for character in room.characters:
-                character.move()
+        """Move the wandering NPCs due this turn."""
+        self.npc_scheduler.tick()
 
     def check_auto_combat(self):
         """Declenche automatiquement un combat si un ennemi vivant est present."""
@@ -1217,14 +1289,14 @@ class Game:
         room = self.player.current_room
         if not room.enemies:
             if self.current_world == 4 and room.name == ANCIENT_NEXUS:
-                self.update_world4_quests()
-                self._handle_novaterra_final_choice()
+                yield from self.update_quests()
+                yield from self._handle_novaterra_final_choice()
             if self.current_world == 3 and room.name == SALLE_TRONE:
                 quest = None
                 if hasattr(self, "world3_quests"):
                     quest = self.world3_quests.get(6)
                 if quest and quest.state == STATE_ACTIVE:
-                    self._handle_seren_taal_confrontation()
+                    yield from self._handle_seren_taal_confrontation()
             return
 
         if self.current_world == 3 and room.name == SALLE_TRONE:
@@ -1233,7 +1305,7 @@ class Game:
                 quest = self.world3_quests.get(6)
             if not quest or quest.state != STATE_ACTIVE:
                 return
-            if self._handle_seren_taal_confrontation():
+            if (yield from self._handle_seren_taal_confrontation()):
                 return
 
         for enemy in list(room.enemies):
@@ -1243,15 +1315,15 @@ class Game:
             if enemy.name.lower() == "capitaine vorn":
                 quest = self.player.quest_manager.get_quest_by_id(4)
                 if not quest or quest.state != STATE_ACTIVE:
-                    print(L.VORN_LOCKED_TEXT)
+                    self.output.emit(L.VORN_LOCKED_TEXT)
                     continue
-            self.resolve_combat(self.player, enemy)
+            yield from self.resolve_combat(self.player, enemy)
             if self.finished:
                 return
 
     def resolve_combat(self, player, enemy):
         """Résout un combat automatique piloté par le quiz IA."""
-        print(L.COMBAT_START.format(enemy=enemy.name))
+        self.output.emit(L.COMBAT_START.format(enemy=enemy.name))
         if not enemy.is_alive():
             if enemy in player.current_room.enemies:
                 player.current_room.enemies.remove(enemy)
@@ -1261,30 +1333,33 @@ class Game:
 
         while enemy.is_alive() and player.hp > 0:
             try:
-                question, expected = ai_quiz.get_question()
-                print(L.COMBAT_AI_QUESTION.format(question=question))
+                question, expected = self.quiz.get_question()
+                self.output.emit(L.COMBAT_AI_QUESTION.format(question=question))
             except Exception:  # pylint: disable=broad-exception-caught
-                print(L.COMBAT_AI_FALLBACK_NOTICE)
+                self.output.emit(L.COMBAT_AI_FALLBACK_NOTICE)
                 question = L.COMBAT_AI_FALLBACK_QUESTION
                 expected = L.COMBAT_AI_FALLBACK_ANSWER
-                print(L.COMBAT_AI_QUESTION.format(question=question))
-            answer = self.input_func("> ")
+                self.output.emit(L.COMBAT_AI_QUESTION.format(question=question))
+            answer = yield Prompt()
             debug_kill = answer.strip().lower() == "b"
             try:
-                player_attacks = debug_kill or ai_quiz.evaluate_answer(None, answer, expected)
+                player_attacks = debug_kill or self.quiz.evaluate_answer(
+                    self.player, answer, expected
+                )
             except Exception:  # pylint: disable=broad-exception-caught
-                print(L.COMBAT_AI_EVAL_ERROR)
+                self.output.emit(L.COMBAT_AI_EVAL_ERROR)
                 player_attacks = False
 
             if player_attacks:
                 damage = enemy.hp if debug_kill else player.atk
                 dealt = enemy.take_damage(damage)
-                print(L.COMBAT_PLAYER_ATTACK.format(enemy=enemy.name, damage=dealt))
-                print(L.COMBAT_PLAYER_HP.format(hp=player.hp, max_hp=player.max_hp))
+                self.output.emit(L.COMBAT_PLAYER_ATTACK.format(enemy=enemy.name, damage=dealt))
+                self.output.emit(L.COMBAT_PLAYER_HP.format(hp=player.hp, max_hp=player.max_hp))
                 if enemy.is_alive():
-                    print(L.COMBAT_ENEMY_HP.format(enemy=enemy.name, hp=enemy.hp))
+                    self.output.emit(L.COMBAT_ENEMY_HP.format(enemy=enemy.name, hp=enemy.hp))
                 else:
-                    print(L.COMBAT_ENEMY_DEFEATED.format(enemy=enemy.name))
+                    self.output.emit(L.COMBAT_ENEMY_DEFEATED.format(enemy=enemy.name))
+                    self.events.publish(EnemyDefeated(enemy))
                     enemy_name = enemy.name.lower()
                     if "patrouill" in enemy_name:
                         player.patrollers_defeated = True
@@ -1295,40 +1370,38 @@ class Game:
                         self.adjust_stability(2)
                     if enemy_name == "gouverneur karn":
                         player.karn_defeated = True
-                        self._handle_karn_aftermath()
+                        yield from self._handle_karn_aftermath()
                     if enemy_name == "seren taal":
                         player.ap_taal_confronted = True
                         player.ap_taal_dead = True
-                        print(L.COMBAT_SEREN_DEFEATED)
+                        self.output.emit(L.COMBAT_SEREN_DEFEATED)
                         quest = None
                         if hasattr(self, "world3_quests"):
                             quest = self.world3_quests.get(6)
                         if quest:
                             quest.complete_objective("Confronter Seren Taal", player)
                             quest.complete_objective("Decider du sort de Seren Taal", player)
-                        self.end_world3()
+                        yield from self.end_world3()
                     if enemy_name == "terra guardian":
                         player.novaterra_terra_defeated = True
-                        print(L.COMBAT_TERRA_DEFEATED)
+                        self.output.emit(L.COMBAT_TERRA_DEFEATED)
                         self.end_world4()
                     if enemy in player.current_room.enemies:
                         player.current_room.enemies.remove(enemy)
-                    self.update_world1_quests()
-                    if self.current_world == 3:
-                        self.update_world3_quests()
+                    yield from self.update_quests()
                     return True
             else:
                 dmg = max(0, int(enemy.attack))
                 player.hp = max(0, player.hp - dmg)
-                print(L.COMBAT_ENEMY_ATTACK.format(enemy=enemy.name, damage=dmg))
-                print(L.COMBAT_PLAYER_HP.format(hp=player.hp, max_hp=player.max_hp))
+                self.output.emit(L.COMBAT_ENEMY_ATTACK.format(enemy=enemy.name, damage=dmg))
+                self.output.emit(L.COMBAT_PLAYER_HP.format(hp=player.hp, max_hp=player.max_hp))
                 if dmg > 0 and not severe_injury_applied and player.hp <= (player.max_hp // 2):
                     severe_injury_applied = True
                     self.adjust_stability(-1)
                     if self.finished:
                         return False
                 if player.hp <= 0:
-                    print(L.COMBAT_PLAYER_DEAD)
+                    self.output.emit(L.COMBAT_PLAYER_DEAD)
                     self.finished = True
                     return False
 
@@ -1337,43 +1410,113 @@ class Game:
     # Process the command entered by the player
     def process_command(self, command_string) -> None:
         """Parse and execute a command string."""
+        run(self.command_routine(command_string), self.read_input)
+        self._finish_profile()
+
+    def command_routine(self, command_string):
+        """Routine: parse and execute a command, then its triggers."""
 
 
         # Ignorer les commandes vides
         if command_string.strip() == "":
             return
 
+        if self.profiler is not None:
+            self._profile_sample = self.profiler.begin(
+                command_string.split(" ", 1)[0], self.commands
+            )
+
+        parsed = yield from delegate(
+            self._profiled("parse", self.parse_command, command_string)
+        )
+        # If the command is recognized, execute it
+        if parsed is not None:
+            command, list_of_words = parsed
+            try:
+                yield from delegate(self._profiled(
+                    "action", command.action, self, list_of_words, command.number_of_parameters
+                ))
+            except Exception as error:  # pylint: disable=broad-exception-caught
+                self.output.emit(L.COMMAND_EXEC_ERROR)
+                if self.on_command_error is not None:
+                    self.on_command_error(command_string, error)
+                return
+            yield from delegate(self._profiled("auto_combat", self.check_auto_combat))
+            yield from delegate(self._profiled("quests", self.update_quests))
 
+    def parse_command(self, command_string):
+        """Return (command, words) for a command line, or None if unknown."""
         # Split the command string into a list of words
         list_of_words = command_string.split(" ")
         command_word = list_of_words[0]
 
-
         # If the command is not recognized, print an error message
         if command_word not in self.commands:
-            print(L.UNKNOWN_COMMAND_TEXT.format(command=command_word))
-        # If the command is recognized, execute it
-        else:
-            command = self.commands[command_word]
-            try:
-                command.action(self, list_of_words, command.number_of_parameters)
-            except Exception:  # pylint: disable=broad-exception-caught
-                print(L.COMMAND_EXEC_ERROR)
-                return
-            self.check_auto_combat()
-            if self.current_world == 2:
-                self.update_world2_quests()
-            if self.current_world == 3:
-                self.update_world3_quests()
-            if self.current_world == 4:
-                self.update_world4_quests()
+            self.output.emit(L.UNKNOWN_COMMAND_TEXT.format(command=command_word))
+            return None
+        return self.commands[command_word], list_of_words
+
+    def _profiled(self, phase, function, *args):
+        """Call ``function(*args)``, measured as ``phase`` when profiling."""
+        if self.profiler is None or self._profile_sample is None:
+            return function(*args)
+        return self.profiler.measure(self._profile_sample, phase, function, *args)
+
+    def _finish_profile(self):
+        """Record the total of the command just played, if profiled."""
+        if self._profile_sample is not None:
+            if self.profiler is not None:
+                self.profiler.finish(self._profile_sample)
+            self._profile_sample = None
+
+    def save(self):
+        """Return a compact binary snapshot of the session (see snapshot.py).
+
+        Only possible between two commands: a game waiting on a prompt
+        raises SnapshotError.
+        """
+        return snapshot.dumps(self)
+
+    @classmethod
+    def load(cls, data, questions=None):
+        """Rebuild a session from ``save()`` output, ready for its next command."""
+        return snapshot.loads(cls(questions=questions), data)
+
+    def enable_journal(self, journal):
+        """Record this session's input in ``journal`` (see journal.py).
+
+        Attach it before ``start`` or ``play``: a new journal first records
+        the session seed, drawn here if none was given.
+        """
+        if not journal.started:
+            if self.seed is None:
+                self.seed = secrets.randbits(64)
+            journal.begin(self.seed)
+        self.journal = journal
+        return journal
+
+    def disable_journal(self):
+        """Stop recording input; the journal itself is left open."""
+        self.journal = None
+
+    def enable_profiling(self, profiler=None):
+        """Attach a CommandProfiler (a new one by default) and return it."""
+        if profiler is None:
+            profiler = CommandProfiler()
+            profiler.start()
+        self.profiler = profiler
+        return profiler
+
+    def disable_profiling(self):
+        """Detach the profiler; commands are no longer measured."""
+        self.profiler = None
 
 
     # Print the welcome message
     def print_welcome(self):
         """Print the welcome banner."""
         for line in L.WELCOME_LINES:
-            print(line.format(name=self.player.name))
+            self.output.emit(line.format(name=self.player.name))
         #
 
     # Check if the player has won
@@ -1385,18 +1528,15 @@ class Game:
             if not quest.is_completed:
                 return False
 
-        print(L.PRISON_RELEASE_TEXT)
+        self.output.emit(L.PRISON_RELEASE_TEXT)
         return True
 
     def lose(self):
         """Return True when the lose condition is met."""
         if self.player.current_room.name == PRISON:
-            if not any(
-                item.name == L.ITEM_DEFINITIONS["keycard"]["name"]
-                for item in self.player.inventory
-            ):
+            if L.ITEM_DEFINITIONS["keycard"]["name"] not in self.player.inventory:
                 for line in L.PRISON_TURRET_ALERT_LINES:
-                    print(line)
+                    self.output.emit(line)
                 return True
         return False
 
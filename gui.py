@@ -7,24 +7,7 @@ from tkinter import ttk, simpledialog
 
 import labels as L
 from game import Game
-
-
-class _StdoutRedirector:
-    """Redirect sys.stdout writes into a Tkinter Text widget."""
-
-    def __init__(self, text_widget):
-        self.text_widget = text_widget
-
-    def write(self, msg):
-        """Write message to the Text widget."""
-        if msg:
-            self.text_widget.configure(state="normal")
-            self.text_widget.insert("end", msg)
-            self.text_widget.see("end")
-            self.text_widget.configure(state="disabled")
-
-    def flush(self):
-        """Flush method required by sys.stdout interface (no-op for Text widget)."""
+from output import BufferedSink
 
 
 class GameGUI(tk.Tk):
@@ -74,9 +57,7 @@ class GameGUI(tk.Tk):
         self._build_layout()
         self._show_starting_image()
 
-        self.original_stdout = sys.stdout
-        sys.stdout = _StdoutRedirector(self.text_output)
-
+        self.game.set_output(BufferedSink(on_flush=self._append_output))
         self.game.set_input_provider(self._prompt_input)
 
         name = simpledialog.askstring("Nom", "Entrez votre nom:", parent=self)
@@ -85,6 +66,7 @@ class GameGUI(tk.Tk):
 
         self.game.setup(player_name=name)
         self.game.choice_intro()
+        self.game.output.flush()
 
         self._update_room_image()
 
@@ -304,7 +286,15 @@ class GameGUI(tk.Tk):
             font=("Segoe UI", 10, "bold"),
         ).grid(row=0, column=1, sticky="e")
 
+    def _append_output(self, text):
+        """Append flushed game output to the console Text widget."""
+        self.text_output.configure(state="normal")
+        self.text_output.insert("end", text)
+        self.text_output.see("end")
+        self.text_output.configure(state="disabled")
+
     def _prompt_input(self, prompt):
+        self.game.output.flush()
         self.update_idletasks()
         response = simpledialog.askstring("Entrée", prompt, parent=self)
         if self.entry:
@@ -411,18 +401,11 @@ class GameGUI(tk.Tk):
     def _send_command(self, command):
         if self.game.finished:
             return
-        print(f"> {command}\n")
+        self.game.output.emit(f"> {command}\n")
         self.game.process_command(command)
         self._update_room_image()
-        if not self.game.finished:
-            if self.game.win():
-                print(L.GAME_WIN_TEXT)
-                self.game.finished = True
-            elif self.game.lose():
-                print(L.GAME_LOSE_TEXT)
-                self.game.finished = True
-            else:
-                self.game.character_move()
+        self.game.finish_turn()
+        self.game.output.flush()
         if not self.game.finished:
             self.entry.focus_set()
         if self.game.finished:
@@ -430,7 +413,6 @@ class GameGUI(tk.Tk):
             self.after(600, self._on_close)
 
     def _on_close(self):
-        sys.stdout = self.original_stdout
         self.destroy()
 
 
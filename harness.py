@@ -0,0 +1,25 @@
+"""Helpers shared by the headless tools (benchmark, explorer, fuzzer)."""
+
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+
+from game import Game
+
+
+def headless_game(seed, sink):
+    """A new game writing to ``sink``, not started yet."""
+    game = Game(seed=seed)
+    game.set_output(sink)
+    return game
+
+
+@contextmanager
+def task_mapper(workers, chunksize=1):
+    """Yield a ``map``-like callable: the built-in ``map`` when ``workers``
+    is 0, else the map of a process pool of ``workers`` processes (all
+    CPUs if None), shut down on exit."""
+    if workers == 0:
+        yield map
+        return
+    with ProcessPoolExecutor(workers) as executor:
+        yield lambda fn, tasks: executor.map(fn, tasks, chunksize=chunksize)
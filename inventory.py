@@ -0,0 +1,73 @@
+"""Player inventory: items in pickup order, indexed by normalised name."""
+
+
+def normalize_name(name):
+    """Key used to look items up by name (case-insensitive)."""
+    return name.lower()
+
+
+class Inventory:
+    """Ordered item container with O(1) lookups by name and a running weight.
+
+    Items keep their pickup order, so ``inventory[index - 1]`` still serves
+    the numbered ``check``/``use <num>`` commands. The total weight is
+    updated on every add/remove; never change it from outside.
+
+    Examples:
+        >>> from item import Item
+        >>> inventory = Inventory()
+        >>> inventory.add(Item("Clé", "Une petite clé.", 0.5))
+        >>> "clé" in inventory, len(inventory), inventory.weight
+        (True, 1, 0.5)
+        >>> inventory.discard("CLÉ").name
+        'Clé'
+        >>> bool(inventory), inventory.weight
+        (False, 0.0)
+    """
+
+    def __init__(self, items=()):
+        self._items = []
+        self._by_name = {}
+        self.weight = 0
+        for item in items:
+            self.add(item)
+
+    def add(self, item):
+        """Append an item and account for its weight."""
+        self._items.append(item)
+        self._by_name.setdefault(normalize_name(item.name), []).append(item)
+        self.weight += item.weight
+
+    def remove(self, item):
+        """Remove this exact item (ValueError if it is not carried)."""
+        self._items.remove(item)
+        key = normalize_name(item.name)
+        same_name = self._by_name[key]
+        same_name.remove(item)
+        if not same_name:
+            del self._by_name[key]
+        self.weight -= item.weight
+
+    def find(self, name):
+        """Return the first carried item with this name, or None."""
+        same_name = self._by_name.get(normalize_name(name))
+        return same_name[0] if same_name else None
+
+    def discard(self, name):
+        """Remove and return the first item with this name (None if absent)."""
+        item = self.find(name)
+        if item is not None:
+            self.remove(item)
+        return item
+
+    def __contains__(self, name):
+        return normalize_name(name) in self._by_name
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
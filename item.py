@@ -32,7 +32,6 @@ class Item:  # pylint: disable=too-many-instance-attributes,too-few-public-metho
         self.effect_value = effect_value
         self.usable = usable
         self.on_pickup = on_pickup
-        self.pickup_seen = False
 
     def __str__(self):
         return L.ITEM_STR_TEMPLATE.format(
@@ -42,26 +41,18 @@ class Item:  # pylint: disable=too-many-instance-attributes,too-few-public-metho
         )
 
 
-def create_stability_note():
+def stability_note_pickup(player, _game):
     """
-    Create the narrative note that hints at mental collapse without numbers.
-    The message is returned only once, on first pickup.
+    Pickup hook of the narrative note that hints at mental collapse without
+    numbers. The message is returned only once per player, on first pickup.
     """
-    text = L.STABILITY_NOTE_TEXT
-    note = Item(
-        L.STABILITY_NOTE_NAME,
-        L.STABILITY_NOTE_DESC,
-        0,
-        usable=False,
-    )
-    note.pickup_seen = False
+    if player.read_stability_note:
+        return None
+    player.read_stability_note = True
+    return "\n" + L.STABILITY_NOTE_TEXT + "\n"
 
-    def on_pickup(player, _game):
-        if note.pickup_seen:
-            return None
-        note.pickup_seen = True
-        player.read_stability_note = True
-        return "\n" + text + "\n"
 
-    note.on_pickup = on_pickup
-    return note
+# Hooks referenced by name ("on_pickup") in the world definitions.
+PICKUP_HANDLERS = {
+    "stability_note": stability_note_pickup,
+}
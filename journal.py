@@ -0,0 +1,344 @@
+"""Write-ahead journal of a session's input, with periodic checkpoints.
+
+A game is deterministic given its seed and the lines it is fed, so a
+session is recorded as that seed plus every line, in order: commands and
+prompt answers alike, written as they enter the game (``Game.submit`` and
+the ``input_func`` reads of ``Game.play``) and before they are played.
+
+Each session has its own directory:
+
+- ``journal``: a short header, then records ``<length, crc32, sequence,
+  kind>`` followed by a UTF-8 payload. Records go straight to the OS
+  (nothing is lost if the process dies) and are fsynced in groups of
+  ``sync_every`` records, or by the host calling ``sync()`` periodically.
+- ``checkpoint``: the sequence of the last record it covers and a
+  ``Game.save()`` snapshot, replaced atomically every ``checkpoint_every``
+  turns; the journal is then truncated.
+
+Given a ``writer`` (a single-thread executor shared by the journals of a
+host), the fsyncs, the checkpoint files and the truncation run on that
+thread: the caller only pays for the snapshot and the ``os.write`` of
+each record. Records appended while a checkpoint is being written are
+kept by the truncation.
+
+``recover`` loads the checkpoint and replays only the records after it,
+so recovery time is bounded by the checkpoint interval. A torn or corrupt
+record at the end of the journal (a crash during a write) ends the replay
+and is cut off before new records are appended.
+
+Usage:
+    python journal.py DIR          # recover a session and print its state
+"""
+
+import argparse
+import os
+import shutil
+import struct
+import sys
+import threading
+import zlib
+
+from game import Game
+from output import NullSink
+
+MAGIC = b"VGJ1"
+CHECKPOINT_MAGIC = b"VGC1"
+JOURNAL_FORMAT = 1
+HEADER = struct.Struct("<4sH")
+RECORD = struct.Struct("<IIQB")
+CHECKPOINT_HEADER = struct.Struct("<4sHQI")
+
+KIND_BEGIN = 1  # payload: the session seed
+KIND_NAME = 2  # payload: the player name given to Game.start
+KIND_LINE = 3  # payload: one input line
+
+JOURNAL_FILE = "journal"
+CHECKPOINT_FILE = "checkpoint"
+DEFAULT_SYNC_EVERY = 32
+DEFAULT_CHECKPOINT_EVERY = 50
+
+
+class JournalError(ValueError):
+    """Raised when a journal directory cannot be recovered."""
+
+
+def _crc(sequence, kind, data):
+    return zlib.crc32(data, zlib.crc32(struct.pack("<QB", sequence, kind)))
+
+
+def _fsync_directory(path):
+    """Make a rename in ``path`` durable (POSIX only)."""
+    if os.name != "posix":
+        return
+    fd = os.open(path, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def read_records(path):
+    """(records, end offset of the last valid one) of a journal file.
+
+    Each record is (sequence, kind, text). Reading stops at the first
+    short or corrupt record.
+    """
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except FileNotFoundError:
+        return [], 0
+    if len(data) < HEADER.size:
+        return [], 0
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != JOURNAL_FORMAT:
+        raise JournalError(f"Not a format {JOURNAL_FORMAT} journal: {path}")
+    records = []
+    offset = HEADER.size
+    while offset + RECORD.size <= len(data):
+        length, crc, sequence, kind = RECORD.unpack_from(data, offset)
+        start = offset + RECORD.size
+        payload = data[start:start + length]
+        if len(payload) < length or _crc(sequence, kind, payload) != crc:
+            break
+        records.append((sequence, kind, payload.decode("utf-8")))
+        offset = start + length
+    return records, offset
+
+
+def read_checkpoint(path):
+    """(sequence, snapshot bytes) of a checkpoint file, or None."""
+    try:
+        with open(path, "rb") as handle:
+            data = handle.read()
+    except FileNotFoundError:
+        return None
+    if len(data) < CHECKPOINT_HEADER.size:
+        raise JournalError(f"Truncated checkpoint: {path}")
+    magic, version, sequence, crc = CHECKPOINT_HEADER.unpack_from(data, 0)
+    snapshot = data[CHECKPOINT_HEADER.size:]
+    if magic != CHECKPOINT_MAGIC or version != JOURNAL_FORMAT or zlib.crc32(snapshot) != crc:
+        raise JournalError(f"Corrupt checkpoint: {path}")
+    return sequence, snapshot
+
+
+class Journal:  # pylint: disable=too-many-instance-attributes
+    """Append-only input log of one session, plus its latest checkpoint.
+
+    Attach it to a game with ``game.enable_journal(journal)`` before the
+    game starts; the game then records its input and reports finished
+    turns, and the journal checkpoints on its own. With a ``writer``
+    executor, the disk syncs happen there (see the module docstring) and
+    a failure is raised as JournalError by the next call.
+    """
+
+    def __init__(
+        self,
+        directory,
+        sync_every=DEFAULT_SYNC_EVERY,
+        checkpoint_every=DEFAULT_CHECKPOINT_EVERY,
+        writer=None,
+    ):
+        self.directory = directory
+        self.sync_every = sync_every
+        self.checkpoint_every = checkpoint_every
+        self.writer = writer
+        self.failure = None
+        self.journal_path = os.path.join(directory, JOURNAL_FILE)
+        self.checkpoint_path = os.path.join(directory, CHECKPOINT_FILE)
+        os.makedirs(directory, exist_ok=True)
+
+        records, end = read_records(self.journal_path)
+        checkpoint = read_checkpoint(self.checkpoint_path)
+        self.sequence = max(
+            records[-1][0] if records else 0, checkpoint[0] if checkpoint else 0
+        )
+        self.started = bool(records) or checkpoint is not None
+        self._fd = os.open(self.journal_path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        if end:
+            os.ftruncate(self._fd, end)  # drop a torn tail
+        else:
+            os.ftruncate(self._fd, 0)
+            os.write(self._fd, HEADER.pack(MAGIC, JOURNAL_FORMAT))
+        self._unsynced = 0
+        self._turns = 0
+        self._closed = False
+        self._lock = threading.Lock()  # appends vs. the post-checkpoint truncation
+        self._tail = None  # records appended while a checkpoint is in flight
+
+    def begin(self, seed):
+        """Start a new session's journal with its seed."""
+        self._append(KIND_BEGIN, str(seed))
+        self.started = True
+
+    def record_name(self, name):
+        """Record the player name given to ``Game.start``."""
+        self._append(KIND_NAME, name)
+
+    def record_line(self, line):
+        """Record one input line, before the game plays it."""
+        self._append(KIND_LINE, line)
+
+    def _append(self, kind, text):
+        self._check_failure()
+        if self._closed:
+            raise JournalError(f"Journal closed: {self.directory}")
+        data = text.encode("utf-8")
+        self.sequence += 1
+        record = RECORD.pack(len(data), _crc(self.sequence, kind, data), self.sequence, kind)
+        with self._lock:
+            os.write(self._fd, record + data)
+            if self._tail is not None:
+                self._tail.append(record + data)
+        self._unsynced += 1
+        if self._unsynced >= self.sync_every:
+            self.sync()
+
+    def _run(self, function, *args):
+        """Call ``function`` here, or queue it on the writer thread."""
+        if self.writer is None:
+            function(*args)
+        else:
+            self.writer.submit(function, *args).add_done_callback(self._note_failure)
+
+    def _note_failure(self, future):
+        if future.exception() is not None and self.failure is None:
+            self.failure = future.exception()
+
+    def _check_failure(self):
+        if self.failure is not None:
+            raise JournalError(f"Journal write failed in {self.directory}") from self.failure
+
+    def sync(self):
+        """Flush the records written since the last sync to disk."""
+        self._check_failure()
+        if self._unsynced:
+            self._unsynced = 0
+            self._run(self._fsync)
+
+    def _fsync(self):
+        if self._fd is not None:
+            os.fsync(self._fd)
+
+    def turn_finished(self, game):
+        """Called by the game after each turn; checkpoints every N turns."""
+        self._turns += 1
+        if self._turns >= self.checkpoint_every and self._tail is None:
+            self.checkpoint(game)
+
+    def checkpoint(self, game):
+        """Replace the checkpoint with a snapshot of ``game`` and truncate the journal.
+
+        The game must be between two commands (see snapshot.py). With a
+        writer, only the snapshot is taken here, and the call does nothing
+        while the previous checkpoint is still being written.
+        """
+        self._check_failure()
+        if self._tail is not None:
+            return
+        snapshot = game.save()
+        self._tail = []
+        self._turns = 0
+        self._run(self._write_checkpoint, self.sequence, snapshot)
+
+    def _write_checkpoint(self, covered, snapshot):
+        temporary = self.checkpoint_path + ".tmp"
+        try:
+            with open(temporary, "wb") as handle:
+                handle.write(
+                    CHECKPOINT_HEADER.pack(
+                        CHECKPOINT_MAGIC, JOURNAL_FORMAT, covered, zlib.crc32(snapshot)
+                    )
+                )
+                handle.write(snapshot)
+                handle.flush()
+                os.fsync(handle.fileno())
+            os.replace(temporary, self.checkpoint_path)
+            _fsync_directory(self.directory)
+        except BaseException:
+            with self._lock:
+                self._tail = None
+            raise
+        # Records up to ``covered`` are in the checkpoint: a crash before the
+        # truncation only leaves records that recovery skips. The ones
+        # appended since the snapshot are written back after the header.
+        with self._lock:
+            tail, self._tail = self._tail, None
+            os.ftruncate(self._fd, 0)
+            os.write(self._fd, HEADER.pack(MAGIC, JOURNAL_FORMAT) + b"".join(tail))
+        os.fsync(self._fd)
+
+    def close(self, delete=False):
+        """Sync and close the journal file; remove its directory if ``delete``."""
+        if not self._closed:
+            self._closed = True
+            self._run(self._close, delete)
+
+    def _close(self, delete):
+        os.fsync(self._fd)
+        os.close(self._fd)
+        self._fd = None
+        if delete:
+            shutil.rmtree(self.directory, ignore_errors=True)
+
+
+def _restart(directory, records, questions):
+    """Game at the last checkpoint, or started anew from the journal's
+    first records; return (game, last sequence number it covers)."""
+    checkpoint = read_checkpoint(os.path.join(directory, CHECKPOINT_FILE))
+    if checkpoint is not None:
+        covered, data = checkpoint
+        game = Game.load(data, questions=questions)
+        game.set_output(NullSink())
+        return game, covered
+    if not records or records[0][1] != KIND_BEGIN:
+        raise JournalError(f"No checkpoint and no session start in {directory}")
+    covered = records[0][0]
+    game = Game(seed=int(records[0][2]), questions=questions)
+    game.set_output(NullSink())
+    name = None
+    if len(records) > 1 and records[1][1] == KIND_NAME:
+        covered, _kind, name = records[1]
+    game.start(name)
+    return game, covered
+
+
+def recover(directory, questions=None, **options):
+    """Rebuild the session journaled in ``directory``; return (game, journal).
+
+    The game's output goes to a NullSink during the replay (set the real
+    sink afterwards), and the reopened journal is attached to it.
+    """
+    records, _end = read_records(os.path.join(directory, JOURNAL_FILE))
+    game, covered = _restart(directory, records, questions)
+    for sequence, kind, text in records:
+        if sequence <= covered:
+            continue
+        if kind != KIND_LINE:
+            raise JournalError(f"Unexpected record kind {kind} at {sequence}")
+        game.submit(text)
+
+    journal = Journal(directory, **options)
+    game.enable_journal(journal)
+    return game, journal
+
+
+def main(argv=None):
+    """Entry point: recover a journaled session and print where it stands."""
+    parser = argparse.ArgumentParser(description="Recover a journaled Vigilant session")
+    parser.add_argument("directory")
+    args = parser.parse_args(argv)
+    game, journal = recover(args.directory)
+    journal.close()
+    player = game.player
+    print(
+        f"world {game.current_world}, room {player.current_room.name if player else '-'}, "
+        f"sequence {journal.sequence}, finished {game.finished}"
+    )
+    if game.pending_prompt is not None:
+        print(f"waiting on: {game.pending_prompt.text!r}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -3,229 +3,6 @@
 Libellés centralisés pour la narration, les PNJ et les quêtes.
 """
 
-# =========================
-#   WORLD DESCRIPTIONS
-# =========================
-
-WORLD1_ROOM_DESCRIPTIONS = {
-    "Eridani Prime": (
-        "un district pauvre où des fumées noires s’élèvent au-dessus des toits. "
-        "Des affiches de propagande couvrent les murs. "
-        "Les habitants avancent avec un mélange de peur et de résignation."
-    ),
-    "Avant-poste minier": (
-        "au milieu d’échafaudages branlants, de gardes épuisés et de mineurs au regard vide. "
-        "L’air est lourd de poussière et d’électricité."
-    ),
-    "Marché labyrinthique": (
-        "un dédale d’allées étroites, d’échoppes sombres et de murmures étouffés. "
-        "Les hommes de main de Vorn rôdent à chaque coin d’ombre."
-    ),
-    "Cité-forteresse": (
-        "des tours massives, des projecteurs écarlates et des soldats patrouillant sans relâche. "
-        "C’est ici que le capitaine Vorn impose son règne."
-    ),
-}
-
-WORLD1_PERCEPTION_LOW = {
-    "Eridani Prime": (
-        "un district qui vous semble plus étroit, "
-        "les ombres collent aux murs et les voix se perdent."
-    ),
-    "Marché labyrinthique": (
-        "un labyrinthe étouffant où chaque pas semble trop bruyant."
-    ),
-    "Cité-forteresse": (
-        "des tours qui paraissent se pencher, "
-        "les projecteurs vous écorchent plus que la lumière."
-    ),
-}
-
-WORLD2_ROOM_DESCRIPTIONS = {
-    "Base rebelle de Velyra": (
-        "un bunker dissimulé sous les ruines d’un ancien quartier industriel. "
-        "Des écrans grésillent, affichant les patrouilles de drones du gouverneur Karn."
-    ),
-    "Quartier civil": (
-        "des immeubles serrés sous des néons blafards. "
-        "Les habitants marchent tête baissée sous l’œil constant des caméras."
-    ),
-    "Entrepôts civils": (
-        "de vastes hangars contenant les réserves d’énergie et de nourriture. "
-        "Des gardes mécaniques veillent sans relâche."
-    ),
-    "Prison centrale": (
-        "une forteresse de métal noir hérissée de tourelles automatiques. "
-        "C’est ici que sont enfermés Narek et les chefs rebelles."
-    ),
-    "Citadelle de Karn": (
-        "un gratte-ciel blindé entouré de drones, cœur du pouvoir du Gouverneur Karn. "
-        "Les IA marchandes y supervisent chaque transaction, chaque mouvement."
-    ),
-}
-
-WORLD3_ROOM_DESCRIPTIONS = {
-    "District d'Or": (
-        "un quartier luxueux où tout semble parfait : rues propres, jardins calibrés, "
-        "habitants souriants, mais dont les yeux semblent vides."
-    ),
-    "Quartier des Hologrammes": (
-        "des illusions mouvantes envahissent les rues : visages qui se dédoublent, "
-        "publicités vivantes, faux souvenirs et ombres qui n'appartiennent à personne."
-    ),
-    "Le Nœud": (
-        "un complexe gigantesque regroupant les serveurs neuronaux d'Aurelion Prime. "
-        "Il régule émotions, souvenirs et réactions de toute la population."
-    ),
-    "Palais de Lumière": (
-        "un ensemble de jardins flottants, ponts de cristal et escaliers étincelants. "
-        "Les serviteurs semblent humains, mais agissent comme des programmes."
-    ),
-    "Salle du Trône": (
-        "une vaste pièce circulaire baignée d’or, où Seren Taal attend, immobile, "
-        "dans un halo d’illusions."
-    ),
-}
-
-WORLD3_ALT_DESCRIPTIONS = {
-    "District d'Or": {
-        "infiltrate": (
-            "Vous passez pour des habitants d’élite. Les regards sont admiratifs, mais vides."
-        ),
-        "reveal": (
-            "Des drones vous surveillent. Les habitants gardent leurs distances, méfiants."
-        ),
-    },
-    "Le Nœud": {
-        "break": (
-            "Les illusions se fissurent. Les habitants errent, effondrés, découvrant "
-            "les horreurs qu’ils ignoraient. Cris, larmes, terreur."
-        ),
-        "keep": (
-            "Les illusions brillent comme jamais : bonheur forcé, sourires figés, "
-            "éclats de rire synthétiques."
-        ),
-    },
-}
-
-WORLD4_ROOM_DESCRIPTIONS = {
-    "Orbital Station Ruins": (
-        "une structure alien brisée, flottant au-dessus de Nova Terra. "
-        "Des inscriptions anciennes vibrent faiblement."
-    ),
-    "Landing Valley": (
-        "une vallée fertile, baignée de lumière. "
-        "Herbes mouvantes, animaux paisibles, air parfaitement pur."
-    ),
-    "Crystal Plains": (
-        "de vastes plaines remplies de cristaux luminescents réagissant à votre présence."
-    ),
-    "Ancient Nexus": (
-        "un monolithe vivant, partiellement organique. "
-        "Une conscience très ancienne vous observe."
-    ),
-    "The Heart of Terra": (
-        "une salle circulaire, noyau énergétique de Nova Terra. "
-        "L'esprit de la planète vous attend."
-    ),
-}
-
-# =========================
-#   NPC DEFINITIONS
-# =========================
-
-WORLD1_NPCS = {
-    "ralen": {
-        "description": "Un citoyen au regard vif malgré les cendres sur son visage.",
-        "messages": [
-            "Vous n’avez pas l’air d’ici.",
-            "Les mines à l’est cachent bien des choses.",
-        ],
-    },
-    "malek": {
-        "description": "Un technicien nerveux qui tente de réparer une foreuse brisée.",
-        "messages": [
-            "Cette foreuse ne tiendra plus longtemps.",
-            "Sans matériel, tout va s’effondrer.",
-        ],
-    },
-    "marchand": {
-        "description": "Un homme sec, aux yeux calculateurs, entouré de caisses verrouillées.",
-        "messages": [
-            "Tout a un prix.",
-            "Même la loyauté.",
-        ],
-    },
-    "yara": {
-        "description": "Une femme encapuchonnée, regard déterminé, symbole rebelle au poignet.",
-        "messages": [
-            "Ne fais confiance à personne ici.",
-            "Le Marchand vend des raccourcis. Le prix te suivra.",
-            "La forteresse tombera.",
-        ],
-    },
-    "nommera": {
-        "description": (
-            "Une jeune femme aux mains couvertes de poussière, "
-            "le regard creux mais lucide."
-        ),
-        "messages": [
-            "Ils ont tout pris.",
-            "Il ne nous reste presque rien.",
-        ],
-    },
-    "kael": {
-        "description": "Un éclaireur taciturne, toujours en mouvement.",
-        "messages": [
-            "Je ne m'attarde jamais au même endroit.",
-            "Les ruelles changent plus vite que les ordres.",
-        ],
-    },
-}
-
-WORLD2_NPCS = {
-    "yara": {
-        "description": "Cheffe rebelle d'Eridani, désormais en mission sur Velyra IX.",
-        "messages": [
-            "Les civils souffrent ici. On ne peut pas rester passifs.",
-            "Choisissez une méthode : piller ou corrompre un général.",
-        ],
-    },
-    "nommera": {
-        "description": "Une survivante civile au regard fatigué, mais encore lucide.",
-        "messages": [
-            "Les entrepôts portent les traces de la peur.",
-            "Certains traitent avec un général. D'autres pillent.",
-        ],
-    },
-    "narek": {
-        "description": "Un rebelle amaigri mais déterminé, encore marqué par sa captivité.",
-        "messages": [
-            "Merci de m'avoir sauvé. Je n'oublierai pas.",
-            "Le pouvoir doit tomber, autrement on recommencera.",
-        ],
-    },
-}
-
-WORLD3_NPCS = {
-    "citoyen_dore": {
-        "description": (
-            "Un habitant riche dont les émotions sont filtrées par les serveurs du Nœud."
-        ),
-        "messages": [
-            "Aurelion est parfait. Les autres mondes souffrent ? Ils sont faibles.",
-        ],
-    },
-    "habitant_glitche": {
-        "description": (
-            "Son corps scintille comme un hologramme mal calibré. Sa voix tremble, en écho."
-        ),
-        "messages": [
-            "...v...v...vvous... n'êtes pas... attendus...",
-        ],
-    },
-}
-
 # =========================
 #   CHARACTER REACTIONS
 # =========================
@@ -309,8 +86,6 @@ NOVATERRA_COMPANION_LINES = {
 #   ITEMS / LORE
 # =========================
 
-STABILITY_NOTE_NAME = "Note griffonnée"
-STABILITY_NOTE_DESC = "Un papier froissé couvert d'une écriture hésitante."
 STABILITY_NOTE_TEXT = (
     "Ici, on ne meurt pas seulement de blessures.\n"
     "Certains s'effondrent bien avant...\n"
@@ -0,0 +1,72 @@
+"""Output channels used by the game instead of bare print().
+
+Every module writes through a sink owned by its session, so several games
+can share a process without touching sys.stdout.
+"""
+
+import abc
+import sys
+
+
+class OutputSink(abc.ABC):
+    """Base sink. ``emit`` behaves like print() with a single argument."""
+
+    @abc.abstractmethod
+    def write(self, text):
+        """Write raw text, without adding a newline."""
+
+    def emit(self, text=""):
+        """Write one line of text."""
+        self.write(f"{text}\n")
+
+    def flush(self):
+        """Deliver pending output; return the delivered text when buffered."""
+        return ""
+
+
+class ConsoleSink(OutputSink):
+    """Write straight to the current sys.stdout (console mode)."""
+
+    def write(self, text):
+        sys.stdout.write(text)
+
+    def flush(self):
+        sys.stdout.flush()
+        return ""
+
+
+class BufferedSink(OutputSink):
+    """Collect a session's output and hand it over once per command.
+
+    ``on_flush`` receives the collected text when ``flush`` is called and
+    something was written since the previous flush.
+    """
+
+    def __init__(self, on_flush=None):
+        self._parts = []
+        self.on_flush = on_flush
+
+    def write(self, text):
+        self._parts.append(text)
+
+    def flush(self):
+        if not self._parts:
+            return ""
+        text = "".join(self._parts)
+        self._parts.clear()
+        if self.on_flush is not None:
+            self.on_flush(text)
+        return text
+
+
+class NullSink(OutputSink):
+    """Discard everything (benchmarks, replays)."""
+
+    def write(self, text):
+        pass
+
+    def emit(self, text=""):
+        pass
+
+
+DEFAULT_OUTPUT = ConsoleSink()
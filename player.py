@@ -1,11 +1,89 @@
 """Player state and inventory management."""
 
 # Define the Player class.
+from collections import deque
+
 from quest import QuestManager
+from inventory import Inventory
 import labels as L
-
-
-class Player():  # pylint: disable=too-many-instance-attributes
+from output import DEFAULT_OUTPUT
+from events import FlagChanged, RoomEntered
+from flags import FlagRegistry
+
+
+# Stability buckets: lowest stability of each bucket, best bucket first, and
+# the narrative label of each bucket (the last one has no lower bound).
+STABILITY_THRESHOLDS = (9, 7, 5, 3, 1)
+STABILITY_STATES = (
+    L.STABILITY_STATE_STABLE,
+    L.STABILITY_STATE_FRAGILE,
+    L.STABILITY_STATE_UNSTABLE,
+    L.STABILITY_STATE_VACILLANT,
+    L.STABILITY_STATE_EDGE,
+    L.STABILITY_STATE_COLLAPSE,
+)
+
+# Number of rooms kept on the back-stack used by the "back" command.
+HISTORY_LIMIT = 64
+
+# Progression flags, all False for a new player. They are stored as the bits
+# of Player.flags; setting one to a new value publishes a FlagChanged event
+# (see events.py). velyra_method holds a string and stays a property.
+FLAGS = FlagRegistry((
+    # flags for world 1 progression
+    "met_ralen",
+    "met_malek",
+    "met_marchand",
+    "met_yara",
+    "met_nommera",
+    "world1_npcs_bonus",
+    "has_crystal",
+    "merchant_refused",
+    "merchant_sacrifice",
+    "patrollers_defeated",
+    "vorn_defeated",
+    "karn_defeated",
+    "read_stability_note",
+    "karn_aftermath_done",
+    "saved_yara",
+    "saved_narek",
+    "yara_dead",
+    "narek_dead",
+
+    # flags for world 2 progression
+    "velyra_met_leader",
+    "velyra_resources_secured",
+    "velyra_negotiated",
+    "velyra_brutal",
+    "velyra_narek_resolved",
+    "velyra_method_applied",
+
+    # flags for world 3 progression
+    "ap_choice_infiltrate",
+    "ap_choice_reveal",
+    "attack_holo_done",
+    "ap_citizen_spoken",
+    "ap_glitch_spoken",
+    "ap_break_illusions",
+    "ap_keep_illusions",
+    "ap_taal_confronted",
+    "ap_taal_alliance",
+    "ap_taal_dead",
+
+    # flags for world 4 progression
+    "world4_started",
+    "novaterra_explored_station",
+    "novaterra_final_done",
+    "novaterra_choice_harmony",
+    "novaterra_choice_domination",
+    "novaterra_choice_renounce",
+    "novaterra_terra_defeated",
+    "novaterra_companion_spoken",
+    "novaterra_observed_planet",
+))
+
+
+class Player():  # pylint: disable=too-many-instance-attributes,too-many-public-methods
     """
     Représente le joueur du jeu.
 
@@ -47,73 +125,59 @@ class Player():  # pylint: disable=too-many-instance-attributes
     """
 
     # Define the constructor.
-    def __init__(self, name):  # pylint: disable=too-many-statements
+    def __init__(self, name, output=None, events=None):
+        self.events = events
         self.name = name
-        self.current_room = None
-        self.history = []
-        self.inventory = []
+        self.output = output if output is not None else DEFAULT_OUTPUT
+        self.history = deque(maxlen=HISTORY_LIMIT)  # back-stack of rooms
+        self.visited_rooms = {}  # room name -> room, in visit order
+        self._current_room = None
+        self.inventory = Inventory()
         self.hp = 100
         self.max_hp = 100
         self.atk = 10
         self.stability = 10
-        self.weight = 0  # Current weight of items carried
         self.max_weight = 5  # Maximum weight the player can carry
         self.quest_manager = QuestManager(self)
         self.current_world_quests = []
         self.move_count = 0 # Counter for player movements
         self.rewards = []  # List to store earned rewards
-
-        #flags for world 1 progression
-        self.met_ralen = False
-        self.met_malek = False
-        self.met_marchand = False
-        self.met_yara = False
-        self.met_nommera = False
-        self.world1_npcs_bonus = False
-        self.has_crystal = False
-        self.merchant_refused = False
-        self.merchant_sacrifice = False
-        self.patrollers_defeated = False
-        self.vorn_defeated = False
-        self.karn_defeated = False
-        self.read_stability_note = False
-        self.karn_aftermath_done = False
-        self.saved_yara = False
-        self.saved_narek = False
-        self.yara_dead = False
-        self.narek_dead = False
-
-        #flags for world 2 progression
-        self.velyra_met_leader = False
-        self.velyra_resources_secured = False
-        self.velyra_negotiated = False
-        self.velyra_brutal = False
-        self.velyra_narek_resolved = False
-        self.velyra_method = None
-        self.velyra_method_applied = False
-
-        #flags for world 3 progression
-        self.ap_choice_infiltrate = False
-        self.ap_choice_reveal = False
-        self.attack_holo_done = False
-        self.ap_citizen_spoken = False
-        self.ap_glitch_spoken = False
-        self.ap_break_illusions = False
-        self.ap_keep_illusions = False
-        self.ap_taal_confronted = False
-        self.ap_taal_alliance = False
-        self.ap_taal_dead = False
-
-        #flags for world 4 progression
-        self.world4_started = False
-        self.novaterra_explored_station = False
-        self.novaterra_final_done = False
-        self.novaterra_choice_harmony = False
-        self.novaterra_choice_domination = False
-        self.novaterra_choice_renounce = False
-        self.novaterra_terra_defeated = False
-        self.novaterra_companion_spoken = False
-        self.novaterra_observed_planet = False
+        self.flags = 0  # bitfield of FLAGS
+        self._velyra_method = None
+
+    @property
+    def weight(self):
+        """Current weight of items carried (kept by the inventory)."""
+        return self.inventory.weight
+
+    @property
+    def current_room(self):
+        """Room the player is in; entering one publishes a RoomEntered event."""
+        return self._current_room
+
+    @current_room.setter
+    def current_room(self, room):
+        self._current_room = room
+        if room is not None:
+            self.visited_rooms.setdefault(room.name, room)
+            if self.events is not None:
+                self.events.publish(RoomEntered(room))
+
+    @property
+    def velyra_method(self):
+        """Method chosen to secure Velyra's resources (None until chosen)."""
+        return self._velyra_method
+
+    @velyra_method.setter
+    def velyra_method(self, method):
+        if method != self._velyra_method:
+            self._velyra_method = method
+            self.flag_changed("velyra_method", method)
+
+    def flag_changed(self, name, value):
+        """Publish a flag change on the session's event bus."""
+        if self.events is not None:
+            self.events.publish(FlagChanged(name, value))
 
     # Define the move method.
     def move(self, direction):
@@ -141,19 +205,16 @@ class Player():  # pylint: disable=too-many-instance-attributes
 
         # If the next room is None, print an error message and return False.
         if next_room is None:
-            print(L.PLAYER_NO_DOOR)
+            self.output.emit(L.PLAYER_NO_DOOR)
             return False
 
         # Special check for "Prison centrale" access
         if next_room.name == "Prison centrale":
-            if not any(
-                item.name == L.ITEM_DEFINITIONS["keycard"]["name"]
-                for item in self.inventory
-            ):
-                print(L.PLAYER_PRISON_SCANNER)
+            if L.ITEM_DEFINITIONS["keycard"]["name"] not in self.inventory:
+                self.output.emit(L.PLAYER_PRISON_SCANNER)
 
 
-        self.history.append(self.current_room)
+        self._push_history(self.current_room)
 
 
         # Set the current room to the next room.
@@ -161,9 +222,32 @@ class Player():  # pylint: disable=too-many-instance-attributes
 
 
 
-        print(self.current_room.get_long_description(self.stability))
+        self.output.emit(self.current_room.get_long_description(self.stability))
         return True
 
+    def _push_history(self, room):
+        """Push a room on the bounded back-stack (the oldest one drops off)."""
+        self.history.append(room)
+
+    def go_back(self):
+        """Return to the previous room of the back-stack (None if it is empty)."""
+        if not self.history:
+            return None
+        previous_room = self.history.pop()
+        self.current_room = previous_room
+        return previous_room
+
+    def reset_history(self):
+        """Forget the back-stack and the visited rooms (new world)."""
+        self.history.clear()
+        self.visited_rooms.clear()
+        if self.current_room is not None:
+            self.visited_rooms[self.current_room.name] = self.current_room
+
+    def has_visited(self, room_name):
+        """Return True if the player has entered the named room in this world."""
+        return room_name in self.visited_rooms
+
     def get_inventory(self):
         """Get a string representation of the player's inventory.
         Returns:
@@ -174,9 +258,8 @@ class Player():  # pylint: disable=too-many-instance-attributes
             0.1)
             >>> item2 = Item("Livre", "Un vieux livre poussiéreux.", weight=
             0.5)
-            >>> player.inventory.append(item1)
-            >>> player.inventory.append(item2)
-            >>> player.weight = item1.weight + item2.weight
+            >>> player.inventory.add(item1)
+            >>> player.inventory.add(item2)
             >>> print(player.get_inventory()) # doctest: +NORMALIZE_WHITESPACE
             <BLANKLINE>
             Vous disposez des items suivants :
@@ -223,9 +306,8 @@ class Player():  # pylint: disable=too-many-instance-attributes
                 item.name.lower() == item_name.lower()
                 and (self.weight + item.weight) <= self.max_weight
             ):
-                self.inventory.append(item)
+                self.inventory.add(item)
                 room.inventory.remove(item)
-                self.weight += item.weight
                 self.apply_passive_item_effect(item, 1)
                 return L.PLAYER_TAKE_SUCCESS.format(item=item)
             if (
@@ -246,7 +328,7 @@ class Player():  # pylint: disable=too-many-instance-attributes
             >>> player = Player("Alice")
             >>> room = Room("Salle", "une salle vide")
             >>> item = Item("Clé", "Une petite clé en métal.")
-            >>> player.inventory.append(item)
+            >>> player.inventory.add(item)
             >>> player.current_room = room
             >>> print(player.drop("Clé")) # doctest: +NORMALIZE_WHITESPACE
             <BLANKLINE>
@@ -257,33 +339,29 @@ class Player():  # pylint: disable=too-many-instance-attributes
             Vous ne possédez pas cet item.
             <BLANKLINE>
         """
-        for item in self.inventory:
-            if item.name.lower() == item_name.lower():
-                self.inventory.remove(item)
-                self.current_room.inventory.append(item)
-                self.weight -= item.weight
-                self.apply_passive_item_effect(item, -1)
-                return L.PLAYER_DROP_SUCCESS.format(item=item)
+        item = self.inventory.discard(item_name)
+        if item is None:
+            return L.PLAYER_DROP_NOT_OWNED
 
-        return L.PLAYER_DROP_NOT_OWNED
+        self.current_room.inventory.append(item)
+        self.apply_passive_item_effect(item, -1)
+        return L.PLAYER_DROP_SUCCESS.format(item=item)
 
     def use_item(self, item_name):
         """Use an item from the player's inventory by name."""
         if not item_name:
             return L.PLAYER_USE_WHAT
 
-        for item in self.inventory:
-            if item.name.lower() == item_name.lower():
-                if not item.usable:
-                    return L.PLAYER_USE_NOT_USABLE.format(item=item.name)
-
-                message, consume = self.apply_item_effect(item)
-                if consume:
-                    self.inventory.remove(item)
-                    self.weight -= item.weight
-                return message
+        item = self.inventory.find(item_name)
+        if item is None:
+            return L.PLAYER_USE_NOT_OWNED.format(item=item_name)
+        if not item.usable:
+            return L.PLAYER_USE_NOT_USABLE.format(item=item.name)
 
-        return L.PLAYER_USE_NOT_OWNED.format(item=item_name)
+        message, consume = self.apply_item_effect(item)
+        if consume:
+            self.inventory.remove(item)
+        return message
 
     def apply_item_effect(self, item):
         """Apply an item's effect to the player."""
@@ -353,20 +431,17 @@ class Player():  # pylint: disable=too-many-instance-attributes
             return L.STABILITY_LOSS_MEDIUM
         return L.STABILITY_LOSS_LIGHT
 
+    def get_stability_bucket(self):
+        """Return the index of the current stability bucket (0 is stable)."""
+        value = self.stability
+        for bucket, threshold in enumerate(STABILITY_THRESHOLDS):
+            if value >= threshold:
+                return bucket
+        return len(STABILITY_THRESHOLDS)
+
     def get_stability_state(self):
         """Return a narrative label for the current stability value."""
-        value = self.stability
-        if value >= 9:
-            return L.STABILITY_STATE_STABLE
-        if value >= 7:
-            return L.STABILITY_STATE_FRAGILE
-        if value >= 5:
-            return L.STABILITY_STATE_UNSTABLE
-        if value >= 3:
-            return L.STABILITY_STATE_VACILLANT
-        if value >= 1:
-            return L.STABILITY_STATE_EDGE
-        return L.STABILITY_STATE_COLLAPSE
+        return STABILITY_STATES[self.get_stability_bucket()]
 
     def get_completed_quests_count(self):
         """Return (completed, total) for the current world's quests."""
@@ -391,7 +466,7 @@ class Player():  # pylint: disable=too-many-instance-attributes
 
     def has_item(self, item_name):
         """Return True when the player owns an item by name."""
-        return any(item.name.lower() == item_name.lower() for item in self.inventory)
+        return item_name in self.inventory
 
     def has_flag(self, flag_name):
         """Return True when a boolean flag is set on the player."""
@@ -474,12 +549,12 @@ class Player():  # pylint: disable=too-many-instance-attributes
         <BLANKLINE>
         """
         if not self.rewards:
-            print(L.PLAYER_REWARDS_EMPTY)
+            self.output.emit(L.PLAYER_REWARDS_EMPTY)
         else:
-            print(L.PLAYER_REWARDS_HEADER)
+            self.output.emit(L.PLAYER_REWARDS_HEADER)
             for reward in self.rewards:
-                print(L.PLAYER_REWARDS_ITEM.format(reward=reward))
-            print()
+                self.output.emit(L.PLAYER_REWARDS_ITEM.format(reward=reward))
+            self.output.emit()
 
     def get_history(self):
         """Return a formatted list of unique rooms visited by the player."""
@@ -487,14 +562,15 @@ class Player():  # pylint: disable=too-many-instance-attributes
             return L.PLAYER_HISTORY_EMPTY
 
 
-        seen = []
         res = L.PLAYER_HISTORY_HEADER
 
 
-        for room in self.history:
-            if room not in seen:
-                seen.append(room)
-                res += f"    - {room.name}\n"
+        # Each room once, at its first position on the (bounded) back-stack.
+        for room in dict.fromkeys(self.history):
+            res += f"    - {room.name}\n"
 
 
         return res
+
+
+FLAGS.install(Player)
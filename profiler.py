@@ -0,0 +1,233 @@
+"""Opt-in per-command instrumentation for Game.
+
+When a CommandProfiler is attached (``game.enable_profiling()``), each
+command is measured phase by phase: ``parse``, ``action``, ``auto_combat``,
+``quests`` and ``end_checks`` (win/lose), plus its ``total``. Every sample
+records wall time, CPU time and, if tracemalloc is tracing, the net
+allocation delta; samples go into per-command-word histograms that can be
+printed (``report``) or written as JSON (``dump``) at any time.
+
+Phases that are routines (they may prompt the player) are timed step by
+step, so the time spent waiting for an answer is not counted. Without a
+profiler the game calls each phase directly, with no measurement at all.
+"""
+
+import inspect
+import json
+import time
+import tracemalloc
+
+PHASES = ("parse", "action", "auto_combat", "quests", "end_checks", "total")
+UNKNOWN_WORD = "<unknown>"
+
+
+class Histogram:
+    """Durations in power-of-two microsecond buckets, with count/total/max."""
+
+    __slots__ = ("count", "total", "max", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.buckets = []
+
+    def add(self, seconds):
+        """Record one duration."""
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+        bucket = int(seconds * 1e6).bit_length()
+        if bucket >= len(self.buckets):
+            self.buckets.extend([0] * (bucket + 1 - len(self.buckets)))
+        self.buckets[bucket] += 1
+
+    def percentile(self, fraction):
+        """Upper bound (seconds) of the bucket holding the given fraction."""
+        target = fraction * self.count
+        seen = 0
+        for bucket, count in enumerate(self.buckets):
+            seen += count
+            if count and seen >= target:
+                return min((1 << bucket) / 1e6, self.max)
+        return self.max
+
+    def to_dict(self):
+        """JSON-friendly view (bucket i holds durations below 2**i us)."""
+        return {
+            "count": self.count,
+            "total_s": self.total,
+            "max_s": self.max,
+            "buckets_us_log2": list(self.buckets),
+        }
+
+
+class PhaseStats:
+    """Wall-time histogram plus CPU time and allocation totals of one phase."""
+
+    __slots__ = ("wall", "cpu", "alloc", "alloc_max")
+
+    def __init__(self):
+        self.wall = Histogram()
+        self.cpu = 0.0
+        self.alloc = 0
+        self.alloc_max = 0
+
+    def add(self, wall, cpu, alloc):
+        """Record one sample."""
+        self.wall.add(wall)
+        self.cpu += cpu
+        self.alloc += alloc
+        self.alloc_max = max(self.alloc_max, alloc)
+
+    def to_dict(self):
+        """JSON-friendly view."""
+        return {
+            "wall": self.wall.to_dict(),
+            "cpu_s": self.cpu,
+            "alloc_bytes": self.alloc,
+            "alloc_max_bytes": self.alloc_max,
+        }
+
+
+class _Probe:
+    """Running wall/CPU/allocation totals of one measured phase."""
+
+    __slots__ = ("wall", "cpu", "alloc", "_wall0", "_cpu0", "_alloc0")
+
+    def __init__(self):
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc = 0
+        self.resume()
+
+    def resume(self):
+        """Start (or restart) measuring."""
+        self._alloc0 = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else 0
+        self._cpu0 = time.process_time()
+        self._wall0 = time.perf_counter()
+
+    def pause(self):
+        """Stop measuring and add the elapsed step to the totals."""
+        self.wall += time.perf_counter() - self._wall0
+        self.cpu += time.process_time() - self._cpu0
+        if tracemalloc.is_tracing():
+            self.alloc += tracemalloc.get_traced_memory()[0] - self._alloc0
+
+
+class CommandSample:  # pylint: disable=too-few-public-methods
+    """Word and running totals of the command a game is playing."""
+
+    __slots__ = ("word", "wall", "cpu", "alloc")
+
+    def __init__(self, word):
+        self.word = word
+        self.wall = 0.0
+        self.cpu = 0.0
+        self.alloc = 0
+
+
+class CommandProfiler:
+    """Per-command-word, per-phase statistics; shareable by many games.
+
+    Each game keeps the CommandSample of its own command in flight, so
+    sessions interleaved on one event loop are attributed correctly.
+    """
+
+    def __init__(self, allocations=True):
+        self.allocations = allocations
+        self.stats = {}
+        self._started_tracing = False
+
+    def start(self):
+        """Start tracemalloc if allocation deltas are wanted."""
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._started_tracing = True
+
+    def stop(self):
+        """Stop tracemalloc if this profiler started it."""
+        if self._started_tracing:
+            tracemalloc.stop()
+            self._started_tracing = False
+
+    def begin(self, word, known=None):
+        """Sample for a new command; words outside ``known`` share one entry."""
+        if known is not None and word not in known:
+            word = UNKNOWN_WORD
+        return CommandSample(word)
+
+    def finish(self, sample):
+        """Record the ``total`` of a finished command."""
+        self._record(sample.word, "total", sample.wall, sample.cpu, sample.alloc)
+
+    def measure(self, sample, phase, function, *args):
+        """Routine calling ``function(*args)`` and charging it to ``phase``.
+
+        If the call returns a routine, it is driven here step by step and
+        only the steps themselves are timed.
+        """
+        probe = _Probe()
+        try:
+            result = function(*args)
+            if not inspect.isgenerator(result):
+                return result
+            answer = None
+            while True:
+                try:
+                    prompt = result.send(answer)
+                except StopIteration as stop:
+                    return stop.value
+                probe.pause()
+                try:
+                    answer = yield prompt
+                except GeneratorExit:
+                    result.close()
+                    raise
+                probe.resume()
+        finally:
+            probe.pause()
+            sample.wall += probe.wall
+            sample.cpu += probe.cpu
+            sample.alloc += probe.alloc
+            self._record(sample.word, phase, probe.wall, probe.cpu, probe.alloc)
+
+    def _record(self, word, phase, wall, cpu, alloc):
+        phases = self.stats.setdefault(word, {})
+        stats = phases.get(phase)
+        if stats is None:
+            stats = phases[phase] = PhaseStats()
+        stats.add(wall, cpu, alloc)
+
+    def report(self):
+        """Text table: one line per command word and phase."""
+        lines = [
+            f"{'command':<12} {'phase':<12} {'n':>7} {'mean us':>9} {'p50 us':>9} "
+            f"{'p99 us':>9} {'max us':>9} {'cpu us':>9} {'alloc B':>9}"
+        ]
+        for word in sorted(self.stats):
+            phases = self.stats[word]
+            for phase in PHASES:
+                stats = phases.get(phase)
+                if stats is None:
+                    continue
+                wall = stats.wall
+                lines.append(
+                    f"{word:<12} {phase:<12} {wall.count:>7} "
+                    f"{wall.total / wall.count * 1e6:>9.1f} "
+                    f"{wall.percentile(0.5) * 1e6:>9.1f} "
+                    f"{wall.percentile(0.99) * 1e6:>9.1f} "
+                    f"{wall.max * 1e6:>9.1f} "
+                    f"{stats.cpu / wall.count * 1e6:>9.1f} "
+                    f"{stats.alloc // wall.count:>9}"
+                )
+        return "\n".join(lines)
+
+    def dump(self, path):
+        """Write every histogram as JSON to ``path``."""
+        data = {
+            word: {phase: stats.to_dict() for phase, stats in phases.items()}
+            for word, phases in self.stats.items()
+        }
+        with open(path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, indent=2)
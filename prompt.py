@@ -0,0 +1,56 @@
+"""Resumable choice prompts.
+
+Game code that needs an answer from the player is written as a routine
+(a generator): it ``yield``s a Prompt and receives the answer line through
+``send()``. A session keeps the suspended routine and resumes it with the
+next incoming line, so no thread ever blocks waiting for a player.
+"""
+
+import inspect
+
+
+class Prompt:  # pylint: disable=too-few-public-methods
+    """A pending question; ``text`` is shown before the answer is read.
+
+    ``choices`` lists the accepted answers of a closed question, or is None
+    for free text.
+    """
+
+    __slots__ = ("text", "choices")
+
+    def __init__(self, text="> ", choices=None):
+        self.text = text
+        self.choices = choices
+
+    def __repr__(self):
+        return f"Prompt({self.text!r}, choices={self.choices!r})"
+
+
+def ask(choices, text="> ", lower=False):
+    """Routine: prompt until the stripped answer is one of ``choices``."""
+    choice = None
+    while choice not in choices:
+        answer = yield Prompt(text, choices)
+        choice = answer.strip()
+        if lower:
+            choice = choice.lower()
+    return choice
+
+
+def delegate(result):
+    """Let ``yield from`` accept routines and plain return values alike."""
+    if inspect.isgenerator(result):
+        return (yield from result)
+    return result
+
+
+def run(routine, input_func=input):
+    """Drive a routine to completion, answering each prompt with input_func."""
+    if not inspect.isgenerator(routine):
+        return routine
+    try:
+        prompt = next(routine)
+        while True:
+            prompt = routine.send(input_func(prompt.text))
+    except StopIteration as stop:
+        return stop.value
@@ -4,12 +4,70 @@
 # pylint: disable=missing-function-docstring
 
 import labels as L
+from output import DEFAULT_OUTPUT
+from events import QuestStateChanged
 
 STATE_LOCKED = "LOCKED"
 STATE_AVAILABLE = "AVAILABLE"
 STATE_ACTIVE = "ACTIVE"
 STATE_COMPLETED = "COMPLETED"
 
+# Objective wordings recognised as "be in this room" objectives.
+ROOM_OBJECTIVE_PREFIXES = ("Visiter ", "Explorer ", "Aller à ", "Entrer dans ")
+
+
+class Objective:  # pylint: disable=too-few-public-methods
+    """An objective text compiled once into the keys it can be matched by.
+
+    ``action_key`` is the lowercased text (action objectives such as
+    "Parler avec Ralen"), ``room`` the room name of a room objective, and
+    ``counter``/``required`` the name and threshold of a counter objective
+    ("Se déplacer 10 fois" -> "Se déplacer", 10).
+    """
+
+    __slots__ = ("text", "action_key", "room", "counter", "required")
+
+    def __init__(self, text):
+        self.text = text
+        self.action_key = text.lower()
+        self.room = None
+        for prefix in ROOM_OBJECTIVE_PREFIXES:
+            if text.startswith(prefix):
+                self.room = text[len(prefix):]
+                break
+        self.counter = None
+        self.required = None
+        words = text.split()
+        for position, word in enumerate(words):
+            if word.isdigit():
+                self.counter = " ".join(words[:position])
+                self.required = int(word)
+                break
+
+    def keys(self):
+        """Return the (kind, key) pairs a QuestManager indexes this objective by."""
+        keys = [("action", self.action_key)]
+        if self.room is not None:
+            keys.append(("room", self.room))
+        if self.counter is not None:
+            keys.append(("counter", self.counter))
+        return keys
+
+
+def action_variations(action, target=None):
+    """Lowercased objective texts an (action, target) pair can complete."""
+    if not target:
+        return (action.lower(),)
+    return tuple(
+        variation.lower()
+        for variation in (
+            f"{action} {target}",
+            f"{action} avec {target}",
+            f"{action} le {target}",
+            f"{action} la {target}",
+        )
+    )
+
 
 class Quest:  # pylint: disable=too-many-instance-attributes
     """
@@ -43,17 +101,37 @@ class Quest:  # pylint: disable=too-many-instance-attributes
         self.is_completed = self.state == STATE_COMPLETED
         self.reward = reward
         self.quest_id = quest_id
+        self.output = DEFAULT_OUTPUT
+        self.events = None
+
+    @property
+    def objectives(self):
+        """Objective texts; assigning them recompiles the matching tables."""
+        return self._objectives
+
+    @objectives.setter
+    def objectives(self, objectives):
+        self._objectives = objectives
+        self.compiled_objectives = [Objective(text) for text in objectives]
+        self._by_action = {}
+        self._by_room = {}
+        for objective in self.compiled_objectives:
+            self._by_action.setdefault(objective.action_key, objective.text)
+            if objective.room is not None:
+                self._by_room.setdefault(objective.room, objective.text)
 
     def set_state(self, state):
-        """Set quest state and keep flags in sync."""
+        """Set quest state, keep flags in sync and publish the change."""
         self.state = state
         self.is_active = state == STATE_ACTIVE
         self.is_completed = state == STATE_COMPLETED
+        if self.events is not None:
+            self.events.publish(QuestStateChanged(self))
 
     def activate(self):
         self.set_state(STATE_ACTIVE)
-        print(L.QUEST_ACTIVATED_TITLE.format(title=self.title))
-        print(L.QUEST_ACTIVATED_DESC.format(description=self.description))
+        self.output.emit(L.QUEST_ACTIVATED_TITLE.format(title=self.title))
+        self.output.emit(L.QUEST_ACTIVATED_DESC.format(description=self.description))
 
     def complete_objective(self, objective, player=None):
         if self.state != STATE_ACTIVE:
@@ -61,7 +139,7 @@ class Quest:  # pylint: disable=too-many-instance-attributes
 
         if objective in self.objectives and objective not in self.completed_objectives:
             self.completed_objectives.append(objective)
-            print(L.QUEST_OBJECTIVE_DONE.format(objective=objective))
+            self.output.emit(L.QUEST_OBJECTIVE_DONE.format(objective=objective))
 
             if len(self.completed_objectives) == len(self.objectives):
                 self.complete_quest(player)
@@ -72,12 +150,12 @@ class Quest:  # pylint: disable=too-many-instance-attributes
     def complete_quest(self, player=None):
         if not self.is_completed:
             self.set_state(STATE_COMPLETED)
-            print(L.QUEST_COMPLETED_TITLE.format(title=self.title))
+            self.output.emit(L.QUEST_COMPLETED_TITLE.format(title=self.title))
             if self.reward:
-                print(L.QUEST_REWARD_LINE.format(reward=self.reward))
+                self.output.emit(L.QUEST_REWARD_LINE.format(reward=self.reward))
                 if player:
                     player.add_reward(self.reward)
-            print()
+            self.output.emit()
 
     def get_status(self):
         label = L.QUEST_STATUS_LABEL.get(self.state)
@@ -110,64 +188,38 @@ class Quest:  # pylint: disable=too-many-instance-attributes
         if not current_counts:
             return objective
 
+        compiled = self.compiled_objectives[self.objectives.index(objective)]
+        if compiled.required is None:
+            return objective
         for counter_name, current_count in current_counts.items():
-            if counter_name not in objective:
-                continue
-
-            required = self._extract_number_from_text(objective)
-            if required is not None:
-                return f"{objective} (Progression : {current_count}/{required})"
+            if counter_name in objective:
+                return f"{objective} (Progression : {current_count}/{compiled.required})"
 
         return objective
 
-    def _extract_number_from_text(self, text):
-        for word in text.split():
-            if word.isdigit():
-                return int(word)
-        return None
-
     def check_room_objective(self, room_name, player=None):
-        room_objectives = [
-            f"Visiter {room_name}",
-            f"Explorer {room_name}",
-            f"Aller à {room_name}",
-            f"Entrer dans {room_name}",
-        ]
-
-        for objective in room_objectives:
-            if self.complete_objective(objective, player):
-                return True
-        return False
+        objective = self._by_room.get(room_name)
+        if objective is None:
+            return False
+        return self.complete_objective(objective, player)
 
     def check_action_objective(self, action, target=None, player=None):
-        if target:
-            objective_variations = [
-                f"{action} {target}",
-                f"{action} avec {target}",
-                f"{action} le {target}",
-                f"{action} la {target}",
-            ]
-        else:
-            objective_variations = [action]
-
-        for objective in objective_variations:
-            for real_objective in self.objectives:
-                if objective.lower() == real_objective.lower():
-                    self.complete_objective(real_objective, player)
-                    return True
-
+        for variation in action_variations(action, target):
+            objective = self._by_action.get(variation)
+            if objective is not None:
+                self.complete_objective(objective, player)
+                return True
         return False
 
     def check_counter_objective(self, counter_name, current_count, player=None):
-        for objective in self.objectives:
-            if counter_name in objective and objective not in self.completed_objectives:
-                words = objective.split()
-                for word in words:
-                    if word.isdigit():
-                        required_count = int(word)
-                        if current_count >= required_count:
-                            self.complete_objective(objective, player)
-                            return True
+        for objective in self.compiled_objectives:
+            if (
+                objective.counter == counter_name
+                and current_count >= objective.required
+                and objective.text not in self.completed_objectives
+            ):
+                self.complete_objective(objective.text, player)
+                return True
         return False
 
     def __str__(self):
@@ -175,18 +227,37 @@ class Quest:  # pylint: disable=too-many-instance-attributes
 
 
 class QuestManager:
-    """Store quests and evaluate objective completion."""
+    """Store quests and evaluate objective completion.
+
+    Pending objectives are indexed by (kind, key) when their quest is
+    added, so a room entry, an action or a counter update only looks at
+    the objectives it can complete. Completed entries are pruned lazily.
+    """
     def __init__(self, player=None):
         self.quests = []
         self.active_quests = []
         self.player = player
         self._next_id = 1
+        self._by_id = {}
+        self._objective_index = {}
+
+    @property
+    def output(self):
+        """Output sink of the owning player (console when detached)."""
+        return self.player.output if self.player is not None else DEFAULT_OUTPUT
+
+    @property
+    def events(self):
+        """Event bus of the owning player (None when detached)."""
+        return self.player.events if self.player is not None else None
 
     def reset(self):
         """Clear quest lists and reset the next id counter."""
         self.quests = []
         self.active_quests = []
         self._next_id = 1
+        self._by_id = {}
+        self._objective_index = {}
 
     def add_quest(self, quest):
         if quest.quest_id is None:
@@ -194,7 +265,15 @@ class QuestManager:
             self._next_id += 1
         elif quest.quest_id >= self._next_id:
             self._next_id = quest.quest_id + 1
+        quest.output = self.output
+        quest.events = self.events
         self.quests.append(quest)
+        self._by_id.setdefault(quest.quest_id, quest)
+        for objective in quest.compiled_objectives:
+            if objective.text in quest.completed_objectives:
+                continue
+            for key in objective.keys():
+                self._objective_index.setdefault(key, []).append((quest, objective))
 
     def activate_quest(self, quest_identifier):
         if isinstance(quest_identifier, str) and quest_identifier.isdigit():
@@ -203,22 +282,16 @@ class QuestManager:
         if not isinstance(quest_identifier, int):
             return False
 
-        for quest in self.quests:
-            if quest.quest_id != quest_identifier:
-                continue
-            if quest.state != STATE_AVAILABLE:
-                return False
-            quest.activate()
-            if quest not in self.active_quests:
-                self.active_quests.append(quest)
-            return True
-        return False
+        quest = self._by_id.get(quest_identifier)
+        if quest is None or quest.state != STATE_AVAILABLE:
+            return False
+        quest.activate()
+        if quest not in self.active_quests:
+            self.active_quests.append(quest)
+        return True
 
     def get_quest_by_id(self, quest_id):
-        for quest in self.quests:
-            if quest.quest_id == quest_id:
-                return quest
-        return None
+        return self._by_id.get(quest_id)
 
     def complete_objective(self, objective_text):
         for quest in self.active_quests:
@@ -228,23 +301,45 @@ class QuestManager:
                 return True
         return False
 
+    def _pending(self, key):
+        """Yield (quest, objective) pairs indexed under key, pruning done ones."""
+        entries = self._objective_index.get(key)
+        if not entries:
+            return
+        for entry in entries[:]:
+            quest, objective = entry
+            if quest.is_completed or objective.text in quest.completed_objectives:
+                entries.remove(entry)
+                continue
+            if quest in self.active_quests:
+                yield quest, objective
+
+    def _complete_indexed(self, quest, objective):
+        quest.complete_objective(objective.text, self.player)
+        if quest.is_completed and quest in self.active_quests:
+            self.active_quests.remove(quest)
+
     def check_room_objectives(self, room_name):
-        for quest in self.active_quests[:]:
-            quest.check_room_objective(room_name, self.player)
-            if quest.is_completed:
-                self.active_quests.remove(quest)
+        done = set()
+        for quest, objective in self._pending(("room", room_name)):
+            if id(quest) not in done:
+                done.add(id(quest))
+                self._complete_indexed(quest, objective)
 
     def check_action_objectives(self, action, target=None):
-        for quest in self.active_quests[:]:
-            quest.check_action_objective(action, target, self.player)
-            if quest.is_completed:
-                self.active_quests.remove(quest)
+        done = set()
+        for variation in action_variations(action, target):
+            for quest, objective in self._pending(("action", variation)):
+                if id(quest) not in done:
+                    done.add(id(quest))
+                    self._complete_indexed(quest, objective)
 
     def check_counter_objectives(self, counter_name, current_count):
-        for quest in self.active_quests[:]:
-            quest.check_counter_objective(counter_name, current_count, self.player)
-            if quest.is_completed:
-                self.active_quests.remove(quest)
+        done = set()
+        for quest, objective in self._pending(("counter", counter_name)):
+            if id(quest) not in done and current_count >= objective.required:
+                done.add(id(quest))
+                self._complete_indexed(quest, objective)
 
     def get_active_quests(self):
         return self.active_quests
@@ -253,24 +348,24 @@ class QuestManager:
         return self.quests
 
     def show_quests(self):
-        print(L.QUEST_LIST_HEADER)
+        self.output.emit(L.QUEST_LIST_HEADER)
         for quest in sorted(self.quests, key=lambda q: q.quest_id or 0):
             status = quest.get_status_label()
-            print(
+            self.output.emit(
                 L.QUEST_LIST_ITEM.format(
                     quest_id=quest.quest_id,
                     title=quest.title,
                     status=status,
                 )
             )
-        print()
+        self.output.emit()
 
     def show_quest_details(self, quest_id, current_counts=None):
         quest = self.get_quest_by_id(quest_id)
         if not quest:
-            print(L.QUEST_NOT_FOUND.format(quest_id=quest_id))
+            self.output.emit(L.QUEST_NOT_FOUND.format(quest_id=quest_id))
             return False
-        print(quest.get_details(current_counts))
+        self.output.emit(quest.get_details(current_counts))
         return True
 
     def get_quest_by_title(self, title):
@@ -0,0 +1,220 @@
+"""Disk-backed question banks for ai_quiz, read through mmap.
+
+A bank file holds, in order:
+
+- a fixed header (magic, format, question count, section offsets);
+- the records: UTF-8 ``question \\x1f answer \\x1f aliases \\x1f forms``, the
+  aliases and the normalised answer forms (see answers.py) being joined
+  by ``\\x1e``;
+- a fixed-width index, one (offset, length) entry per record;
+- a JSON table of (theme, difficulty, start, count) slices.
+
+Records are sorted by (theme, difficulty) when the bank is built, so each
+filter is a handful of contiguous index ranges, computed once at open.
+Reading question ``i`` is one index unpack plus one slice of the mapping:
+the file is never loaded, and every process that opens the same bank
+shares its pages through the OS page cache. Answer forms are computed
+when the bank is built, so checking an answer never re-normalises them.
+
+Usage:
+    python question_bank.py build questions.jsonl questions.qbank
+
+Each input line is a JSON object with ``question`` and ``answer`` and
+optionally ``theme``, ``difficulty`` and ``aliases`` (a list of strings).
+"""
+
+import argparse
+import json
+import mmap
+import os
+import struct
+import tempfile
+from pathlib import Path
+
+from answers import answer_forms
+
+MAGIC = b"VQB1"
+BANK_FORMAT = 2
+HEADER = struct.Struct("<4sHHIQQQ")  # magic, format, reserved, count, 3 offsets
+INDEX_ENTRY = struct.Struct("<QI")  # record offset, record length
+FIELD_SEP = "\x1f"
+LIST_SEP = "\x1e"
+
+_OPEN_BANKS = {}
+
+
+class QuestionBank:
+    """Read-only view of a bank file; behaves as a sequence of (question, answer).
+
+    Examples:
+        >>> import os, tempfile
+        >>> path = os.path.join(tempfile.mkdtemp(), "demo.qbank")
+        >>> build_bank(path, [
+        ...     {"question": "Planete rouge ?", "answer": "mars", "theme": "espace"},
+        ...     {"question": "Symbole du fer ?", "answer": "fer", "theme": "chimie",
+        ...      "aliases": ["Fe"]},
+        ... ])
+        2
+        >>> bank = QuestionBank(path)
+        >>> len(bank), bank.ranges("espace")
+        (2, ((1, 1),))
+        >>> bank[0], bank.aliases(0), bank.forms(0)
+        (('Symbole du fer ?', 'fer'), ('Fe',), ('fer', 'fe'))
+        >>> bank.close()
+    """
+
+    def __init__(self, path):
+        self.path = Path(path)
+        with open(self.path, "rb") as handle:
+            self._map = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, _reserved, count, index_offset, _data_offset, slices_offset = (
+            HEADER.unpack_from(self._map, 0)
+        )
+        if magic != MAGIC or version != BANK_FORMAT:
+            self._map.close()
+            raise ValueError(f"{self.path} is not a format {BANK_FORMAT} question bank")
+        self._count = count
+        self._index_offset = index_offset
+        self.slices = tuple(
+            tuple(entry) for entry in json.loads(self._map[slices_offset:].decode("utf-8"))
+        )
+        self._ranges = self._build_ranges()
+
+    def _build_ranges(self):
+        """Map every (theme, difficulty) filter, None meaning any, to its ranges."""
+        ranges = {}
+        for theme, difficulty, start, count in self.slices:
+            for key in dict.fromkeys(((theme, difficulty), (theme, None), (None, difficulty))):
+                ranges.setdefault(key, []).append((start, count))
+        return {key: tuple(_merge(value)) for key, value in ranges.items()}
+
+    def ranges(self, theme=None, difficulty=None):
+        """Index ranges (start, count) of the questions matching the filters."""
+        if theme is None and difficulty is None:
+            return ((0, self._count),)
+        return self._ranges.get((theme, difficulty), ())
+
+    def themes(self):
+        """Themes present in the bank, in file order."""
+        return tuple(dict.fromkeys(theme for theme, _d, _s, _c in self.slices))
+
+    def _fields(self, index):
+        if not 0 <= index < self._count:
+            raise IndexError(index)
+        offset, length = INDEX_ENTRY.unpack_from(
+            self._map, self._index_offset + index * INDEX_ENTRY.size
+        )
+        return self._map[offset:offset + length].decode("utf-8").split(FIELD_SEP)
+
+    def __getitem__(self, index):
+        fields = self._fields(index)
+        return fields[0], fields[1]
+
+    def aliases(self, index):
+        """Alternative accepted answers of question ``index``."""
+        aliases = self._fields(index)[2]
+        return tuple(aliases.split(LIST_SEP)) if aliases else ()
+
+    def forms(self, index):
+        """Precomputed normalised forms of the answer and its aliases."""
+        return tuple(self._fields(index)[3].split(LIST_SEP))
+
+    def __len__(self):
+        return self._count
+
+    def close(self):
+        """Release the mapping."""
+        self._map.close()
+
+
+def _merge(ranges):
+    """Merge adjacent (start, count) ranges."""
+    merged = []
+    for start, count in sorted(ranges):
+        if merged and merged[-1][0] + merged[-1][1] == start:
+            merged[-1] = (merged[-1][0], merged[-1][1] + count)
+        else:
+            merged.append((start, count))
+    return merged
+
+
+def open_bank(path):
+    """Open a bank once per process; sessions share the returned instance."""
+    key = os.path.abspath(path)
+    bank = _OPEN_BANKS.get(key)
+    if bank is None:
+        bank = _OPEN_BANKS[key] = QuestionBank(key)
+    return bank
+
+
+def _record(entry):
+    aliases = tuple(entry.get("aliases", ()))
+    for text in (entry["question"], entry["answer"], *aliases):
+        if FIELD_SEP in text or LIST_SEP in text:
+            raise ValueError(f"Field contains a record separator: {text!r}")
+    fields = (
+        entry["question"],
+        entry["answer"],
+        LIST_SEP.join(aliases),
+        LIST_SEP.join(answer_forms(entry["answer"], aliases)),
+    )
+    return FIELD_SEP.join(fields).encode("utf-8")
+
+
+def build_bank(path, entries):
+    """Write a bank file from question dicts; return the number of questions."""
+    entries = sorted(
+        entries,
+        key=lambda entry: (str(entry.get("theme", "")), str(entry.get("difficulty", ""))),
+    )
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.stem}-", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(b"\0" * HEADER.size)
+            data_offset = handle.tell()
+            index = []
+            slices = []
+            for position, entry in enumerate(entries):
+                record = _record(entry)
+                index.append(INDEX_ENTRY.pack(handle.tell(), len(record)))
+                handle.write(record)
+                key = [entry.get("theme"), entry.get("difficulty")]
+                if slices and slices[-1][:2] == key:
+                    slices[-1][3] += 1
+                else:
+                    slices.append(key + [position, 1])
+            index_offset = handle.tell()
+            handle.write(b"".join(index))
+            slices_offset = handle.tell()
+            handle.write(json.dumps(slices, ensure_ascii=False).encode("utf-8"))
+            handle.seek(0)
+            handle.write(HEADER.pack(
+                MAGIC, BANK_FORMAT, 0, len(entries), index_offset, data_offset, slices_offset
+            ))
+        os.replace(tmp_name, path)
+    except BaseException:
+        if os.path.exists(tmp_name):
+            os.unlink(tmp_name)
+        raise
+    return len(entries)
+
+
+def main(argv=None):
+    """Entry point: build a bank from a JSON Lines file."""
+    parser = argparse.ArgumentParser(description="Vigilant question bank tool")
+    commands = parser.add_subparsers(dest="command", required=True)
+    build = commands.add_parser("build", help="build a bank from JSON Lines")
+    build.add_argument("source")
+    build.add_argument("bank")
+    args = parser.parse_args(argv)
+
+    with open(args.source, encoding="utf-8") as handle:
+        entries = [json.loads(line) for line in handle if line.strip()]
+    count = build_bank(args.bank, entries)
+    print(f"{count} questions -> {args.bank}")
+
+
+if __name__ == "__main__":
+    main()
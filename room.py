@@ -3,6 +3,40 @@
 import labels as L
 
 
+class RoomTemplate:  # pylint: disable=too-few-public-methods
+    """
+    Partie immuable d'une pièce, construite une fois par processus.
+
+    Le nom, les textes, l'image et les sorties (vers d'autres gabarits) sont
+    partagés par toutes les sessions. ``inventory``, ``characters`` et
+    ``enemies`` décrivent le contenu initial : chaque session crée ses Room
+    par-dessus avec ses propres copies (voir ``World``).
+    """
+
+    __slots__ = (
+        "name",
+        "description",
+        "image",
+        "perception_descriptions",
+        "alt_descriptions",
+        "exits",
+        "inventory",
+        "characters",
+        "enemies",
+    )
+
+    def __init__(self, name, description, image=None):
+        self.name = name
+        self.description = description
+        self.image = image
+        self.perception_descriptions = {}
+        self.alt_descriptions = {}
+        self.exits = {}
+        self.inventory = []
+        self.characters = []
+        self.enemies = []
+
+
 class Room:
     """
     Représente une pièce du jeu d’aventure.
@@ -19,6 +53,8 @@ class Room:
         Description textuelle de la pièce.
     exits : dict
         Dictionnaire associant une direction (str) à une autre Room ou à None.
+    template : RoomTemplate
+        Partie immuable (nom, textes, image) partagée entre les sessions.
 
     Méthodes
     --------
@@ -39,18 +75,62 @@ class Room:
     True
     """
 
+    __slots__ = ("template", "exits", "inventory", "characters", "enemies")
 
-    def __init__(self, name, description, image=None):
-        """Create a room with a name, description, and empty containers."""
-        self.name = name
-        self.description = description
-        self.image = image
-        self.perception_descriptions = {}
+    def __init__(self, name, description, image=None, template=None):
+        """Create a room with a name, description, and empty containers.
+
+        When ``template`` is given, the static part (name, texts, image) is
+        shared with it and only the containers belong to this room.
+        """
+        if template is None:
+            template = RoomTemplate(name, description, image)
+        self.template = template
         self.exits = {}
         self.inventory = []
         self.characters = []
         self.enemies = []
 
+    @classmethod
+    def from_template(cls, template, inventory=(), characters=(), enemies=()):
+        """Create a session room on top of a shared RoomTemplate.
+
+        Exits are left empty: they point to other session rooms and are
+        wired by the caller.
+        """
+        room = cls.__new__(cls)
+        room.template = template
+        room.exits = {}
+        room.inventory = list(inventory)
+        room.characters = list(characters)
+        room.enemies = list(enemies)
+        return room
+
+    @property
+    def name(self):
+        """Nom de la pièce (partagé avec le gabarit)."""
+        return self.template.name
+
+    @property
+    def description(self):
+        """Description de base (partagée avec le gabarit)."""
+        return self.template.description
+
+    @property
+    def image(self):
+        """Image associée à la pièce, ou None."""
+        return self.template.image
+
+    @property
+    def perception_descriptions(self):
+        """Descriptions alternées selon la stabilité ("low"/"high")."""
+        return self.template.perception_descriptions
+
+    @property
+    def alt_descriptions(self):
+        """Descriptions alternatives liées aux choix narratifs."""
+        return self.template.alt_descriptions
+
 
 
     def look(self, stability_value=None):
@@ -0,0 +1,74 @@
+"""Turn scheduler for wandering NPCs.
+
+Only characters created with ``can_move=True`` are registered. Each one
+sits in a heap keyed by the turn of its next move attempt, so a turn costs
+nothing for the (many) static NPCs and rooms. Exit lists are computed
+once per room and reused for every later move out of it.
+"""
+
+import random
+from heapq import heapify, heappop, heappush
+from itertools import count
+
+# Turns between two move attempts of a wandering NPC.
+MOVE_INTERVAL = 1
+
+
+class NpcScheduler:
+    """Wake the mobile NPCs due on the current turn and let them move."""
+
+    def __init__(self, rng=random):
+        self.rng = rng
+        self.turn = 0
+        self._queue = []
+        self._order = count()
+        self._exits = {}
+
+    def reset(self, rooms):
+        """Register the mobile NPCs of a (new) world, forgetting the old ones."""
+        self.turn = 0
+        self._exits.clear()
+        self._queue = [
+            (MOVE_INTERVAL, next(self._order), character)
+            for room in rooms
+            for character in room.characters
+            if character.can_move
+        ]
+        heapify(self._queue)
+
+    def register(self, character, delay=MOVE_INTERVAL):
+        """Schedule a move attempt ``delay`` turns from now."""
+        heappush(self._queue, (self.turn + delay, next(self._order), character))
+
+    def exits_from(self, room):
+        """Rooms reachable from ``room`` (computed once per room)."""
+        exits = self._exits.get(room)
+        if exits is None:
+            exits = tuple(target for target in room.exits.values() if target)
+            self._exits[room] = exits
+        return exits
+
+    def get_state(self, ids):
+        """Turn and pending moves as (due turn, ``ids[character]``), in order."""
+        return (self.turn, tuple((due, ids[character]) for due, _n, character in sorted(
+            self._queue, key=lambda entry: entry[:2]
+        )))
+
+    def set_state(self, state, characters):
+        """Restore ``get_state`` output; ids index into ``characters``."""
+        self.turn, queue = state
+        self._exits.clear()
+        self._queue = [
+            (due, next(self._order), characters[character_id]) for due, character_id in queue
+        ]
+
+    def tick(self):
+        """Advance one turn: each NPC due now attempts one move."""
+        self.turn += 1
+        queue = self._queue
+        due = []
+        while queue and queue[0][0] <= self.turn:
+            due.append(heappop(queue)[2])
+        for character in due:
+            character.move(self.exits_from(character.current_room), self.rng)
+            self.register(character)
@@ -0,0 +1,352 @@
+"""Asyncio session host: many independent Game instances behind a line protocol.
+
+Each TCP or Unix-socket connection gets its own Game. The client sends one
+UTF-8 line per command (or per answer when the game is waiting on a choice)
+and receives the text produced by that line.
+
+Usage:
+    python server.py --port 4000
+    python server.py --unix /tmp/vigilant.sock
+    python server.py --questions questions.qbank
+    python server.py --profile              # kill -USR1 <pid> prints the report
+    python server.py --journal sessions/    # journal sessions (see journal.py)
+    python server.py --idle-after 60        # spill idle sessions (see spill.py)
+
+With ``--journal`` each session is journaled under its own directory and
+its id is sent to the client first; after a crash or a disconnect the
+client can send ``/resume <id>`` as its first line to recover it. The
+journals' fsyncs, checkpoint files and recoveries run on one writer
+thread, never on the event loop.
+"""
+
+import argparse
+import asyncio
+import gc
+import os
+import secrets
+import shutil
+import signal
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from game import Game
+from journal import DEFAULT_CHECKPOINT_EVERY, Journal, JournalError, recover
+from output import BufferedSink
+from profiler import CommandProfiler
+from question_bank import open_bank
+from snapshot import SnapshotError
+from spill import SpillStore
+
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 4000
+DEFAULT_BACKLOG = 4096
+COMMAND_PROMPT = "> "
+RESUME_PREFIX = "/resume "
+SESSION_TEXT = "[session {session_id}]"
+RESUME_FAILED_TEXT = "[session introuvable]"
+JOURNAL_SYNC_INTERVAL = 0.5  # seconds between group fsyncs of the journals
+SPILL_CHECK_INTERVAL = 1.0  # seconds between two scans for idle sessions (at most)
+
+
+class Session:  # pylint: disable=too-many-instance-attributes
+    """One connected player: its Game and output buffer.
+
+    Choice prompts are resumable (see prompt.py): a session waiting on an
+    answer only keeps its suspended routine, so every session is served
+    from the event loop without a thread of its own. With a SpillStore,
+    an idle session's game is dropped from memory (``game`` is None) and
+    rebuilt when its next line arrives.
+    """
+
+    def __init__(
+        self, writer, questions=None, profiler=None, journal_root=None,
+        checkpoint_every=DEFAULT_CHECKPOINT_EVERY, spill=None, journal_writer=None,
+    ):  # pylint: disable=too-many-arguments,too-many-positional-arguments
+        self.writer = writer
+        self.questions = questions
+        self.profiler = profiler
+        self.journal_root = journal_root
+        self.checkpoint_every = checkpoint_every
+        self.spill = spill
+        self.journal_writer = journal_writer
+        self.key = f"{id(self):x}"
+        self.last_active = time.monotonic()
+        self.finished = False
+        self.output = BufferedSink()
+        self.session_id = None
+        self.journal = None
+        if journal_root is not None:
+            self.session_id = secrets.token_hex(8)
+            self.journal = Journal(
+                os.path.join(journal_root, self.session_id),
+                checkpoint_every=checkpoint_every,
+                writer=journal_writer,
+            )
+        self._attach(Game(questions=questions))
+
+    def _attach(self, game):
+        self.game = game
+        if self.journal is not None:
+            game.enable_journal(self.journal)
+        if self.profiler is not None:
+            game.enable_profiling(self.profiler)
+        game.set_output(self.output)
+
+    def _resident_game(self):
+        """The session's game, rehydrated first if it was spilled."""
+        if self.game is None:
+            self._attach(self.spill.rehydrate(self.key, self.questions))
+        elif self.spill is not None:
+            self.spill.hit()
+        self.last_active = time.monotonic()
+        return self.game
+
+    def spill_if_idle(self, now):
+        """Spill the game to the store if the session has been idle long enough.
+
+        Returns True if the game was dropped from memory.
+        """
+        if self.game is None or self.finished or not self.spill.is_idle(self.last_active, now):
+            return False
+        if self.spill.spill(self.key, self.game):
+            self.game = None
+            return True
+        self.last_active = now  # waiting on a prompt: check again later
+        return False
+
+    def start(self):
+        """Run setup up to the first prompt (the player's name)."""
+        if self.session_id is not None:
+            self.output.emit(SESSION_TEXT.format(session_id=self.session_id))
+        self._reply(self.game.start())
+
+    def feed(self, line):
+        """Play one incoming line and send back what it produced."""
+        self._reply(self._resident_game().submit(line))
+
+    def _recover(self, directory):
+        """(game, journal) of the session journaled in ``directory``, or None."""
+        if not os.path.isdir(directory):
+            return None
+        try:
+            return recover(
+                directory,
+                self.questions,
+                checkpoint_every=self.checkpoint_every,
+                writer=self.journal_writer,
+            )
+        except (JournalError, SnapshotError, OSError):
+            return None
+
+    async def resume(self, session_id, live_ids):
+        """Replace this fresh session by the journaled session ``session_id``.
+
+        The recovery runs on the journal writer thread, after the pending
+        writes of the session's previous connection.
+        """
+        recovered = None
+        if session_id.isalnum() and session_id not in live_ids:
+            recovered = await asyncio.get_running_loop().run_in_executor(
+                self.journal_writer, self._recover, os.path.join(self.journal_root, session_id)
+            )
+        if recovered is None:
+            self.output.emit(RESUME_FAILED_TEXT)
+            self._reply(self._resident_game().pending_prompt)
+            return
+        self.close(discard=True)
+        self.session_id = session_id
+        game, self.journal = recovered
+        self._attach(game)
+        self.output.emit(SESSION_TEXT.format(session_id=session_id))
+        self._reply(game.pending_prompt)
+
+    def close(self, discard=False):
+        """Close the journal and forget the spilled game, if any.
+
+        The journal is deleted if the game ended, or if ``discard``.
+        """
+        if self.spill is not None and self.game is None:
+            self.spill.discard(self.key)
+        if self.journal is None:
+            return
+        self.journal.close(delete=discard or self.finished)
+        self.journal = None
+
+    def _reply(self, prompt):
+        self.finished = self.game.finished
+        if not self.finished:
+            self.output.write(prompt.text if prompt is not None else COMMAND_PROMPT)
+        self.send(self.output.flush())
+
+    def send(self, text):
+        """Write text to the client."""
+        if text and not self.writer.is_closing():
+            self.writer.write(text.encode("utf-8"))
+
+
+class SessionHost:
+    """Accept connections and play each session's lines on the event loop."""
+
+    def __init__(self, questions=None, profiler=None, journal_root=None,
+                 checkpoint_every=DEFAULT_CHECKPOINT_EVERY, spill=None):
+        self.sessions = set()
+        self.questions = questions
+        self.profiler = profiler
+        self.journal_root = journal_root
+        self.checkpoint_every = checkpoint_every
+        self.spill = spill
+        self.journal_writer = None
+        if journal_root is not None:
+            self.journal_writer = ThreadPoolExecutor(
+                max_workers=1, thread_name_prefix="journal-writer"
+            )
+
+    async def handle_connection(self, reader, writer):
+        """Serve one client until it disconnects or its game ends."""
+        session = Session(
+            writer,
+            self.questions,
+            self.profiler,
+            self.journal_root,
+            self.checkpoint_every,
+            self.spill,
+            self.journal_writer,
+        )
+        self.sessions.add(session)
+        try:
+            session.start()
+            first = True
+            while not session.finished:
+                await writer.drain()
+                raw = await reader.readline()
+                if not raw:
+                    break
+                line = raw.decode("utf-8", errors="replace").rstrip("\r\n")
+                if first and session.journal is not None and line.startswith(RESUME_PREFIX):
+                    live_ids = {other.session_id for other in self.sessions}
+                    await session.resume(line[len(RESUME_PREFIX):].strip(), live_ids)
+                else:
+                    session.feed(line)
+                first = False
+            await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self.sessions.discard(session)
+            session.close()
+            writer.close()
+
+    async def sync_journals(self):
+        """Queue an fsync of every session journal, periodically (see Journal.sync)."""
+        while True:
+            await asyncio.sleep(JOURNAL_SYNC_INTERVAL)
+            for session in self.sessions:
+                if session.journal is not None:
+                    session.journal.sync()
+
+    async def spill_idle_sessions(self):
+        """Spill the sessions idle for longer than the store allows, periodically."""
+        interval = min(self.spill.idle_after, SPILL_CHECK_INTERVAL)
+        while True:
+            await asyncio.sleep(interval)
+            now = time.monotonic()
+            spilled = [session.spill_if_idle(now) for session in self.sessions]
+            if any(spilled):
+                # A Game is full of reference cycles (event subscribers,
+                # rules): without a collection it would stay in memory.
+                gc.collect()
+
+    def print_profile(self):
+        """Write the command profile and the spill counters to stderr."""
+        if self.profiler is not None:
+            print(self.profiler.report(), file=sys.stderr, flush=True)
+        if self.spill is not None:
+            print(self.spill.report(), file=sys.stderr, flush=True)
+
+    async def serve(self, host=DEFAULT_HOST, port=DEFAULT_PORT, unix_path=None):
+        """Listen on TCP (or on a Unix socket) until cancelled."""
+        if (self.profiler is not None or self.spill is not None) and hasattr(signal, "SIGUSR1"):
+            asyncio.get_running_loop().add_signal_handler(signal.SIGUSR1, self.print_profile)
+        if unix_path:
+            server = await asyncio.start_unix_server(
+                self.handle_connection, path=unix_path, backlog=DEFAULT_BACKLOG
+            )
+        else:
+            server = await asyncio.start_server(
+                self.handle_connection, host, port, backlog=DEFAULT_BACKLOG
+            )
+        tasks = []
+        if self.journal_root is not None:
+            tasks.append(asyncio.create_task(self.sync_journals()))
+        if self.spill is not None:
+            tasks.append(asyncio.create_task(self.spill_idle_sessions()))
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            for task in tasks:
+                task.cancel()
+            for session in list(self.sessions):
+                session.close()
+            if self.journal_writer is not None:
+                self.journal_writer.shutdown(wait=True)  # let the queued writes finish
+
+
+def main(argv=None):
+    """Entry point for the session host."""
+    parser = argparse.ArgumentParser(description="Vigilant multi-session host")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--unix", dest="unix_path", default=None)
+    parser.add_argument(
+        "--questions", default=None, help="question bank file (see question_bank.py)"
+    )
+    parser.add_argument(
+        "--profile", action="store_true", help="measure commands (see profiler.py)"
+    )
+    parser.add_argument(
+        "--journal", default=None, help="directory of the session journals (see journal.py)"
+    )
+    parser.add_argument("--checkpoint-every", type=int, default=DEFAULT_CHECKPOINT_EVERY)
+    parser.add_argument(
+        "--idle-after",
+        type=float,
+        default=None,
+        help="spill sessions idle for this many seconds to disk (see spill.py)",
+    )
+    parser.add_argument(
+        "--spill-dir", default=None, help="directory of spilled sessions (default: a temp dir)"
+    )
+    args = parser.parse_args(argv)
+
+    profiler = None
+    if args.profile:
+        profiler = CommandProfiler()
+        profiler.start()
+    spill = None
+    spill_dir = args.spill_dir
+    if args.idle_after is not None:
+        spill_dir = spill_dir or tempfile.mkdtemp(prefix="vigilant-spill-")
+        spill = SpillStore(spill_dir, args.idle_after)
+    host = SessionHost(
+        open_bank(args.questions) if args.questions else None,
+        profiler,
+        args.journal,
+        args.checkpoint_every,
+        spill,
+    )
+    try:
+        asyncio.run(host.serve(args.host, args.port, args.unix_path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        host.print_profile()
+        if spill is not None and args.spill_dir is None:
+            shutil.rmtree(spill_dir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
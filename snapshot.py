@@ -0,0 +1,306 @@
+"""Compact binary snapshots of a Game, between two commands.
+
+A snapshot is a short header (magic, schema version) followed by a
+``marshal`` payload made only of tuples, ints, strings and bytes. Shared
+objects are stored as ids, never copied:
+
+- rooms by their index in the world template (history, exits, NPC rooms);
+- NPCs by their index in ``World.characters`` (companions by spawn key);
+- items of a world definition as (world id, index); items created by the
+  game logic (rewards, crafted objects) are the only ones stored by value;
+- quests by id, objectives by index. Only the current world's quest set
+  is kept: earlier sets are only read by their own world's rules.
+
+The world templates' digests are recorded, so a snapshot is refused by a
+tree whose world definitions changed. The RNG state, the quiz decks and
+the NPC schedule are saved as well: a restored session continues exactly
+as the original would have.
+
+A game waiting on a prompt (a suspended routine) cannot be saved.
+"""
+
+import marshal
+import struct
+from array import array
+
+from enemy import Enemy
+from item import Item, PICKUP_HANDLERS
+from player import Player
+from quest import STATE_ACTIVE, STATE_COMPLETED
+from world import World, get_world_template
+
+MAGIC = b"VGS1"
+SNAPSHOT_FORMAT = 1
+HEADER = struct.Struct("<4sH")
+MARSHAL_VERSION = 4
+
+_PICKUP_NAMES = {handler: name for name, handler in PICKUP_HANDLERS.items()}
+_ITEM_TABLES = {}
+_DEFAULT_OBJECTIVES = {}
+
+
+class SnapshotError(ValueError):
+    """Raised when a game cannot be saved or a snapshot cannot be loaded."""
+
+
+def _item_table(world_id):
+    """(items, {id(item): index}) of a world template, built once."""
+    table = _ITEM_TABLES.get(world_id)
+    if table is None:
+        template = get_world_template(world_id)
+        items = [item for room in template.rooms.values() for item in room.inventory]
+        table = _ITEM_TABLES[world_id] = (items, {id(item): i for i, item in enumerate(items)})
+    return table
+
+
+def _encode_item(item, digests, last_world):
+    # Items can only come from the worlds visited so far.
+    for world_id in range(last_world, 0, -1):
+        index = _item_table(world_id)[1].get(id(item))
+        if index is not None:
+            digests.setdefault(world_id, get_world_template(world_id).source_digest)
+            return (world_id, index)
+    return (
+        item.name,
+        item.description,
+        item.weight,
+        item.effect_type,
+        item.effect_value,
+        item.usable,
+        _PICKUP_NAMES.get(item.on_pickup),
+    )
+
+
+def _decode_item(code):
+    if len(code) == 2:
+        world_id, index = code
+        return _item_table(world_id)[0][index]
+    name, description, weight, effect_type, effect_value, usable, on_pickup = code
+    return Item(
+        name,
+        description,
+        weight,
+        effect_type=effect_type,
+        effect_value=effect_value,
+        usable=usable,
+        on_pickup=PICKUP_HANDLERS[on_pickup] if on_pickup else None,
+    )
+
+
+def _quest_builder(game, world_id):
+    return getattr(game, f"_build_world{world_id}_quests")
+
+
+def _default_objectives(game, world_id):
+    """{quest id: objectives} of a freshly built quest set, computed once."""
+    defaults = _DEFAULT_OBJECTIVES.get(world_id)
+    if defaults is None:
+        quests = _quest_builder(game, world_id)()
+        defaults = _DEFAULT_OBJECTIVES[world_id] = {
+            quest_id: quest.objectives for quest_id, quest in quests.items()
+        }
+    return defaults
+
+
+def _encode_quests(game, world_id, quests):
+    """(id, state, completed indexes, objectives if not the default) per quest."""
+    defaults = _default_objectives(game, world_id)
+    return tuple(
+        (
+            quest_id,
+            quest.state,
+            tuple(quest.objectives.index(text) for text in quest.completed_objectives),
+            None if quest.objectives == defaults.get(quest_id) else tuple(quest.objectives),
+        )
+        for quest_id, quest in quests.items()
+    )
+
+
+def _decode_quests(quests, saved):
+    for quest_id, state, completed, objectives in saved:
+        quest = quests[quest_id]
+        if objectives is not None:
+            quest.objectives = list(objectives)
+        quest.state = state
+        quest.is_active = state == STATE_ACTIVE
+        quest.is_completed = state == STATE_COMPLETED
+        quest.completed_objectives = [quest.objectives[index] for index in completed]
+    return quests
+
+
+def _save_rooms(world, rooms, digests):
+    """(items, NPC ids, enemies) per room of the world."""
+    character_ids = {character: index for index, character in enumerate(world.characters)}
+    return tuple(
+        (
+            tuple(_encode_item(item, digests, world.world_id) for item in room.inventory),
+            tuple(character_ids[character] for character in room.characters),
+            tuple((enemy.name, enemy.hp, enemy.attack) for enemy in room.enemies),
+        )
+        for room in rooms
+    )
+
+
+def _load_rooms(world, rooms, saved):
+    for room, (items, character_ids, enemies) in zip(rooms, saved):
+        room.inventory = [_decode_item(code) for code in items]
+        room.characters = [world.characters[index] for index in character_ids]
+        room.enemies = [Enemy(name, hp, attack) for name, hp, attack in enemies]
+
+
+def _save_characters(world, room_ids):
+    """(room index or -1, message index) per NPC."""
+    return tuple(
+        (room_ids.get(character.current_room, -1), character._index)  # pylint: disable=protected-access
+        for character in world.characters
+    )
+
+
+def _load_characters(world, rooms, saved):
+    for character, (room_index, message_index) in zip(world.characters, saved):
+        character.current_room = rooms[room_index] if room_index >= 0 else None
+        character._index = message_index  # pylint: disable=protected-access
+
+
+def _save_player(player, room_ids, digests, world_id):
+    return (
+        player.name,
+        player.hp,
+        player.max_hp,
+        player.atk,
+        player.stability,
+        player.max_weight,
+        player.move_count,
+        tuple(player.rewards),
+        player.flags,
+        player.velyra_method,
+        getattr(player, "origin_choice", None),
+        room_ids[player.current_room],
+        tuple(room_ids[room] for room in player.history),
+        tuple(room_ids[room] for room in player.visited_rooms.values()),
+        tuple(_encode_item(item, digests, world_id) for item in player.inventory),
+        tuple(quest.quest_id for quest in player.quest_manager.active_quests),
+    )
+
+
+def _load_player(game, rooms, saved):
+    """Rebuild the player; return it with the ids of its active quests."""
+    player = Player(saved[0], output=game.output, events=game.events)
+    (
+        player.hp, player.max_hp, player.atk, player.stability, player.max_weight,
+        player.move_count, rewards, player.flags,
+        player._velyra_method,  # pylint: disable=protected-access
+        origin_choice, room_index, history, visited, inventory, active,
+    ) = saved[1:]
+    player.rewards = list(rewards)
+    if origin_choice is not None:
+        player.origin_choice = origin_choice
+    player._current_room = rooms[room_index]  # pylint: disable=protected-access
+    for index in history:
+        player._push_history(rooms[index])  # pylint: disable=protected-access
+    player.visited_rooms = {rooms[index].name: rooms[index] for index in visited}
+    for code in inventory:
+        player.inventory.add(_decode_item(code))
+    return player, active
+
+
+def _load_world_quests(game, world_id, saved, active):
+    """Rebuild the current world's quests, hand them to the player, install the rules."""
+    current = _decode_quests(_quest_builder(game, world_id)(), saved)
+    setattr(game, f"world{world_id}_quests", current)
+    manager = game.player.quest_manager
+    for quest in current.values():
+        manager.add_quest(quest)
+    manager.active_quests = [current[quest_id] for quest_id in active]
+    game.player.current_world_quests = list(current.values())
+    game.quest_rules.install(getattr(game, f"_world{world_id}_rules")())
+
+
+def _save_rng(rng):
+    version, words, gauss = rng.getstate()
+    return (version, array("I", words).tobytes(), gauss)
+
+
+def _load_rng(rng, saved):
+    version, words, gauss = saved
+    rng.setstate((version, tuple(array("I", words)), gauss))
+
+
+def dumps(game):
+    """Encode a game between two commands as bytes."""
+    if game.pending_routine is not None:
+        raise SnapshotError("Cannot snapshot a game waiting on a prompt")
+    if game.player is None or game.world is None:
+        raise SnapshotError("Cannot snapshot a game that is not set up")
+
+    world = game.world
+    rooms = list(world.rooms.values())
+    room_ids = {room: index for index, room in enumerate(rooms)}
+    digests = {world.world_id: world.template.source_digest}
+    # Encoded first: the items they hold add the digests of earlier worlds.
+    player_state = _save_player(game.player, room_ids, digests, world.world_id)
+    rooms_state = _save_rooms(world, rooms, digests)
+    payload = (
+        tuple(digests.items()),
+        world.world_id,
+        tuple(world.companion_keys),
+        game.finished,
+        game.seed,
+        dict(game.metadata),
+        _save_rng(game.rng),
+        game.quiz.get_state(),
+        game.npc_scheduler.get_state(
+            {character: index for index, character in enumerate(world.characters)}
+        ),
+        game.quest_rules.woken(),
+        player_state,
+        rooms_state,
+        _save_characters(world, room_ids),
+        _encode_quests(game, world.world_id, getattr(game, f"world{world.world_id}_quests")),
+    )
+    return HEADER.pack(MAGIC, SNAPSHOT_FORMAT) + marshal.dumps(payload, MARSHAL_VERSION)
+
+
+def _read_payload(data):
+    """Check the header and the world digests; return the decoded payload."""
+    magic, version = HEADER.unpack_from(data, 0)
+    if magic != MAGIC or version != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"Not a format {SNAPSHOT_FORMAT} game snapshot")
+    payload = marshal.loads(data[HEADER.size:])
+    for digest_world, digest in payload[0]:
+        if get_world_template(digest_world).source_digest != digest:
+            raise SnapshotError(f"World {digest_world} changed since the snapshot")
+    return payload
+
+
+def _load_world(game, world_id, companion_keys, rooms_state, characters_state):
+    """Rebuild the world with its companions, rooms and NPCs; return its rooms."""
+    world = World(world_id=world_id)
+    for key in companion_keys:
+        world.spawn_companion(key, None)
+    rooms = list(world.rooms.values())
+    game.world = world
+    game.rooms = world.rooms
+    _load_rooms(world, rooms, rooms_state)
+    _load_characters(world, rooms, characters_state)
+    return rooms
+
+
+def loads(game, data):
+    """Restore a snapshot into a freshly constructed (not set up) Game."""
+    (
+        _digests, world_id, companion_keys, game.finished, game.seed, game.metadata,
+        rng_state, quiz_state, scheduler_state, woken, player_state, rooms_state,
+        characters_state, quests_state,
+    ) = _read_payload(data)
+    game.cancel_prefetch()
+    _load_rng(game.rng, rng_state)
+    game.current_world = world_id
+    game.setup_commands()
+    rooms = _load_world(game, world_id, companion_keys, rooms_state, characters_state)
+    game.player, active = _load_player(game, rooms, player_state)
+    _load_world_quests(game, world_id, quests_state, active)
+    game.quest_rules.set_woken(woken)
+    game.quiz.set_state(quiz_state)
+    game.npc_scheduler.set_state(scheduler_state, game.world.characters)
+    return game
@@ -0,0 +1,94 @@
+"""Idle sessions spilled to disk, rehydrated on their next line.
+
+A hosted session spends most of its time waiting for the player, yet its
+Game keeps a whole World, Player and quest graph in memory. A SpillStore
+keeps instead, for each idle session, the ``Game.save()`` snapshot in a
+file of its own (a few KB) and rebuilds the game when the session's next
+line arrives. Resident memory then follows the active players rather
+than the connected ones.
+
+Only games between two commands can be spilled (see snapshot.py): a
+session waiting on a prompt stays resident and is counted as skipped.
+
+Counters: ``hits`` (a line found its game in memory), ``misses`` (it had
+to be rehydrated), ``spills``, ``skipped``, and the rehydration latency
+histogram.
+"""
+
+import os
+import time
+
+from game import Game
+from profiler import Histogram
+
+SPILL_SUFFIX = ".snap"
+
+
+class SpillStore:
+    """Directory of spilled game snapshots, with hit/miss counters."""
+
+    def __init__(self, directory, idle_after):
+        self.directory = directory
+        self.idle_after = idle_after
+        self.hits = 0
+        self.misses = 0
+        self.spills = 0
+        self.skipped = 0
+        self.rehydration = Histogram()
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.directory, key + SPILL_SUFFIX)
+
+    def is_idle(self, last_active, now=None):
+        """True if a session last active at ``last_active`` may be spilled."""
+        now = time.monotonic() if now is None else now
+        return now - last_active >= self.idle_after
+
+    def spill(self, key, game):
+        """Write ``game`` to the store; False if it is waiting on a prompt."""
+        if game.pending_routine is not None:
+            self.skipped += 1
+            return False
+        data = game.save()
+        with open(self._path(key), "wb") as handle:
+            handle.write(data)
+        game.cancel_prefetch()  # the rehydrated game builds its own
+        self.spills += 1
+        return True
+
+    def hit(self):
+        """Count a line served by a resident game."""
+        self.hits += 1
+
+    def rehydrate(self, key, questions=None):
+        """Rebuild and return the game spilled under ``key`` (a miss)."""
+        start = time.perf_counter()
+        path = self._path(key)
+        with open(path, "rb") as handle:
+            data = handle.read()
+        game = Game.load(data, questions=questions)
+        os.remove(path)
+        self.misses += 1
+        self.rehydration.add(time.perf_counter() - start)
+        return game
+
+    def discard(self, key):
+        """Forget a spilled game (its session ended)."""
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def report(self):
+        """One-line summary of the counters."""
+        latency = self.rehydration
+        mean = latency.total / latency.count * 1e6 if latency.count else 0.0
+        lookups = self.hits + self.misses
+        return (
+            f"spill: {self.spills} spilled, {self.skipped} skipped (prompt pending), "
+            f"{self.hits} hits, {self.misses} misses "
+            f"({self.misses / lookups if lookups else 0.0:.1%}), rehydration mean "
+            f"{mean:.1f} us, p99 {latency.percentile(0.99) * 1e6:.1f} us, "
+            f"max {latency.max * 1e6:.1f} us"
+        )
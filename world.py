@@ -1,24 +1,34 @@
-"""World construction and static content placement."""
-
-from typing import Dict, Optional
-
-from character import (
-    Character,
-    citizen_dore_reactive,
-    glitch_reactive,
-    merchant_dialogue,
-    ralen_reactive,
-    malek_reactive,
-    nommera_reactive,
-    yara_world1_reactive,
-    yara_world2_choice,
-)
+"""World construction from the declarative definitions in worlds/.
+
+Each world is described by a JSON file (rooms, exits, NPCs, items, enemies,
+images and map). It is compiled once into a WorldTemplate, cached on disk
+as a pickle keyed by the content hash of the source and of the item
+definitions it uses from labels.py, then shared by every session;
+``World`` lays the per-session state over it.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import tempfile
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from character import Character, ON_TALK_HANDLERS
 from enemy import Enemy
-from item import Item, create_stability_note
+from item import Item, PICKUP_HANDLERS
 import labels as L
-from room import Room
+from room import Room, RoomTemplate
 
 
+WORLDS_DIR = Path(__file__).parent / "worlds"
+CACHE_DIR = WORLDS_DIR / "__cache__"
+DEFINITION_FORMAT = 1
+# Part of the cache key: bump when the compiled classes change shape.
+CACHE_FORMAT = 2
+
+# Noms de salles utilisés par la logique scénarisée (game.py).
 STARTING_ROOM_NAME = "Eridani Prime"
 ERIDANI = "Eridani Prime"
 AVANT_POSTE = "Avant-poste minier"
@@ -40,543 +50,236 @@ CRYSTAL_PLAINS = "Crystal Plains"
 ANCIENT_NEXUS = "Ancient Nexus"
 HEART_TERRA = "The Heart of Terra"
 
-ROOM_IMAGES = {
-    ERIDANI: "eridani_prime.png",
-    AVANT_POSTE: "avant_poste_minier.png",
-    MARCHE: "marche_labyrinthique.png",
-    FORTERESSE: "cite_forteresse.png",
-    BASE_VELYRA: "base_rebelle_velyra.png",
-    QUARTIER_CIVIL: "quartier_civil.png",
-    ENTREPOTS: "entrepots_civils.png",
-    PRISON: "prison_centrale.png",
-    CITADELLE: "citadelle_karn.png",
-    DISTRICT_OR: "district_or.png",
-    QUARTIER_HOLO: "quartier_hologrammes.png",
-    NOEUD: "le_noeud.png",
-    PALAIS_LUMIERE: "palais_lumiere.png",
-    SALLE_TRONE: "salle_trone.png",
-    ORBITAL_STATION: "orbital_station_ruins.png",
-    LANDING_VALLEY: "landing_valley.png",
-    CRYSTAL_PLAINS: "crystal_plains.png",
-    ANCIENT_NEXUS: "ancient_nexus.png",
-    HEART_TERRA: "heart_terra.png",
-}
-
-
-class World:
-    """
-    Représente la structure statique du monde : salles, connexions et contenu.
 
-    Le World ne gère ni la boucle de jeu ni les interactions de gameplay.
-    """
+_TEMPLATES: Dict[int, "WorldTemplate"] = {}
 
-    def __init__(self, world_id: int = 1) -> None:
-        self.world_id = world_id
-        self.name = ""
-        self.rooms: Dict[str, Room] = {}
-        self.ascii_map = []
-        self.room_positions = {}
-        self._starting_room = self._build_world()
-
-    def _build_world(self) -> Room:
-        if self.world_id == 1:
-            self.name = ERIDANI
-            self._build_world1()
-            return self.rooms[STARTING_ROOM_NAME]
-        if self.world_id == 2:
-            self.name = "Secteur Ext?rieur"
-            self._build_world2()
-            return self.rooms[BASE_VELYRA]
-        if self.world_id == 3:
-            self.name = "Aurelion Prime"
-            self._build_world3()
-            return self.rooms[DISTRICT_OR]
-        if self.world_id == 4:
-            self.name = "Nova Terra"
-            self._build_world4()
-            return self.rooms[LANDING_VALLEY]
-        raise ValueError(f"World id inconnu: {self.world_id}")
-
-    def _build_world1(self) -> None:
-        self._create_world1_rooms()
-        self._connect_world1_rooms()
-        self._populate_world1_characters()
-        self._populate_world1_items()
-        self._populate_world1_enemies()
-        self.ascii_map = [
-            (
-                " Eridani Prime             --  Avant-poste minier        --  "
-                "Marché labyrinthique      --  Cité-forteresse"
-            ),
-        ]
-        self.room_positions = {
-            ERIDANI: (0, 0),
-            AVANT_POSTE: (0, 30),
-            MARCHE: (0, 60),
-            FORTERESSE: (0, 90),
-        }
 
-    def _build_world2(self) -> None:
-        self._create_world2_rooms()
-        self._connect_world2_rooms()
-        self._populate_world2_characters()
-        self._populate_world2_items()
-        self._populate_world2_enemies()
-        self.ascii_map = [
-            (
-                " Base rebelle de Velyra    --  Quartier civil            --  "
-                "Entrep?ts civils          --  Prison centrale        --  Citadelle de Karn"
-            ),
-        ]
-        self.room_positions = {
-            BASE_VELYRA: (0, 0),
-            QUARTIER_CIVIL: (0, 30),
-            ENTREPOTS: (0, 60),
-            PRISON: (0, 90),
-            CITADELLE: (0, 120),
-        }
+def world_path(world_id: int) -> Path:
+    """Chemin du fichier de définition d'un monde."""
+    return WORLDS_DIR / f"world{world_id}.json"
 
-    def _build_world3(self) -> None:
-        self._create_world3_rooms()
-        self._connect_world3_rooms()
-        self._populate_world3_characters()
-        self._populate_world3_items()
-        self._populate_world3_enemies()
-        self.ascii_map = [
-            (
-                " District d'Or              --  Quartier des Hologrammes  --  "
-                "Le Nœud                --  Palais de Lumière      --  Salle du Trône"
-            ),
-        ]
-        self.room_positions = {
-            DISTRICT_OR: (0, 0),
-            QUARTIER_HOLO: (0, 30),
-            NOEUD: (0, 60),
-            PALAIS_LUMIERE: (0, 90),
-            SALLE_TRONE: (0, 120),
-        }
 
-    def _build_world4(self) -> None:
-        self._create_world4_rooms()
-        self._connect_world4_rooms()
-        self.ascii_map = [
-            (
-                " Orbital Station Ruins       --  Landing Valley           --  "
-                "Crystal Plains           --  Ancient Nexus          --  The Heart of Terra"
-            ),
-        ]
-        self.room_positions = {
-            ORBITAL_STATION: (0, 0),
-            LANDING_VALLEY: (0, 30),
-            CRYSTAL_PLAINS: (0, 60),
-            ANCIENT_NEXUS: (0, 90),
-            HEART_TERRA: (0, 120),
-        }
+def get_world_template(world_id: int) -> "WorldTemplate":
+    """Retourne le gabarit partagé d'un monde, chargé au premier appel."""
+    template = _TEMPLATES.get(world_id)
+    if template is None:
+        path = world_path(world_id)
+        if not path.exists():
+            raise ValueError(f"World id inconnu: {world_id}")
+        template = load_world_template(path)
+        _TEMPLATES[world_id] = template
+    return template
 
-    def _create_world1_rooms(self) -> None:
-        eridani = Room(
-            ERIDANI,
-            L.WORLD1_ROOM_DESCRIPTIONS[ERIDANI],
-            image=ROOM_IMAGES.get(ERIDANI),
-        )
-        eridani.perception_descriptions["low"] = L.WORLD1_PERCEPTION_LOW[ERIDANI]
 
-        avant_poste = Room(
-            AVANT_POSTE,
-            L.WORLD1_ROOM_DESCRIPTIONS[AVANT_POSTE],
-            image=ROOM_IMAGES.get(AVANT_POSTE),
-        )
+def load_world_template(path, cache_dir=CACHE_DIR) -> "WorldTemplate":
+    """
+    Charge une définition de monde en passant par le cache compilé.
 
-        marche = Room(
-            MARCHE,
-            L.WORLD1_ROOM_DESCRIPTIONS[MARCHE],
-            image=ROOM_IMAGES.get(MARCHE),
-        )
-        marche.perception_descriptions["low"] = L.WORLD1_PERCEPTION_LOW[MARCHE]
+    La clé du cache est le hash SHA-256 du fichier source et des
+    définitions d'objets de labels.py (fusionnées dans les objets
+    compilés) : toute modification de l'une ou l'autre invalide le cache.
+    """
+    path = Path(path)
+    source = path.read_bytes()
+    definitions = json.dumps(L.ITEM_DEFINITIONS, sort_keys=True).encode("utf-8")
+    digest = hashlib.sha256(
+        source + b"|" + definitions + f"|{CACHE_FORMAT}".encode()
+    ).hexdigest()
+    cache_path = Path(cache_dir) / f"{path.stem}-{digest[:24]}.pickle"
+    try:
+        with open(cache_path, "rb") as handle:
+            template = pickle.load(handle)
+        if getattr(template, "source_digest", None) == digest:
+            return template
+    except Exception:  # pylint: disable=broad-exception-caught
+        pass  # missing or corrupt cache: rebuild it below
+
+    template = WorldTemplate.from_definition(json.loads(source.decode("utf-8")))
+    template.source_digest = digest
+    _write_cache(cache_path, template)
+    return template
+
+
+def _write_cache(cache_path: Path, template: "WorldTemplate") -> None:
+    """Write the compiled template atomically; skip silently if not writable."""
+    tmp_name = None
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=cache_path.parent, suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            pickle.dump(template, handle, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_name, cache_path)
+        tmp_name = None
+        stem = cache_path.name.rsplit("-", 1)[0]
+        for stale in cache_path.parent.glob(f"{stem}-*.pickle"):
+            if stale != cache_path:
+                stale.unlink(missing_ok=True)
+    except OSError:
+        pass
+    finally:
+        if tmp_name is not None:
+            Path(tmp_name).unlink(missing_ok=True)
+
+
+def _build_item(spec) -> Item:
+    """Build an Item from its definition (``definition`` = clé de ITEM_DEFINITIONS)."""
+    fields = dict(L.ITEM_DEFINITIONS[spec["definition"]]) if "definition" in spec else {}
+    fields.update(spec)
+    on_pickup = fields.get("on_pickup")
+    return Item(
+        fields["name"],
+        fields["description"],
+        fields.get("weight", 1),
+        effect_type=fields.get("effect_type"),
+        effect_value=fields.get("effect_value", 0),
+        usable=fields.get("usable", False),
+        on_pickup=PICKUP_HANDLERS[on_pickup] if on_pickup else None,
+    )
+
+
+def _build_character(spec, room) -> Character:
+    """Build an NPC prototype; ``on_talk`` names a handler of character.py."""
+    on_talk = spec.get("on_talk")
+    return Character(
+        spec["name"],
+        spec["description"],
+        room,
+        tuple(spec.get("messages", ())),
+        can_move=spec.get("can_move", False),
+        on_talk=ON_TALK_HANDLERS[on_talk] if on_talk else None,
+    )
+
+
+def _build_enemy(spec) -> Enemy:
+    """Build an enemy prototype from its stats."""
+    return Enemy(spec["name"], hp=spec["hp"], attack=spec["attack"])
+
+
+class WorldTemplate:  # pylint: disable=too-many-instance-attributes,too-few-public-methods
+    """
+    Structure statique d'un monde : salles, connexions et contenu initial.
 
-        forteresse = Room(
-            FORTERESSE,
-            L.WORLD1_ROOM_DESCRIPTIONS[FORTERESSE],
-            image=ROOM_IMAGES.get(FORTERESSE),
-        )
-        forteresse.perception_descriptions["low"] = L.WORLD1_PERCEPTION_LOW[FORTERESSE]
+    Compilé une seule fois par processus (ou relu depuis le cache) et
+    partagé par toutes les sessions ; il ne doit pas être modifié ensuite.
+    """
 
-        self.rooms = {
-            ERIDANI: eridani,
-            AVANT_POSTE: avant_poste,
-            MARCHE: marche,
-            FORTERESSE: forteresse,
+    def __init__(self, world_id: int, name: str) -> None:
+        self.world_id = world_id
+        self.name = name
+        self.rooms: Dict[str, RoomTemplate] = {}
+        self.starting_room: Optional[RoomTemplate] = None
+        self.ascii_map = []
+        self.room_positions = {}
+        self.scripted_enemies: Dict[str, Enemy] = {}
+        self.companions: Dict[str, Character] = {}
+        self.exit_plan = ()
+        self.content_plan = ()
+        self.source_digest = None
+
+    @classmethod
+    def from_definition(cls, data) -> "WorldTemplate":
+        """Compile a parsed world definition (see worlds/*.json)."""
+        if data.get("format") != DEFINITION_FORMAT:
+            raise ValueError(f"Format de monde non supporté: {data.get('format')}")
+        template = cls(data["id"], data["name"])
+        template.ascii_map = list(data.get("ascii_map", ()))
+
+        for spec in data["rooms"]:
+            room = RoomTemplate(spec["name"], spec["description"], image=spec.get("image"))
+            room.perception_descriptions.update(spec.get("perception", {}))
+            room.alt_descriptions.update(spec.get("alt_descriptions", {}))
+            room.inventory.extend(_build_item(item) for item in spec.get("items", ()))
+            room.characters.extend(
+                _build_character(character, room) for character in spec.get("characters", ())
+            )
+            room.enemies.extend(_build_enemy(enemy) for enemy in spec.get("enemies", ()))
+            template.rooms[room.name] = room
+            if "position" in spec:
+                template.room_positions[room.name] = tuple(spec["position"])
+
+        for spec in data["rooms"]:
+            room = template.rooms[spec["name"]]
+            for direction, target in spec.get("exits", {}).items():
+                if target is not None and target not in template.rooms:
+                    raise ValueError(f"Sortie inconnue depuis {room.name}: {target}")
+                room.exits[direction] = template.rooms[target] if target else None
+
+        template.starting_room = template.rooms[data["starting_room"]]
+        template.scripted_enemies = {
+            key: _build_enemy(spec) for key, spec in data.get("scripted_enemies", {}).items()
         }
-    def _connect_world1_rooms(self) -> None:
-        eridani = self.rooms[ERIDANI]
-        avant_poste = self.rooms[AVANT_POSTE]
-        marche = self.rooms[MARCHE]
-        forteresse = self.rooms[FORTERESSE]
-
-        eridani.exits = {"E": avant_poste, "O": None, "U": None, "D": None}
-        avant_poste.exits = {"E": marche, "O": eridani, "U": None, "D": None}
-        marche.exits = {"E": forteresse, "O": avant_poste, "U": None, "D": None}
-        forteresse.exits = {"E": None, "O": marche, "U": None, "D": None}
-
-    def _populate_world1_characters(self) -> None:  # pylint: disable=too-many-locals
-        ralen_room = self.rooms[ERIDANI]
-        ralen_data = L.WORLD1_NPCS["ralen"]
-        ralen = Character(
-            "Ralen",
-            ralen_data["description"],
-            ralen_room,
-            ralen_data["messages"],
-            on_talk=ralen_reactive
-        )
-        ralen_room.characters.append(ralen)
-
-        malek_room = self.rooms[AVANT_POSTE]
-        malek_data = L.WORLD1_NPCS["malek"]
-        malek = Character(
-            "Ingénieur Malek",
-            malek_data["description"],
-            malek_room,
-            malek_data["messages"],
-            on_talk=malek_reactive
-        )
-        malek_room.characters.append(malek)
-
-        marche_room = self.rooms[MARCHE]
-        marchand_data = L.WORLD1_NPCS["marchand"]
-        marchand = Character(
-            "Marchand",
-            marchand_data["description"],
-            marche_room,
-            marchand_data["messages"],
-            on_talk=merchant_dialogue
-        )
-        marche_room.characters.append(marchand)
-
-        yara_data = L.WORLD1_NPCS["yara"]
-        yara = Character(
-            "Yara",
-            yara_data["description"],
-            marche_room,
-            yara_data["messages"],
-            on_talk=yara_world1_reactive,
-        )
-        marche_room.characters.append(yara)
-
-        nommera_room = self.rooms[AVANT_POSTE]
-        nommera_data = L.WORLD1_NPCS["nommera"]
-        nommera = Character(
-            "Nommera",
-            nommera_data["description"],
-            nommera_room,
-            nommera_data["messages"],
-            on_talk=nommera_reactive
-        )
-        nommera_room.characters.append(nommera)
-
-        kael_data = L.WORLD1_NPCS["kael"]
-        kael = Character(
-            "Kael",
-            kael_data["description"],
-            self.rooms[ERIDANI],
-            kael_data["messages"],
-            can_move=True
-        )
-        self.rooms[ERIDANI].characters.append(kael)
-    def _populate_world1_items(self) -> None:
-        battery = Item(
-            L.ITEM_DEFINITIONS["battery"]["name"],
-            L.ITEM_DEFINITIONS["battery"]["description"],
-            2,
-            effect_type=L.ITEM_DEFINITIONS["battery"]["effect_type"],
-            effect_value=L.ITEM_DEFINITIONS["battery"]["effect_value"],
-        )
-        shiv = Item(
-            L.ITEM_DEFINITIONS["shiv"]["name"],
-            L.ITEM_DEFINITIONS["shiv"]["description"],
-            1,
-            effect_type=L.ITEM_DEFINITIONS["shiv"]["effect_type"],
-            effect_value=L.ITEM_DEFINITIONS["shiv"]["effect_value"],
-        )
-        medikit = Item(
-            L.ITEM_DEFINITIONS["medikit"]["name"],
-            L.ITEM_DEFINITIONS["medikit"]["description"],
-            1,
-            effect_type="heal",
-            effect_value=25,
-            usable=True
-        )
-        self.rooms[AVANT_POSTE].inventory.append(battery)
-        self.rooms[MARCHE].inventory.append(shiv)
-        self.rooms[ERIDANI].inventory.append(medikit)
-        self.rooms[ERIDANI].inventory.append(create_stability_note())
-
-    def _populate_world1_enemies(self) -> None:
-        sentry = Enemy("Sentry de patrouille", hp=20, attack=15)
-        self.rooms[AVANT_POSTE].enemies.append(sentry)
-        vorn = Enemy("Capitaine Vorn", hp=40, attack=25)
-        self.rooms[FORTERESSE].enemies.append(vorn)
-
-    def _create_world2_rooms(self) -> None:
-        base = Room(
-            BASE_VELYRA,
-            L.WORLD2_ROOM_DESCRIPTIONS[BASE_VELYRA],
-            image=ROOM_IMAGES.get(BASE_VELYRA),
-        )
-        quartier = Room(
-            QUARTIER_CIVIL,
-            L.WORLD2_ROOM_DESCRIPTIONS[QUARTIER_CIVIL],
-            image=ROOM_IMAGES.get(QUARTIER_CIVIL),
-        )
-        entrepots = Room(
-            ENTREPOTS,
-            L.WORLD2_ROOM_DESCRIPTIONS[ENTREPOTS],
-            image=ROOM_IMAGES.get(ENTREPOTS),
-        )
-        prison = Room(
-            PRISON,
-            L.WORLD2_ROOM_DESCRIPTIONS[PRISON],
-            image=ROOM_IMAGES.get(PRISON),
-        )
-        citadelle = Room(
-            CITADELLE,
-            L.WORLD2_ROOM_DESCRIPTIONS[CITADELLE],
-            image=ROOM_IMAGES.get(CITADELLE),
-        )
-
-        self.rooms = {
-            BASE_VELYRA: base,
-            QUARTIER_CIVIL: quartier,
-            ENTREPOTS: entrepots,
-            PRISON: prison,
-            CITADELLE: citadelle,
+        template.companions = {
+            key: _build_character(spec, None) for key, spec in data.get("companions", {}).items()
         }
-    def _connect_world2_rooms(self) -> None:
-        base = self.rooms[BASE_VELYRA]
-        quartier = self.rooms[QUARTIER_CIVIL]
-        entrepots = self.rooms[ENTREPOTS]
-        prison = self.rooms[PRISON]
-        citadelle = self.rooms[CITADELLE]
-
-        base.exits = {"E": quartier, "O": None, "U": None, "D": None}
-        quartier.exits = {"E": entrepots, "O": base, "U": None, "D": None}
-        entrepots.exits = {"E": prison, "O": quartier, "U": None, "D": None}
-        prison.exits = {"E": citadelle, "O": entrepots, "U": None, "D": None}
-        citadelle.exits = {"E": None, "O": prison, "U": None, "D": None}
-
-    def _populate_world2_characters(self) -> None:
-        base = self.rooms[BASE_VELYRA]
-        entrepots = self.rooms[ENTREPOTS]
-        prison = self.rooms[PRISON]
-
-        yara_data = L.WORLD2_NPCS["yara"]
-        yara = Character(
-            "Yara",
-            yara_data["description"],
-            base,
-            yara_data["messages"],
-            on_talk=yara_world2_choice,
-        )
-        base.characters.append(yara)
-
-        nommera_data = L.WORLD2_NPCS["nommera"]
-        nommera = Character(
-            "Nommera",
-            nommera_data["description"],
-            entrepots,
-            nommera_data["messages"],
-        )
-        entrepots.characters.append(nommera)
-
-        narek_data = L.WORLD2_NPCS["narek"]
-        narek = Character(
-            "Narek",
-            narek_data["description"],
-            prison,
-            narek_data["messages"],
-        )
-        prison.characters.append(narek)
-    def _populate_world2_items(self) -> None:
-        keycard = Item(
-            L.ITEM_DEFINITIONS["keycard"]["name"],
-            L.ITEM_DEFINITIONS["keycard"]["description"],
-            1
-        )
-        transmitter = Item(
-            L.ITEM_DEFINITIONS["transmitter"]["name"],
-            L.ITEM_DEFINITIONS["transmitter"]["description"],
-            1
-        )
-        nanomedecine = Item(
-            L.ITEM_DEFINITIONS["nanomedicine"]["name"],
-            L.ITEM_DEFINITIONS["nanomedicine"]["description"],
-            1
-        )
+        template._plan()  # pylint: disable=protected-access
+        return template
 
-        self.rooms[ENTREPOTS].inventory.append(keycard)
-        self.rooms[BASE_VELYRA].inventory.append(transmitter)
-        self.rooms[QUARTIER_CIVIL].inventory.append(nanomedecine)
-
-    def _populate_world2_enemies(self) -> None:
-        drone = Enemy("Drone de Karn", hp=30, attack=15)
-        self.rooms[QUARTIER_CIVIL].enemies.append(drone)
-        karn = Enemy("Gouverneur Karn", hp=50, attack=25)
-        self.rooms[CITADELLE].enemies.append(karn)
-
-    def _create_world3_rooms(self) -> None:
-        district = Room(
-            DISTRICT_OR,
-            L.WORLD3_ROOM_DESCRIPTIONS[DISTRICT_OR],
-            image=ROOM_IMAGES.get(DISTRICT_OR),
-        )
-        district.alt_description_infiltrate = (
-            L.WORLD3_ALT_DESCRIPTIONS[DISTRICT_OR]["infiltrate"]
-        )
-        district.alt_description_reveal = (
-            L.WORLD3_ALT_DESCRIPTIONS[DISTRICT_OR]["reveal"]
-        )
-        holo = Room(
-            QUARTIER_HOLO,
-            L.WORLD3_ROOM_DESCRIPTIONS[QUARTIER_HOLO],
-            image=ROOM_IMAGES.get(QUARTIER_HOLO),
-        )
-        node = Room(
-            NOEUD,
-            L.WORLD3_ROOM_DESCRIPTIONS[NOEUD],
-            image=ROOM_IMAGES.get(NOEUD),
-        )
-        node.alt_description_break = (
-            L.WORLD3_ALT_DESCRIPTIONS[NOEUD]["break"]
-        )
-        node.alt_description_keep = (
-            L.WORLD3_ALT_DESCRIPTIONS[NOEUD]["keep"]
-        )
-        palace = Room(
-            PALAIS_LUMIERE,
-            L.WORLD3_ROOM_DESCRIPTIONS[PALAIS_LUMIERE],
-            image=ROOM_IMAGES.get(PALAIS_LUMIERE),
+    def _plan(self) -> None:
+        """Precompute the instantiation plan used by World."""
+        # Exits by room name, and only the rooms that start with NPCs or enemies.
+        self.exit_plan = tuple(
+            (
+                name,
+                tuple(
+                    (direction, target.name if target is not None else None)
+                    for direction, target in room.exits.items()
+                ),
+            )
+            for name, room in self.rooms.items()
         )
-        throne = Room(
-            SALLE_TRONE,
-            L.WORLD3_ROOM_DESCRIPTIONS[SALLE_TRONE],
-            image=ROOM_IMAGES.get(SALLE_TRONE),
+        self.content_plan = tuple(
+            (name, tuple(room.characters), tuple(room.enemies))
+            for name, room in self.rooms.items()
+            if room.characters or room.enemies
         )
 
-        self.rooms = {
-            DISTRICT_OR: district,
-            QUARTIER_HOLO: holo,
-            NOEUD: node,
-            PALAIS_LUMIERE: palace,
-            SALLE_TRONE: throne,
-        }
-    def _connect_world3_rooms(self) -> None:
-        district = self.rooms[DISTRICT_OR]
-        holo = self.rooms[QUARTIER_HOLO]
-        node = self.rooms[NOEUD]
-        palace = self.rooms[PALAIS_LUMIERE]
-        throne = self.rooms[SALLE_TRONE]
-
-        district.exits = {"E": holo, "O": None, "U": None, "D": None}
-        holo.exits = {"E": node, "O": district, "U": None, "D": None}
-        node.exits = {"E": palace, "O": holo, "U": None, "D": None}
-        palace.exits = {"E": throne, "O": node, "U": None, "D": None}
-        throne.exits = {"E": None, "O": palace, "U": None, "D": None}
-
-    def _populate_world3_characters(self) -> None:
-        district = self.rooms[DISTRICT_OR]
-        holo = self.rooms[QUARTIER_HOLO]
-
-        citizen_data = L.WORLD3_NPCS["citoyen_dore"]
-        citizen = Character(
-            "Citoyen dore",
-            citizen_data["description"],
-            district,
-            citizen_data["messages"],
-            on_talk=citizen_dore_reactive,
-        )
-        district.characters.append(citizen)
-
-        glitch_data = L.WORLD3_NPCS["habitant_glitche"]
-        glitch = Character(
-            "Habitant glitche",
-            glitch_data["description"],
-            holo,
-            glitch_data["messages"],
-            on_talk=glitch_reactive,
-        )
-        holo.characters.append(glitch)
-    def _populate_world3_enemies(self) -> None:
-        spectre = Enemy("Spectre Holographique", hp=35, attack=15)
-        self.rooms[QUARTIER_HOLO].enemies.append(spectre)
-
-    def _populate_world3_items(self) -> None:
-        mask = Item(
-            L.ITEM_DEFINITIONS["mask"]["name"],
-            L.ITEM_DEFINITIONS["mask"]["description"],
-            1,
-            effect_type=L.ITEM_DEFINITIONS["mask"]["effect_type"],
-            effect_value=L.ITEM_DEFINITIONS["mask"]["effect_value"],
-        )
-        shard = Item(
-            L.ITEM_DEFINITIONS["shard"]["name"],
-            L.ITEM_DEFINITIONS["shard"]["description"],
-            1
-        )
-        core = Item(
-            L.ITEM_DEFINITIONS["core"]["name"],
-            L.ITEM_DEFINITIONS["core"]["description"],
-            1
-        )
 
-        self.rooms[DISTRICT_OR].inventory.append(mask)
-        self.rooms[QUARTIER_HOLO].inventory.append(shard)
-        self.rooms[NOEUD].inventory.append(core)
+class World:  # pylint: disable=too-many-instance-attributes
+    """
+    Monde d'une session : des Room légères posées sur un WorldTemplate.
 
-    def _create_world4_rooms(self) -> None:
-        station = Room(
-            ORBITAL_STATION,
-            L.WORLD4_ROOM_DESCRIPTIONS[ORBITAL_STATION],
-            image=ROOM_IMAGES.get(ORBITAL_STATION),
-        )
-        valley = Room(
-            LANDING_VALLEY,
-            L.WORLD4_ROOM_DESCRIPTIONS[LANDING_VALLEY],
-            image=ROOM_IMAGES.get(LANDING_VALLEY),
-        )
-        plains = Room(
-            CRYSTAL_PLAINS,
-            L.WORLD4_ROOM_DESCRIPTIONS[CRYSTAL_PLAINS],
-            image=ROOM_IMAGES.get(CRYSTAL_PLAINS),
-        )
-        nexus = Room(
-            ANCIENT_NEXUS,
-            L.WORLD4_ROOM_DESCRIPTIONS[ANCIENT_NEXUS],
-            image=ROOM_IMAGES.get(ANCIENT_NEXUS),
-        )
-        heart = Room(
-            HEART_TERRA,
-            L.WORLD4_ROOM_DESCRIPTIONS[HEART_TERRA],
-            image=ROOM_IMAGES.get(HEART_TERRA),
-        )
+    Seul l'état modifiable est propre à la session (inventaires des salles,
+    ennemis, position et curseur de dialogue des PNJ) ; noms, textes,
+    sorties et carte sont partagés avec le gabarit.
+    Le World ne gère ni la boucle de jeu ni les interactions de gameplay.
+    """
 
-        self.rooms = {
-            ORBITAL_STATION: station,
-            LANDING_VALLEY: valley,
-            CRYSTAL_PLAINS: plains,
-            ANCIENT_NEXUS: nexus,
-            HEART_TERRA: heart,
+    def __init__(self, world_id: int = 1) -> None:
+        template = get_world_template(world_id)
+        self.template = template
+        self.world_id = world_id
+        self.name = template.name
+        self.ascii_map = template.ascii_map
+        self.room_positions = template.room_positions
+        self.rooms: Dict[str, Room] = {
+            name: Room.from_template(room_template, room_template.inventory)
+            for name, room_template in template.rooms.items()
         }
-    def _connect_world4_rooms(self) -> None:
-        station = self.rooms[ORBITAL_STATION]
-        valley = self.rooms[LANDING_VALLEY]
-        plains = self.rooms[CRYSTAL_PLAINS]
-        nexus = self.rooms[ANCIENT_NEXUS]
-        heart = self.rooms[HEART_TERRA]
-
-        station.exits = {"E": valley, "O": None, "U": None, "D": None}
-        valley.exits = {"E": plains, "O": station, "U": None, "D": None}
-        plains.exits = {"E": nexus, "O": valley, "U": None, "D": None}
-        nexus.exits = {"E": heart, "O": plains, "U": None, "D": None}
-        heart.exits = {"E": None, "O": nexus, "U": None, "D": None}
+        for room_name, exits in template.exit_plan:
+            self.rooms[room_name].exits = {
+                direction: self.rooms[target] if target is not None else None
+                for direction, target in exits
+            }
+        # Tous les PNJ de la session, dans l'ordre de création (ids des snapshots).
+        self.characters: List[Character] = []
+        self.companion_keys: List[str] = []
+        for room_name, characters, enemies in template.content_plan:
+            room = self.rooms[room_name]
+            room.characters = [character.clone(room) for character in characters]
+            room.enemies = [enemy.clone() for enemy in enemies]
+            self.characters.extend(room.characters)
+        self._starting_room = self.rooms[template.starting_room.name]
+
+    def spawn_enemy(self, key: str) -> Enemy:
+        """Crée un ennemi scénarisé (``scripted_enemies`` de la définition)."""
+        return self.template.scripted_enemies[key].clone()
+
+    def spawn_companion(self, key: str, room: Room) -> Character:
+        """Crée un compagnon (``companions`` de la définition) placé dans ``room``."""
+        companion = self.template.companions[key].clone(room)
+        self.characters.append(companion)
+        self.companion_keys.append(key)
+        return companion
 
     def get_starting_room(self) -> Room:
         """Retourne la salle de départ définie pour ce monde."""